@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import subprocess
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MAIN_PATH = os.path.join(REPOSITORY_ROOT, 'data_dev', 'main.py')
+
+# Modules every main.py command imports before its stages start working, mirroring the imports inside the
+# stage functions of data_dev/src/pipeline/stages.py. 'all' is also what every command paid before the CLI.
+CONNECTOR = 'data_dev.src.connectors.postgre_connector'
+COMMAND_IMPORTS = {
+    'generate': [CONNECTOR, 'data_dev.src.data.inject_generated_data_to_src'],
+    'load-3nf': [CONNECTOR, 'data_dev.src.data.nf3_loader'],
+    'export-parquet': [CONNECTOR, 'data_dev.src.data.parquet_loader'],
+    'report': ['data_dev.src.reporting.report_generator'],
+}
+COMMAND_IMPORTS['all'] = sorted({module for modules in COMMAND_IMPORTS.values() for module in modules})
+
+
+def best_seconds(args, repeats):
+    """
+    Measures the best wall-clock time of a fresh interpreter started with the given arguments.
+
+    The interpreter runs from the repository root with it on PYTHONPATH, like the Jenkins 'Run main' stage.
+
+    Args:
+        args (List[str]): The interpreter arguments.
+        repeats (int): How many interpreters are started. The fastest one is reported.
+
+    Returns:
+        float: The best observed wall-clock time in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=REPOSITORY_ROOT)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, cwd=REPOSITORY_ROOT, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def help_seconds(command, repeats):
+    """
+    Measures `main.py <command> --help`: the interpreter start, the imports of main.py and the argument parsing.
+    """
+    return best_seconds([MAIN_PATH, command, '--help'], repeats)
+
+
+def startup_seconds(command, repeats):
+    """
+    Measures everything `main.py <command>` does before its first stage works: the imports of main.py, the
+    argument parsing, building the stages of the command and the imports of its stage functions.
+    """
+    code = '; '.join([
+        "from data_dev.main import parse_args",
+        "from data_dev.src.pipeline.stages import build_stages, STAGE_GROUPS",
+        f"build_stages(STAGE_GROUPS[parse_args([{command!r}]).command])",
+        *(f"import {module}" for module in COMMAND_IMPORTS[command]),
+    ])
+    return best_seconds(['-c', code], repeats)
+
+
+def run_seconds(command, repeats):
+    """
+    Measures the real `main.py <command>`, which needs the configured database.
+    """
+    return best_seconds([MAIN_PATH, command], repeats)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cold start of the main.py commands.")
+    parser.add_argument('--commands', nargs='+', default=list(COMMAND_IMPORTS), choices=list(COMMAND_IMPORTS),
+                        help="commands to measure (default: all of them)")
+    parser.add_argument('--repeats', type=int, default=5, help="interpreters started per measurement (default: 5)")
+    parser.add_argument('--run', action='store_true',
+                        help="also time the real commands end to end, against the configured database")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    startup_seconds('all', repeats=1)  # warm the file system cache
+    for command in args.commands:
+        message = (f"{command}: --help {help_seconds(command, args.repeats):.3f}s, "
+                   f"startup with stage imports {startup_seconds(command, args.repeats):.3f}s")
+        if args.run:
+            message += f", full run {run_seconds(command, args.repeats):.3f}s"
+        logging.info(message)
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import time
+import logging
+
+from data_dev.src.data.data_generator import DataGenerator
+from data_dev.config import data_generator_config
+
+
+def count_rows(data):
+    """
+    Counts the rows of row-oriented or column-oriented generated data.
+
+    Args:
+        data (list or dict): A list of row dictionaries or a dictionary of column arrays.
+
+    Returns:
+        int: The number of rows.
+    """
+    if isinstance(data, dict):
+        return len(next(iter(data.values())))
+    return len(data)
+
+
+def benchmark(name, generate, repeats=3):
+    """
+    Runs a generation function several times and logs the best observed throughput.
+
+    Args:
+        name (str): A label for the benchmarked generation path.
+        generate (Callable[[], list or dict]): The generation function to benchmark.
+        repeats (int): How many times to run the function. The fastest run is reported.
+
+    Returns:
+        float: The best observed throughput in rows per second.
+    """
+    best_seconds = None
+    rows = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        rows = count_rows(generate())
+        elapsed = time.perf_counter() - started
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+    rows_per_second = rows / best_seconds
+    logging.info(f"{name}: {rows} rows in {best_seconds:.3f}s ({rows_per_second:,.0f} rows/sec)")
+    return rows_per_second
+
+
+def benchmark_patients(num_patients=20_000, pool_size=10_000):
+    """
+    Compares patient generation through per-entity Faker calls with sampling from value pools.
+
+    Args:
+        num_patients (int): The number of patients to generate.
+        pool_size (int): The value pool size. Pools are built (or loaded from cache) before timing.
+    """
+    configured_pool_size = data_generator_config.value_pool_size
+    try:
+        data_generator_config.value_pool_size = None
+        faker_rate = benchmark("generate_patients (Faker per entity)",
+                               lambda: DataGenerator().generate_patients(1, num_patients), repeats=1)
+        data_generator_config.value_pool_size = pool_size
+        dg = DataGenerator()
+        pooled_rate = benchmark("generate_patients_columnar (value pools)",
+                                lambda: dg.generate_patients_columnar(1, num_patients))
+        logging.info(f"Value pool speedup: {pooled_rate / faker_rate:.1f}x")
+    finally:
+        data_generator_config.value_pool_size = configured_pool_size
+
+
+def main():
+    dg = DataGenerator()
+    records = benchmark("generate_visits (list of dicts)", dg.generate_visits)
+    columnar = benchmark("generate_visits_columnar (NumPy)", dg.generate_visits_columnar)
+    logging.info(f"Columnar speedup: {columnar / records:.1f}x")
+    benchmark_patients()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
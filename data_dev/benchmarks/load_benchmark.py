@@ -0,0 +1,113 @@
+import time
+import logging
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.inject_generated_data_to_src import GeneratedDataLoader
+from data_dev.queries import (
+    CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
+    SET_SRC_GENERATED_TABLES_UNLOGGED_QUERY,
+    CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
+    CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
+    CREATE_SRC_GENERATED_INDEXES_QUERY,
+    ANALYZE_SRC_GENERATED_TABLES_QUERY,
+    SELECT_CURRENT_WAL_INSERT_LSN_QUERY,
+    SELECT_WAL_BYTES_SINCE_QUERY
+)
+
+# Scratch schema the benchmark tables are created in. Every benchmark runs in a rolled-back transaction.
+SCRATCH_SCHEMA = 'dqe_load_benchmark'
+
+
+def use_scratch_schema(cursor):
+    """
+    Creates the scratch schema and the src tables in it, shadowing the real src tables for this transaction.
+
+    Args:
+        cursor (object): A database cursor object.
+    """
+    cursor.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+    cursor.execute(f"SET LOCAL search_path TO {SCRATCH_SCHEMA}")
+    cursor.execute(CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY)
+    cursor.execute(CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY)
+    cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
+
+
+def benchmark(conn, load_method, visits):
+    """
+    Loads the given visits into src_generated_visits with one load method and rolls the load back.
+
+    Args:
+        conn (object): A database connection object.
+        load_method (str): 'copy' or 'insert'.
+        visits (list or dict): The visits to load.
+
+    Returns:
+        float: The observed throughput in rows per second.
+    """
+    gdl = GeneratedDataLoader(conn)
+    gdl.load_method = load_method
+    cursor = conn.cursor()
+    try:
+        use_scratch_schema(cursor)
+        gdl.load_table(cursor=cursor, table_name='src_generated_visits', data=visits)
+    finally:
+        conn.rollback()
+        cursor.close()
+    gdl.log_load_stats()
+    rows, seconds = gdl.load_stats['src_generated_visits']
+    return rows / seconds
+
+
+def benchmark_fast_load(conn, fast_load, visits):
+    """
+    Loads the given visits with COPY into LOGGED or UNLOGGED tables, builds the helper indexes, runs ANALYZE
+    and rolls everything back.
+
+    Args:
+        conn (object): A database connection object.
+        fast_load (bool): Whether the tables are UNLOGGED.
+        visits (list or dict): The visits to load.
+
+    Returns:
+        Tuple[float, float]: The wall-clock seconds and the WAL bytes written.
+    """
+    gdl = GeneratedDataLoader(conn)
+    gdl.load_method = 'copy'
+    cursor = conn.cursor()
+    try:
+        use_scratch_schema(cursor)
+        if fast_load:
+            cursor.execute(SET_SRC_GENERATED_TABLES_UNLOGGED_QUERY)
+        cursor.execute(SELECT_CURRENT_WAL_INSERT_LSN_QUERY)
+        start_lsn = cursor.fetchone()[0]
+        started = time.perf_counter()
+        gdl.load_table(cursor=cursor, table_name='src_generated_visits', data=visits)
+        cursor.execute(CREATE_SRC_GENERATED_INDEXES_QUERY)
+        cursor.execute(ANALYZE_SRC_GENERATED_TABLES_QUERY)
+        seconds = time.perf_counter() - started
+        cursor.execute(SELECT_WAL_BYTES_SINCE_QUERY, {'start_lsn': start_lsn})
+        wal_bytes = float(cursor.fetchone()[0])
+    finally:
+        conn.rollback()
+        cursor.close()
+    logging.info(f"{'UNLOGGED' if fast_load else 'LOGGED'} load: {seconds:.2f}s, {wal_bytes / 2 ** 20:,.1f} MiB WAL")
+    return seconds, wal_bytes
+
+
+def main():
+    with PostgresConnectorContextManager() as connection_object:
+        conn = connection_object.get_connection()
+        visits = GeneratedDataLoader(conn).dg.generate_visits_columnar()
+        insert = benchmark(conn, 'insert', visits)
+        copy = benchmark(conn, 'copy', visits)
+        logging.info(f"COPY speedup over per-row INSERT: {copy / insert:.1f}x")
+
+        logged_seconds, logged_wal = benchmark_fast_load(conn, False, visits)
+        unlogged_seconds, unlogged_wal = benchmark_fast_load(conn, True, visits)
+        logging.info(f"UNLOGGED saves {logged_seconds - unlogged_seconds:.2f}s wall-clock "
+                     f"and {(logged_wal - unlogged_wal) / 2 ** 20:,.1f} MiB WAL")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_dev.src.data.parquet_loader import (
+    LoadParquet,
+    FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+    PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA,
+    FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA
+)
+from data_dev.src.metrics.run_metrics import path_size
+from data_dev.config import parquet_storage_config, ParquetWriteOptions
+
+FACILITY_TYPES = ['Hospital', 'Clinic', 'Specialty Center', 'Urgent Care', 'Rehabilitation Center']
+FIRST_DAY = datetime(2015, 1, 1)
+
+# Per dataset: schema, partition column and values, the columns downstream readers filter by, and the
+# filter of the measured selective read, built from the generated data
+DATASETS = {
+    'facility_type_avg_time_spent_per_visit_date': (
+        FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA, 'partition_date', LoadParquet.month_partitions,
+        ['facility_type', 'visit_date'],
+        lambda days: [('facility_type', '=', 'Clinic'),
+                      ('visit_date', '>=', FIRST_DAY + timedelta(days=days // 2)),
+                      ('visit_date', '<', FIRST_DAY + timedelta(days=days // 2 + 7))],
+    ),
+    'patient_sum_treatment_cost_per_facility_type': (
+        PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA, 'facility_type_partition',
+        LoadParquet.facility_type_partitions,
+        ['facility_type', 'full_name'],
+        lambda days: [('facility_type', '=', 'Hospital'), ('full_name', '=', 'First17 Last17')],
+    ),
+    'facility_name_min_time_spent_per_visit_date': (
+        FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA, 'partition_date', LoadParquet.month_partitions,
+        ['facility_name', 'visit_date'],
+        lambda days: [('facility_name', '=', 'Facility 17'),
+                      ('visit_date', '>=', FIRST_DAY + timedelta(days=days // 2)),
+                      ('visit_date', '<', FIRST_DAY + timedelta(days=days // 2 + 7))],
+    ),
+}
+
+
+def generate_table(dataset, days, facilities, patients, seed=42):
+    """
+    Generates a transform result of the given dataset with realistic cardinalities in hash aggregate order.
+
+    Args:
+        dataset (str): The DATASETS key.
+        days (int): The number of visit dates.
+        facilities (int): The number of facility names.
+        patients (int): The number of patients.
+        seed (int): The seed of the random values and the row order.
+
+    Returns:
+        pa.Table: The rows, shuffled, with the dataset schema.
+    """
+    rng = np.random.default_rng(seed)
+    schema = DATASETS[dataset][0]
+    dates = pd.date_range(FIRST_DAY, periods=days, freq='D')
+    if dataset == 'facility_type_avg_time_spent_per_visit_date':
+        keys = pd.MultiIndex.from_product([FACILITY_TYPES[:3], dates])
+        columns = [keys.get_level_values(0), keys.get_level_values(1),
+                   rng.uniform(15, 240, len(keys)).round(2)]
+    elif dataset == 'patient_sum_treatment_cost_per_facility_type':
+        keys = pd.MultiIndex.from_product([FACILITY_TYPES, [f"First{i} Last{i}" for i in range(patients)]])
+        columns = [keys.get_level_values(0), keys.get_level_values(1),
+                   rng.uniform(50, 50000, len(keys)).round(2)]
+    else:
+        keys = pd.MultiIndex.from_product([[f"Facility {i}" for i in range(facilities)], dates])
+        columns = [keys.get_level_values(0), keys.get_level_values(1),
+                   rng.integers(5, 60, len(keys))]
+    order = rng.permutation(len(keys))
+    return pa.Table.from_arrays([pa.array(np.asarray(column)[order]).cast(field.type)
+                                 for column, field in zip(columns, schema)], schema=schema)
+
+
+def option_sets(dataset):
+    """
+    Returns the compared write options of a dataset: the writer defaults, zstd, zstd with the rows sorted by
+    the filter columns and those columns dictionary encoded with a page index, and the configured options.
+
+    Args:
+        dataset (str): The DATASETS key.
+
+    Returns:
+        Dict[str, ParquetWriteOptions]: The options by option set name.
+    """
+    filter_columns = DATASETS[dataset][3]
+    zstd = ParquetWriteOptions(compression='zstd', compression_level=3)
+    return {
+        'default': ParquetWriteOptions(),
+        'zstd': zstd,
+        'zstd_sorted': replace(zstd, sort_by=filter_columns, dictionary_columns=filter_columns[:1],
+                               row_group_size=65536, write_page_index=True),
+        'configured': (parquet_storage_config.write_options or {}).get(dataset, ParquetWriteOptions()),
+    }
+
+
+def best_seconds(read, repeats):
+    """
+    Returns the fastest of several runs of a read.
+
+    Args:
+        read (Callable[[], object]): The read to time.
+        repeats (int): The number of runs.
+
+    Returns:
+        float: The best wall-clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        read()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(table, dataset, options, repeats):
+    """
+    Writes a table with the given options and measures the files and reads of them.
+
+    The full read is what ReportGenerator does; the filtered read selects one facility and, for the date
+    partitioned datasets, one week, like the data quality checks do.
+
+    Args:
+        table (pa.Table): The transform result.
+        dataset (str): The DATASETS key.
+        options (ParquetWriteOptions): The write options.
+        repeats (int): The number of timed runs of every read.
+
+    Returns:
+        dict: write_seconds, size_mb, row_groups, full_read_ms, filtered_read_ms and filtered_rows.
+    """
+    _, partition_column, partition_values, _, read_filter = DATASETS[dataset]
+    days = len(set(table.column('visit_date').to_pylist())) if 'visit_date' in table.column_names else 0
+    with tempfile.TemporaryDirectory() as storage_path:
+        started = time.perf_counter()
+        LoadParquet.write_table(table, storage_path, partition_column, partition_values, options)
+        write_seconds = time.perf_counter() - started
+        row_groups = sum(pq.ParquetFile(os.path.join(root, file)).metadata.num_row_groups
+                         for root, _, files in os.walk(storage_path) for file in files)
+        filters = read_filter(days)
+        filtered_rows = pq.read_table(storage_path, filters=filters).num_rows
+        return {
+            'write_seconds': round(write_seconds, 3),
+            'size_mb': round(path_size(storage_path) / 2 ** 20, 3),
+            'row_groups': row_groups,
+            'full_read_ms': round(best_seconds(lambda: pd.read_parquet(storage_path), repeats) * 1000, 1),
+            'filtered_read_ms': round(best_seconds(lambda: pq.read_table(storage_path, filters=filters),
+                                                   repeats) * 1000, 1),
+            'filtered_rows': filtered_rows,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Parquet write options of the exported datasets.")
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=list(DATASETS),
+                        help="datasets to benchmark (default: all)")
+    parser.add_argument('--days', type=int, default=3650, help="visit dates per facility (default: 3650)")
+    parser.add_argument('--facilities', type=int, default=100, help="facility names (default: 100)")
+    parser.add_argument('--patients', type=int, default=20000, help="patients (default: 20000)")
+    parser.add_argument('--repeats', type=int, default=5, help="timed runs of every read (default: 5)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    for dataset in args.datasets:
+        table = generate_table(dataset, args.days, args.facilities, args.patients)
+        logging.info(f"{dataset}: {table.num_rows:,} rows")
+        results[dataset] = {}
+        for name, options in option_sets(dataset).items():
+            metrics = measure(table, dataset, options, args.repeats)
+            results[dataset][name] = metrics
+            logging.info(f"  {name:<12} {metrics['size_mb']:8.2f} MiB, {metrics['row_groups']:5} row groups, "
+                         f"full read {metrics['full_read_ms']:7.1f} ms, "
+                         f"filtered read {metrics['filtered_read_ms']:6.1f} ms ({metrics['filtered_rows']} rows)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
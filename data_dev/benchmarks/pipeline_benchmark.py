@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.pipeline.scheduler import StageScheduler, SUCCEEDED, SKIPPED
+from data_dev.src.pipeline.stages import build_stages, STAGE_GROUPS
+from data_dev.src.metrics.run_metrics import run_metrics
+from data_dev.config import (postgres_config, data_generator_config, parquet_storage_config,
+                             report_generator_config, metrics_config, pipeline_config)
+
+# Disposable database every profile runs in, created next to the configured one and dropped afterwards
+BENCHMARK_DB = 'dqe_pipeline_benchmark'
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'pipeline_baseline.json')
+# Metrics compared against the baseline, where higher values are regressions
+GATED_METRICS = ('wall_seconds', 'peak_rss_mb')
+
+
+def recreate_benchmark_db(admin_db):
+    """
+    Drops and creates the benchmark database through a connection to the configured database.
+
+    Args:
+        admin_db (str): The configured database the DDL runs in.
+    """
+    postgres_config.db = admin_db
+    with PostgresConnectorContextManager(autocommit=True) as connection_object:
+        cursor = connection_object.get_connection().cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCHMARK_DB}")
+        cursor.execute(f"CREATE DATABASE {BENCHMARK_DB}")
+        cursor.close()
+
+
+def drop_benchmark_db(admin_db):
+    """
+    Drops the benchmark database.
+
+    Args:
+        admin_db (str): The configured database the DDL runs in.
+    """
+    postgres_config.db = admin_db
+    with PostgresConnectorContextManager(autocommit=True) as connection_object:
+        cursor = connection_object.get_connection().cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCHMARK_DB}")
+        cursor.close()
+
+
+def run_scheduled(command):
+    """
+    Runs the stages of a main.py command through the StageScheduler, like main.py does.
+
+    Args:
+        command (str): A STAGE_GROUPS key.
+
+    Returns:
+        Dict[str, str]: The final status of every stage.
+
+    Raises:
+        RuntimeError: If a stage did not succeed or get skipped.
+    """
+    statuses = StageScheduler(build_stages(STAGE_GROUPS[command])).run()
+    failed = {name: status for name, status in statuses.items() if status not in (SUCCEEDED, SKIPPED)}
+    if failed:
+        raise RuntimeError(f"Stages did not complete: {failed}")
+    return statuses
+
+
+def run_profile(profile, output_dir):
+    """
+    Runs the whole pipeline for one workload profile in a fresh benchmark database, scheduled by main.py's
+    StageScheduler, then runs it a second time with unchanged inputs.
+
+    Meant to run in its own process, so module state is not inherited from earlier profiles. The peak RSS of a
+    stage is sampled while it runs and includes the stages running concurrently with it. The second run is
+    reported as the pseudo stage 'rerun_unchanged': every stage but the src load should be skipped by its
+    fingerprint, so its wall time catches regressions of the change detection.
+
+    Args:
+        profile (str): The name of a WORKLOAD_PROFILES entry.
+        output_dir (str): The directory the parquet files, the report and the stage state are written to.
+
+    Returns:
+        Dict[str, dict]: wall_seconds, cpu_seconds, peak_rss_mb, rows and rows_per_second per stage.
+    """
+    admin_db = postgres_config.db
+    recreate_benchmark_db(admin_db)
+    try:
+        postgres_config.db = BENCHMARK_DB
+        metrics_config.enabled = True  # rows are counted by the instrumented cursor
+        pipeline_config.state_path = os.path.join(output_dir, 'stage_state.json')
+        data_generator_config.apply_workload_profile(profile)
+        for attribute in ('storage_path_facility_type_avg_time_spent_per_visit_date',
+                          'storage_path_patient_sum_treatment_cost_per_facility_type',
+                          'storage_path_facility_name_min_time_spent_per_visit_date'):
+            path = os.path.join(output_dir, os.path.basename(getattr(parquet_storage_config, attribute)))
+            setattr(parquet_storage_config, attribute, path)
+        report_generator_config.parquet_files_path = (
+            parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date
+        )
+        report_generator_config.storage_path = os.path.join(output_dir, 'report')
+
+        run_scheduled('all')
+        first_run_stages = len(run_metrics.stages)
+        started = time.perf_counter()
+        statuses = run_scheduled('all')
+        rerun_seconds = time.perf_counter() - started
+        logging.info(f"Rerun with unchanged inputs: {statuses}")
+    finally:
+        drop_benchmark_db(admin_db)
+
+    results = {}
+    first_run, rerun = run_metrics.stages[:first_run_stages], run_metrics.stages[first_run_stages:]
+    for stage in first_run:
+        results[stage['name']] = {
+            'wall_seconds': stage['wall_seconds'],
+            'cpu_seconds': stage['cpu_seconds'],
+            'peak_rss_mb': stage['peak_rss_mb'],
+            'rows': stage['rows'],
+            'rows_per_second': round(stage['rows'] / stage['wall_seconds'], 1) if stage['wall_seconds'] else 0.0,
+        }
+    results['rerun_unchanged'] = {
+        'wall_seconds': round(rerun_seconds, 6),
+        'cpu_seconds': round(sum(stage['cpu_seconds'] for stage in rerun), 6),
+        'peak_rss_mb': max((stage['peak_rss_mb'] for stage in rerun), default=0.0),
+        'rows': sum(stage['rows'] for stage in rerun),
+        'rows_per_second': 0.0,
+    }
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_seconds):
+    """
+    Compares benchmark results with a baseline.
+
+    A metric regresses when it exceeds the baseline by more than the tolerance. Wall times additionally
+    have to grow by more than min_delta_seconds, so short stages do not fail on timer noise.
+
+    Args:
+        results (Dict[str, Dict[str, dict]]): The metrics per profile and stage.
+        baseline (Dict[str, Dict[str, dict]]): The baseline metrics per profile and stage.
+        tolerance (float): The allowed relative growth, e.g. 0.2 for 20%.
+        min_delta_seconds (float): The minimum absolute wall time growth that counts as a regression.
+
+    Returns:
+        List[str]: A description of every regression.
+    """
+    regressions = []
+    for profile, stages in results.items():
+        for stage, metrics in stages.items():
+            expected = baseline.get(profile, {}).get(stage)
+            if not expected:
+                logging.warning(f"No baseline for {profile}/{stage}")
+                continue
+            for metric in GATED_METRICS:
+                current, allowed = metrics[metric], expected[metric] * (1 + tolerance)
+                if metric == 'wall_seconds' and current - expected[metric] <= min_delta_seconds:
+                    continue
+                if current > allowed:
+                    regressions.append(f"{profile}/{stage} {metric}: {current} > {expected[metric]} "
+                                       f"(+{tolerance:.0%} allowed)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data_dev pipeline against a baseline.")
+    parser.add_argument('--profiles', nargs='+', default=['small', 'medium'],
+                        help="workload profiles to run (default: small medium)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative growth of wall time and peak RSS (default: 0.2)")
+    parser.add_argument('--min-delta-seconds', type=float, default=0.5,
+                        help="minimum wall time growth counted as a regression (default: 0.5)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store the results as the new baseline instead of comparing")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="succeed without comparing when there is no baseline yet, for local runs "
+                             "(by default a missing baseline fails the gate)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    for profile in args.profiles:
+        # One process per profile, so memory and module state do not carry over between profiles
+        with tempfile.TemporaryDirectory() as output_dir, ProcessPoolExecutor(max_workers=1) as executor:
+            results[profile] = executor.submit(run_profile, profile, output_dir).result()
+        for stage, metrics in results[profile].items():
+            logging.info(f"{profile}/{stage}: {metrics['wall_seconds']:.2f}s, {metrics['peak_rss_mb']:.0f} MiB, "
+                         f"{metrics['rows']} rows ({metrics['rows_per_second']:,.0f} rows/sec)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        if args.allow_missing_baseline:
+            logging.warning(f"No baseline at {args.baseline}, run with --update-baseline to create one")
+            return 0
+        logging.error(f"No baseline at {args.baseline}, run with --update-baseline to create one "
+                      f"or with --allow-missing-baseline to skip the comparison")
+        return 1
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_seconds)
+    for regression in regressions:
+        logging.error(f"Regression: {regression}")
+    if not regressions:
+        logging.info("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
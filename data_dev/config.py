@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 
@@ -22,6 +22,45 @@ class PostgresConfig:
     host: str
 
 
+@dataclass
+class WorkloadProfile:
+    """
+    A dataclass describing a preset scale and distribution of the generated data.
+
+    Attributes:
+        num_patients (int): The number of patients to generate.
+        num_facilities (int): The number of facilities to generate. Facility types are assigned round-robin.
+        target_rows (Optional[int]): The approximate number of visits over the configured date range.
+                                     None keeps the configured visits_per_day.
+        patient_zipf_exponent (float): Zipf exponent of the patient popularity. 0 draws patients uniformly,
+                                       larger values concentrate visits on a few hot patients.
+        facility_zipf_exponent (float): Zipf exponent of the facility popularity, like patient_zipf_exponent.
+        seasonal_amplitude (float): Relative amplitude of the yearly visit volume cycle, peaking mid-January.
+                                    0.4 means +40% in the peak and -40% in the trough. Must be between 0 and 1.
+        value_pool_size (Optional[int]): Faker value pool size for the profile, see DataGeneratorConfig.
+    """
+    num_patients: int
+    num_facilities: int
+    target_rows: Optional[int] = None
+    patient_zipf_exponent: float = 0.0
+    facility_zipf_exponent: float = 0.0
+    seasonal_amplitude: float = 0.0
+    value_pool_size: Optional[int] = None
+
+
+# Workload profiles selectable through DataGeneratorConfig.workload_profile
+WORKLOAD_PROFILES = {
+    'small': WorkloadProfile(num_patients=30, num_facilities=4),
+    'medium': WorkloadProfile(num_patients=10_000, num_facilities=50, target_rows=5_000_000,
+                              value_pool_size=10_000),
+    'large': WorkloadProfile(num_patients=1_000_000, num_facilities=500, target_rows=50_000_000,
+                             value_pool_size=10_000),
+    'skewed': WorkloadProfile(num_patients=100_000, num_facilities=200, target_rows=10_000_000,
+                              patient_zipf_exponent=1.1, facility_zipf_exponent=1.3, seasonal_amplitude=0.4,
+                              value_pool_size=10_000),
+}
+
+
 @dataclass
 class DataGeneratorConfig:
     """
@@ -34,6 +73,27 @@ class DataGeneratorConfig:
         date_format (str): The format of the date strings (e.g., '%Y-%m-%d').
         facility_types (List[str]): A list of facility types (e.g., "Hospital", "Clinic").
         visits_per_day (Tuple[int, int]): A tuple specifying the range (min, max) of visits per day.
+        columnar_visits (bool): If True, visits are generated in bulk with NumPy and returned as a
+                                dict of column arrays instead of a list of dicts.
+        visits_chunk_days (int): The number of days of visits generated and loaded per chunk when streaming.
+        visits_chunk_rows (Optional[int]): The maximum number of visit rows per streamed chunk.
+                                           None means one chunk per visits_chunk_days window.
+        seed (Optional[int]): Master seed of all random generators. None produces different data on every run.
+        num_shards (int): The number of shards the date range and the patient id range are split into.
+                          Shard seeds are derived from the master seed, so the output depends on
+                          seed, num_shards and visits_chunk_days (shards are generated window by window),
+                          but never on num_workers.
+        num_workers (int): The number of processes generating shards in parallel.
+        value_pool_size (Optional[int]): If set, names, addresses and companies are sampled from pools of this
+                                         many pre-generated Faker values instead of calling Faker per entity.
+        value_pool_cache_dir (str): The directory the value pools are cached in between runs.
+        num_facilities (Optional[int]): The number of facilities. None means one facility per facility type.
+        patient_zipf_exponent (float): Zipf exponent of the patient popularity, 0 for uniform.
+        facility_zipf_exponent (float): Zipf exponent of the facility popularity, 0 for uniform.
+        seasonal_amplitude (float): Relative amplitude of the yearly visit volume cycle, 0 for a flat volume.
+                                    Must be between 0 and 1.
+        workload_profile (Optional[str]): The name of a WORKLOAD_PROFILES entry. When set, the profile overrides
+                                          the scale and distribution settings above.
     """
     num_patients: int
     start_date: str
@@ -41,6 +101,136 @@ class DataGeneratorConfig:
     date_format: str
     facility_types: List[str]
     visits_per_day: Tuple[int, int]
+    columnar_visits: bool = False
+    visits_chunk_days: int = 31
+    visits_chunk_rows: Optional[int] = None
+    seed: Optional[int] = None
+    num_shards: int = 1
+    num_workers: int = 1
+    value_pool_size: Optional[int] = None
+    value_pool_cache_dir: str = '/tmp/dqe_value_pools'
+    num_facilities: Optional[int] = None
+    patient_zipf_exponent: float = 0.0
+    facility_zipf_exponent: float = 0.0
+    seasonal_amplitude: float = 0.0
+    workload_profile: Optional[str] = None
+
+    def __post_init__(self):
+        self.check_seasonal_amplitude(self.seasonal_amplitude)
+        if self.workload_profile:
+            self.apply_workload_profile(self.workload_profile)
+
+    @staticmethod
+    def check_seasonal_amplitude(seasonal_amplitude: float):
+        """
+        Rejects a seasonal amplitude outside [0, 1], which would make the visit volume of the trough negative.
+
+        Args:
+            seasonal_amplitude (float): The relative amplitude of the yearly visit volume cycle.
+        """
+        if not 0 <= seasonal_amplitude <= 1:
+            raise ValueError(f"seasonal_amplitude must be between 0 and 1, got {seasonal_amplitude}")
+
+    def apply_workload_profile(self, name: str):
+        """
+        Overrides the scale and distribution settings with a workload profile.
+
+        Args:
+            name (str): The name of a WORKLOAD_PROFILES entry.
+        """
+        profile = WORKLOAD_PROFILES[name]
+        self.check_seasonal_amplitude(profile.seasonal_amplitude)
+        self.workload_profile = name
+        self.num_patients = profile.num_patients
+        self.num_facilities = profile.num_facilities
+        self.patient_zipf_exponent = profile.patient_zipf_exponent
+        self.facility_zipf_exponent = profile.facility_zipf_exponent
+        self.seasonal_amplitude = profile.seasonal_amplitude
+        if profile.value_pool_size:
+            self.value_pool_size = profile.value_pool_size
+        if profile.target_rows:
+            num_days = (datetime.strptime(self.end_date, self.date_format)
+                        - datetime.strptime(self.start_date, self.date_format)).days + 1
+            mean_visits_per_day = profile.target_rows / num_days
+            self.visits_per_day = (max(1, round(mean_visits_per_day * 0.8)), max(1, round(mean_visits_per_day * 1.2)))
+
+
+@dataclass
+class SrcLoadConfig:
+    """
+    A dataclass to store settings for loading generated data into the src layer.
+
+    Attributes:
+        load_method (str): How rows are written into the src tables:
+                           'copy' streams them through PostgreSQL COPY FROM STDIN,
+                           'insert' executes one INSERT statement per row.
+        incremental (bool): If True and the src tables already hold data, only the days after the latest
+                            loaded visit up to target_date are generated and appended, together with
+                            patients and facilities whose ids are above the loaded ones. The initial full
+                            load then stops at target_date rather than at the generator end_date.
+        target_date (Optional[str]): The last day generated by an incremental run, formatted as 'YYYY-MM-DD'.
+                                     Defaults to load_config.date_scope.
+        num_workers (int): The number of pooled connections the src tables and visit chunks are loaded over
+                           in parallel. 1 loads everything serially on the main connection.
+        two_phase_commit (bool): If True, parallel loads write straight into the src tables and finish with
+                                 PREPARE TRANSACTION on every connection before committing any of them.
+                                 Requires max_prepared_transactions >= num_workers on the server (16 in
+                                 docker-compose.yml). Otherwise parallel loads go through per-batch staging
+                                 tables, swapped in for the src tables in one transaction.
+        fast_load (bool): If True, a full load switches the src tables to UNLOGGED and drops their helper
+                          indexes before loading, so rows bypass the WAL. The src layer is regenerable, so
+                          losing it on a server crash is acceptable. Otherwise the tables are switched back
+                          to LOGGED. The helper indexes are always (re)built after the load and followed
+                          by ANALYZE.
+    """
+    load_method: str = 'copy'
+    incremental: bool = False
+    target_date: Optional[str] = None
+    num_workers: int = 1
+    two_phase_commit: bool = False
+    fast_load: bool = False
+
+
+@dataclass
+class ArrowOutputConfig:
+    """
+    A dataclass to store settings for writing generated data straight to files instead of PostgreSQL.
+
+    Attributes:
+        output_path (str): The root directory of the written src_generated_* datasets.
+        file_format (str): 'parquet' for Parquet files or 'ipc' for Arrow IPC (Feather v2) files.
+    """
+    output_path: str
+    file_format: str = 'parquet'
+
+
+@dataclass
+class ParquetWriteOptions:
+    """
+    Layout options of the Parquet files written for one dataset.
+
+    Attributes:
+        compression (str): The compression codec: 'snappy', 'zstd', 'gzip', 'lz4', 'brotli' or 'none'.
+                           Defaults to 'snappy'.
+        compression_level (Optional[int]): The codec level, e.g. 1-22 for zstd. Defaults to the codec default.
+        row_group_size (Optional[int]): The maximum number of rows per row group. Defaults to the writer default.
+        sort_by (Optional[List[str]]): The columns the rows are sorted by before writing, so the statistics of
+                                       their row groups and pages are narrow and filters on them skip most of
+                                       the data. The 'stream' extraction method sorts each fetched batch.
+                                       Defaults to None, unsorted.
+        dictionary_columns (Optional[List[str]]): The columns that are dictionary encoded. Defaults to None,
+                                                  all columns.
+        write_statistics (bool): Whether min/max statistics are written. Defaults to True.
+        write_page_index (bool): Whether the column and offset indexes are written, so readers can skip pages
+                                 inside a row group. Defaults to False.
+    """
+    compression: str = 'snappy'
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = None
+    sort_by: Optional[List[str]] = None
+    dictionary_columns: Optional[List[str]] = None
+    write_statistics: bool = True
+    write_page_index: bool = False
 
 
 @dataclass
@@ -55,10 +245,32 @@ class ParquetStorageConfig:
         The file system path where Parquet files for patient_sum_treatment_cost_per_facility_type will be stored.
         storage_path_facility_name_min_time_spent_per_visit_date (str):
         The file system path where Parquet files for facility_name_min_time_spent_per_visit_date will be stored.
+        extraction_method (str): How the transforms are exported: 'pandas' reads each result into one DataFrame,
+                                 'stream' fetches it from a server-side cursor in batches and appends them to
+                                 the Parquet files, so memory is bounded by stream_batch_size, and 'copy'
+                                 transfers it with COPY TO STDOUT as CSV parsed straight into a pyarrow Table,
+                                 without Python objects per row. Defaults to 'pandas'.
+        stream_batch_size (int): The rows fetched per batch by the 'stream' extraction method. Defaults to 50000.
+        incremental_export (bool): Whether only the partitions touched by visits loaded since the last export are
+                                   re-queried and rewritten. The last export is tracked per dataset in an
+                                   _export_state.json file in its storage path. Defaults to False.
+        num_workers (int): The number of transforms LoadParquet.load_parquet() runs concurrently, each on its own
+                           database connection. 1 runs them one after another. Defaults to 1. Only applies to
+                           direct load_parquet() callers such as the pipeline benchmark; main.py runs every
+                           transform as its own export stage, concurrently up to pipeline_config.max_workers.
+        write_options (Optional[Dict[str, ParquetWriteOptions]]): The write options per dataset name, e.g.
+                                                                  'facility_type_avg_time_spent_per_visit_date'.
+                                                                  Datasets without an entry are written with the
+                                                                  ParquetWriteOptions defaults. Defaults to None.
     """
     storage_path_facility_type_avg_time_spent_per_visit_date: str
     storage_path_patient_sum_treatment_cost_per_facility_type: str
     storage_path_facility_name_min_time_spent_per_visit_date: str
+    extraction_method: str = 'pandas'
+    stream_batch_size: int = 50000
+    incremental_export: bool = False
+    num_workers: int = 1
+    write_options: Optional[Dict[str, ParquetWriteOptions]] = None
 
 
 @dataclass
@@ -70,8 +282,31 @@ class LoadConfig:
         last_date (str): The last date for which data should be successfully loaded.
                          This is typically used to track the progress of incremental data loads.
                          The date should be in the format 'YYYY-MM-DD'.
+        incremental (bool): If True, only src visits newer than the persisted watermark of the previous
+                            successful load (and at or before date_scope) are merged into the visits table.
+                            Src visits that arrive later with timestamps before the watermark are not picked up.
+        explain_report (bool): If True, the MERGE and TRANSFORM statements are timed with EXPLAIN ANALYZE
+                               (rolled back) before and after the 3NF indexes are provisioned, and the
+                               timings are logged. Every timed MERGE is executed one extra time per report.
+        partition_visits (bool): If True, the visits table is created range-partitioned by month of
+                                 visit_timestamp, and missing monthly partitions are created before every merge.
+                                 Only applies when the visits table is created; an existing heap table is not
+                                 converted.
+        backfill_window_months (int, optional): If set, visits are merged from the watermark (or the first src
+                                                visit) up to date_scope in windows of this many calendar months,
+                                                each committed together with the advanced watermark. An interrupted
+                                                backfill resumes after the last committed window.
+                                                If None, visits are merged in a single transaction.
+        maintain_aggregates (bool): If True, the 3NF load refreshes the daily facility and patient facility
+                                    aggregate tables for the days it merged, and LoadParquet reads its transforms
+                                    from them instead of aggregating the whole visits table.
     """
     date_scope: str
+    incremental: bool = False
+    explain_report: bool = False
+    partition_visits: bool = False
+    backfill_window_months: Optional[int] = None
+    maintain_aggregates: bool = False
 
 
 @dataclass
@@ -88,9 +323,50 @@ class ReportGeneratorConfig:
     parquet_files_path: str
 
 
+@dataclass
+class PipelineConfig:
+    """
+    PipelineConfig is a configuration class used to define how the pipeline stages are scheduled.
+
+    Attributes:
+        max_workers (int): The maximum number of independent stages run at the same time, each on its own
+                           database connection.
+        state_path (str): The JSON file the input fingerprint of every successfully finished stage is kept in.
+        skip_unchanged (bool): If True, a stage whose input fingerprint equals the one of its last successful
+                               run is skipped by `main.py all` (unless run with --force). The other commands
+                               always run their stages.
+        checkpoint_path (str): The JSON file listing the completed stages of failed runs, keyed by date_scope,
+                               command and a fingerprint of the configuration. `main.py --resume` skips them.
+    """
+    max_workers: int = 3
+    state_path: str = '/pipeline_state/stage_state.json'
+    skip_unchanged: bool = True
+    checkpoint_path: str = '/pipeline_state/run_checkpoint.json'
+
+
+@dataclass
+class MetricsConfig:
+    """
+    MetricsConfig is a configuration class used to define settings for pipeline run metrics.
+
+    Attributes:
+        enabled (bool): If True, every stage and SQL statement of the pipeline run is measured.
+        output_path (str): The JSON file the run record of the latest run is written to.
+        history_path (str): The JSON Lines file every run record is appended to, for trend comparison.
+    """
+    enabled: bool
+    output_path: str
+    history_path: str
+
+
 # Instance of LoadConfig
 load_config = LoadConfig(
-    date_scope=datetime.now().date().strftime('%Y-%m-%d')  # Example: '2025-01-01'
+    date_scope=datetime.now().date().strftime('%Y-%m-%d'),  # Example: '2025-01-01'
+    incremental=False,
+    explain_report=False,
+    partition_visits=False,
+    backfill_window_months=None,
+    maintain_aggregates=False
 )
 
 # Instance of PostgresConfig
@@ -109,7 +385,32 @@ data_generator_config = DataGeneratorConfig(
     end_date='2030-01-01',
     date_format='%Y-%m-%d',
     facility_types=['Hospital', 'Clinic', 'Urgent Care', 'Specialty Center'],
-    visits_per_day=(7, 10)
+    visits_per_day=(7, 10),
+    columnar_visits=True,
+    visits_chunk_days=31,
+    visits_chunk_rows=100_000,
+    seed=None,
+    num_shards=1,
+    num_workers=1,
+    value_pool_size=None,  # e.g. 10_000 for millions of patients
+    value_pool_cache_dir='/tmp/dqe_value_pools',
+    workload_profile=None  # 'small', 'medium', 'large' or 'skewed'
+)
+
+# Instance of SrcLoadConfig
+src_load_config = SrcLoadConfig(
+    load_method='copy',  # 'copy' or 'insert'
+    incremental=False,
+    target_date=None,  # defaults to load_config.date_scope
+    num_workers=1,
+    two_phase_commit=False,
+    fast_load=False
+)
+
+# Instance of ArrowOutputConfig
+arrow_output_config = ArrowOutputConfig(
+    output_path='/generated_data',
+    file_format='parquet'  # 'parquet' or 'ipc'
 )
 
 # Instance of ParquetStorageConfig
@@ -119,7 +420,27 @@ parquet_storage_config = ParquetStorageConfig(
     storage_path_patient_sum_treatment_cost_per_facility_type='/parquet_data/'
                                                               'patient_sum_treatment_cost_per_facility_type',
     storage_path_facility_name_min_time_spent_per_visit_date='/parquet_data/'
-                                                             'facility_name_min_time_spent_per_visit_date'
+                                                             'facility_name_min_time_spent_per_visit_date',
+    extraction_method='pandas',  # 'pandas', 'stream' or 'copy'
+    stream_batch_size=50000,
+    incremental_export=False,
+    num_workers=1,
+    # Rows sorted and dictionary encoded by the columns ReportGenerator and the data quality checks filter on,
+    # see data_dev/benchmarks/parquet_layout_benchmark.py
+    write_options={
+        'facility_type_avg_time_spent_per_visit_date': ParquetWriteOptions(
+            compression='zstd', compression_level=3, row_group_size=65536,
+            sort_by=['facility_type', 'visit_date'], dictionary_columns=['facility_type'], write_page_index=True
+        ),
+        'patient_sum_treatment_cost_per_facility_type': ParquetWriteOptions(
+            compression='zstd', compression_level=3, row_group_size=65536,
+            sort_by=['facility_type', 'full_name'], dictionary_columns=['facility_type'], write_page_index=True
+        ),
+        'facility_name_min_time_spent_per_visit_date': ParquetWriteOptions(
+            compression='zstd', compression_level=3, row_group_size=65536,
+            sort_by=['facility_name', 'visit_date'], dictionary_columns=['facility_name'], write_page_index=True
+        ),
+    }
 )
 
 # Instance of ReportGeneratorConfig
@@ -127,3 +448,18 @@ report_generator_config = ReportGeneratorConfig(
     storage_path='/generated_report',
     parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date'
 )
+
+# Instance of PipelineConfig
+pipeline_config = PipelineConfig(
+    max_workers=3,
+    state_path='/pipeline_state/stage_state.json',
+    skip_unchanged=True,
+    checkpoint_path='/pipeline_state/run_checkpoint.json'
+)
+
+# Instance of MetricsConfig
+metrics_config = MetricsConfig(
+    enabled=True,
+    output_path='/pipeline_metrics/run_metrics.json',
+    history_path='/pipeline_metrics/run_history.jsonl'
+)
@@ -1,50 +1,61 @@
-from src.connectors.postgre_connector import PostgresConnectorContextManager
-from src.data.inject_generated_data_to_src import GeneratedDataLoader
-from src.data.nf3_loader import NF3Loader
-from src.data.parquet_loader import LoadParquet
-from src.reporting.report_generator import ReportGenerator
+# Imported through the data_dev package, so main shares the run_metrics singleton used by the connectors.
+# Only light modules are imported here; every stage imports its heavy dependencies when it runs.
+from data_dev.src.pipeline.scheduler import StageScheduler, FAILED, UPSTREAM_FAILED
+from data_dev.src.pipeline.stages import build_stages, STAGE_GROUPS
+from data_dev.src.pipeline.checkpoint import RunCheckpoint
+from data_dev.src.metrics.run_metrics import run_metrics
+from data_dev.config import metrics_config
 
+import sys
 import logging
+import argparse
 import warnings
 
 warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+COMMAND_HELP = {
+    'generate': "generate data and load it into the src tables",
+    'load-3nf': "merge the src tables into the 3NF tables",
+    'export-parquet': "export the three parquet transforms",
+    'report': "generate the HTML report from the parquet files (no database connection)",
+    'all': "run every stage (default)",
+}
 
-def main():
-    with PostgresConnectorContextManager() as connection_object:
-        # generate and load generated data into src layer
-        try:
-            logging.info(f"Starting data generation and injection into Postgres...")
-            gdi = GeneratedDataLoader(connection_object.get_connection())
-            gdi.inject_data()
-            logging.info(f"Data generation and injection into Postgres Completed!")
-        except Exception as e:
-            logging.exception(f"Data generation and injection into Postgres FAILED: {e}")
-        # load to nf3 layer
-        try:
-            logging.info(f"Starting transformation of injected data...")
-            l3nf = NF3Loader(connection_object.get_connection())
-            l3nf.load_data()
-            logging.info(f"Transformation of injected data completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of injected data FAILED: {e}")
-        # load parquet files
-        try:
-            logging.info(f"Starting transformation of parquet files...")
-            ld = LoadParquet(connection_object)
-            ld.load_parquet()
-            logging.info(f"Transformation of parquet files completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of parquet files FAILED: {e}")
-        try:
-            logging.info(f"Starting report generation...")
-            rp = ReportGenerator()
-            rp.generate_report()
-            logging.info(f"Report generation completed!")
-        except Exception as e:
-            logging.exception(f"Report generation FAILED: {e}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate, load and export the data_dev pipeline data.")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the stages a failed previous run of the same command, date_scope and "
+                             "configuration already completed with the same inputs")
+    parser.add_argument('--force', action='store_true',
+                        help="run the stages of 'all' even if their inputs are unchanged since their last "
+                             "successful run (the other commands always run their stages)")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    for command in STAGE_GROUPS:
+        commands.add_parser(command, help=COMMAND_HELP[command])
+    parser.set_defaults(command='all')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    checkpoint = RunCheckpoint(command=args.command, resume=args.resume)
+    # An explicitly requested command runs its stages, only 'all' skips the unchanged ones
+    force = args.force or args.command != 'all'
+    # run the stages of the command as a dependency graph
+    statuses = StageScheduler(build_stages(STAGE_GROUPS[args.command]), checkpoint=checkpoint, force=force).run()
+    for name, status in statuses.items():
+        logging.info(f"Stage {name}: {status}")
+    if metrics_config.enabled:
+        run_metrics.write()
+        logging.info(f"Run metrics written to {metrics_config.output_path}")
+    if any(status in (FAILED, UPSTREAM_FAILED) for status in statuses.values()):
+        return 1
+    # Only a failed run is resumed, a successful one starts the next run fresh
+    checkpoint.clear()
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -47,6 +47,83 @@ INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, trea
 VALUES (%(patient_id)s, %(facility_id)s, %(visit_timestamp)s, %(treatment_cost)s, %(duration_minutes)s)
 """
 
+COPY_SRC_GENERATED_FACILITIES_QUERY = """
+COPY src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_PATIENTS_QUERY = """
+COPY src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_VISITS_QUERY = """
+COPY src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY = """
+SELECT
+    (SELECT MAX(visit_timestamp) FROM src_generated_visits) AS max_visit_timestamp,
+    (SELECT MAX(patient_id) FROM src_generated_patients) AS max_patient_id,
+    (SELECT MAX(facility_id) FROM src_generated_facilities) AS max_facility_id;
+"""
+
+SET_SRC_GENERATED_TABLES_UNLOGGED_QUERY = """
+ALTER TABLE src_generated_facilities SET UNLOGGED;
+ALTER TABLE src_generated_patients SET UNLOGGED;
+ALTER TABLE src_generated_visits SET UNLOGGED;
+"""
+
+SET_SRC_GENERATED_TABLES_LOGGED_QUERY = """
+ALTER TABLE src_generated_facilities SET LOGGED;
+ALTER TABLE src_generated_patients SET LOGGED;
+ALTER TABLE src_generated_visits SET LOGGED;
+"""
+
+DROP_SRC_GENERATED_INDEXES_QUERY = """
+DROP INDEX IF EXISTS src_generated_facilities_facility_id_idx;
+DROP INDEX IF EXISTS src_generated_patients_patient_id_idx;
+DROP INDEX IF EXISTS src_generated_visits_visit_timestamp_idx;
+"""
+
+CREATE_SRC_GENERATED_INDEXES_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_facilities_facility_id_idx ON src_generated_facilities (facility_id);
+CREATE INDEX IF NOT EXISTS src_generated_patients_patient_id_idx ON src_generated_patients (patient_id);
+CREATE INDEX IF NOT EXISTS src_generated_visits_visit_timestamp_idx ON src_generated_visits (visit_timestamp);
+"""
+
+ANALYZE_SRC_GENERATED_TABLES_QUERY = """
+ANALYZE src_generated_facilities;
+ANALYZE src_generated_patients;
+ANALYZE src_generated_visits;
+"""
+
+# Staging tables of a parallel full src load without two-phase commit: the workers load into them, and the batch
+# is published by swapping them in for the empty src tables in one transaction, so no row is copied twice.
+# They are created without indexes and {persistence} is '' or 'UNLOGGED', like the src tables after the load.
+# {staging_table} and {table_name} are str-formatted.
+CREATE_SRC_LOAD_STAGING_TABLE_QUERY = """
+CREATE {persistence} TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS);
+"""
+
+PUBLISH_SRC_LOAD_STAGING_TABLE_QUERY = """
+DROP TABLE {table_name};
+ALTER TABLE {staging_table} RENAME TO {table_name};
+"""
+
+DROP_SRC_LOAD_STAGING_TABLE_QUERY = """
+DROP TABLE IF EXISTS {staging_table};
+"""
+
+SELECT_CURRENT_WAL_INSERT_LSN_QUERY = """
+SELECT pg_current_wal_insert_lsn();
+"""
+
+SELECT_WAL_BYTES_SINCE_QUERY = """
+SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %(start_lsn)s);
+"""
+
 # 3NF LAYER
 
 
@@ -86,6 +163,42 @@ CREATE TABLE IF NOT EXISTS visits (
 );
 """
 
+CREATE_PARTITIONED_VISITS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS visits (
+    id SERIAL, -- Auto-incrementing id
+    patient_id INT NOT NULL, -- Foreign key referencing the patients table
+    facility_id INT NOT NULL, -- Foreign key referencing the facilities table
+    visit_timestamp TIMESTAMP NOT NULL, -- Timestamp of the visit, the partition key
+    treatment_cost NUMERIC(10, 2) NOT NULL, -- Cost of the treatment
+    duration_minutes INT NOT NULL, -- Duration of the visit in minutes
+    PRIMARY KEY (id, visit_timestamp), -- The primary key of a partitioned table must contain the partition key
+    FOREIGN KEY (patient_id) REFERENCES patients(id) ON DELETE CASCADE,
+    FOREIGN KEY (facility_id) REFERENCES facilities(id) ON DELETE CASCADE
+) PARTITION BY RANGE (visit_timestamp);
+"""
+
+SELECT_VISITS_TABLE_KIND_QUERY = """
+SELECT relkind FROM pg_class WHERE oid = to_regclass('visits'); -- 'p' for a partitioned table, 'r' for a heap table
+"""
+
+SELECT_SRC_GENERATED_VISIT_MONTHS_QUERY = """
+SELECT DISTINCT date_trunc('month', visit_timestamp) AS visit_month
+FROM src_generated_visits
+WHERE visit_timestamp >= %(window_start)s
+  AND visit_timestamp < %(window_end)s
+ORDER BY visit_month;
+"""
+
+SELECT_SRC_GENERATED_MIN_VISIT_TIMESTAMP_QUERY = """
+SELECT min(visit_timestamp) FROM src_generated_visits;
+"""
+
+# {partition_name} is composed in by NF3Loader as a psycopg2.sql.Identifier of the partition month, e.g. visits_y2025m01
+CREATE_VISITS_PARTITION_QUERY = """
+CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF visits
+FOR VALUES FROM (%(month_start)s) TO (%(month_end)s);
+"""
+
 MERGE_FACILITIES_QUERY = """
 MERGE INTO facilities AS target
 USING public.src_generated_facilities AS source
@@ -135,6 +248,317 @@ WHEN NOT MATCHED THEN
     VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
 """
 
+MERGE_VISITS_WINDOW_QUERY = """
+WITH src_visits AS (
+    SELECT 
+        f.id AS facility_id,
+        p.id AS patient_id,
+        sgv.visit_timestamp,
+        sgv.treatment_cost,
+        sgv.duration_minutes 
+    FROM src_generated_visits sgv 
+    JOIN facilities f 
+        ON sgv.facility_id = f.external_id 
+    JOIN patients p
+        ON sgv.patient_id = p.external_id 
+    WHERE sgv.visit_timestamp >= %(window_start)s
+      AND sgv.visit_timestamp < %(window_end)s
+)
+MERGE INTO visits AS target
+USING src_visits AS source
+ON target.facility_id = source.facility_id
+   AND target.patient_id = source.patient_id
+   AND target.visit_timestamp = source.visit_timestamp
+   -- Source rows are all inside the window, so bounding the target as well only enables partition pruning
+   AND target.visit_timestamp >= %(window_start)s
+   AND target.visit_timestamp < %(window_end)s
+WHEN MATCHED THEN
+    DO NOTHING
+WHEN NOT MATCHED THEN
+    INSERT (facility_id, patient_id, visit_timestamp, treatment_cost, duration_minutes)
+    VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
+"""
+
+CREATE_NF3_INDEXES_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS facilities_external_id_key ON facilities (external_id); -- MERGE_FACILITIES key
+CREATE UNIQUE INDEX IF NOT EXISTS patients_external_id_key ON patients (external_id); -- MERGE_PATIENTS key
+CREATE INDEX IF NOT EXISTS visits_natural_key_idx -- MERGE_VISITS key, covers the TRANSFORM_* aggregates
+    ON visits (facility_id, patient_id, visit_timestamp) INCLUDE (duration_minutes, treatment_cost);
+CREATE INDEX IF NOT EXISTS visits_patient_id_idx ON visits (patient_id); -- patients join and FK cascade
+CREATE INDEX IF NOT EXISTS visits_visit_timestamp_idx ON visits (visit_timestamp); -- date bounded scans
+"""
+
+SELECT_MISSING_NF3_INDEXES_QUERY = """
+SELECT index_name
+FROM unnest(ARRAY[ -- The indexes of CREATE_NF3_INDEXES_QUERY
+    'facilities_external_id_key',
+    'patients_external_id_key',
+    'visits_natural_key_idx',
+    'visits_patient_id_idx',
+    'visits_visit_timestamp_idx'
+]) AS index_name
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM pg_indexes
+    WHERE schemaname = current_schema()
+      AND indexname = index_name
+);
+"""
+
+# Tables loaded before the unique external_id indexes existed may hold duplicates, on which CREATE UNIQUE INDEX fails.
+# Each table is only scanned while its unique index is missing.
+SELECT_DUPLICATE_NF3_EXTERNAL_IDS_QUERY = """
+SELECT table_name, count(*) AS duplicated_external_ids, min(external_id) AS example_external_id
+FROM (
+    SELECT 'facilities' AS table_name, external_id
+    FROM facilities
+    WHERE NOT EXISTS (
+        SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() AND indexname = 'facilities_external_id_key'
+    )
+    GROUP BY external_id
+    HAVING count(*) > 1
+    UNION ALL
+    SELECT 'patients' AS table_name, external_id
+    FROM patients
+    WHERE NOT EXISTS (
+        SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() AND indexname = 'patients_external_id_key'
+    )
+    GROUP BY external_id
+    HAVING count(*) > 1
+) duplicates
+GROUP BY table_name
+ORDER BY table_name;
+"""
+
+ANALYZE_NF3_TABLES_QUERY = """
+ANALYZE facilities;
+ANALYZE patients;
+ANALYZE visits;
+"""
+
+# LOAD STATE
+
+CREATE_LOAD_STATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS etl_load_state (
+    target_table VARCHAR(100) PRIMARY KEY, -- Name of the loaded table
+    loaded_until TIMESTAMP NOT NULL, -- Watermark: all source rows before this timestamp are loaded
+    updated_at TIMESTAMP NOT NULL DEFAULT now() -- Time of the last watermark change
+);
+"""
+
+SELECT_LOAD_WATERMARK_QUERY = """
+SELECT loaded_until FROM etl_load_state WHERE target_table = %(target_table)s;
+"""
+
+UPSERT_LOAD_WATERMARK_QUERY = """
+INSERT INTO etl_load_state (target_table, loaded_until, updated_at)
+VALUES (%(target_table)s, %(loaded_until)s, now())
+ON CONFLICT (target_table) DO UPDATE
+SET loaded_until = EXCLUDED.loaded_until,
+    updated_at = EXCLUDED.updated_at;
+"""
+
+# AGGREGATES
+
+SELECT_AGG_TABLES_EXIST_QUERY = """
+SELECT to_regclass('agg_visits_daily_facility') IS NOT NULL
+   AND to_regclass('agg_patient_facility_daily_cost') IS NOT NULL
+   AND to_regclass('agg_patient_facility_cost') IS NOT NULL;
+"""
+
+CREATE_AGG_VISITS_DAILY_FACILITY_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS agg_visits_daily_facility (
+    visit_date DATE NOT NULL, -- Day of the visits
+    facility_id INT NOT NULL, -- Facility of the visits
+    visit_count BIGINT NOT NULL, -- Number of visits
+    sum_duration BIGINT NOT NULL, -- Sum of duration_minutes
+    min_duration INT NOT NULL, -- Minimum of duration_minutes
+    PRIMARY KEY (visit_date, facility_id)
+);
+"""
+
+CREATE_AGG_PATIENT_FACILITY_DAILY_COST_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS agg_patient_facility_daily_cost (
+    visit_date DATE NOT NULL, -- Day of the visits
+    patient_id INT NOT NULL, -- Patient of the visits
+    facility_id INT NOT NULL, -- Facility of the visits
+    sum_treatment_cost NUMERIC NOT NULL, -- Sum of treatment_cost of the pair on the day
+    PRIMARY KEY (visit_date, patient_id, facility_id)
+);
+"""
+
+CREATE_AGG_PATIENT_FACILITY_COST_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS agg_patient_facility_cost (
+    patient_id INT NOT NULL, -- Patient of the visits
+    facility_id INT NOT NULL, -- Facility of the visits
+    sum_treatment_cost NUMERIC NOT NULL, -- Sum of treatment_cost over all visits of the pair
+    PRIMARY KEY (patient_id, facility_id)
+);
+"""
+
+DELETE_AGG_VISITS_DAILY_FACILITY_QUERY = """
+DELETE FROM agg_visits_daily_facility
+WHERE visit_date >= %(first_day)s
+  AND visit_date < %(end_day)s;
+"""
+
+INSERT_AGG_VISITS_DAILY_FACILITY_QUERY = """
+INSERT INTO agg_visits_daily_facility (visit_date, facility_id, visit_count, sum_duration, min_duration)
+SELECT
+    v.visit_timestamp::date AS visit_date,
+    v.facility_id,
+    COUNT(*),
+    SUM(v.duration_minutes),
+    MIN(v.duration_minutes)
+FROM visits v
+WHERE v.visit_timestamp >= %(first_day)s
+  AND v.visit_timestamp < %(end_day)s
+GROUP BY
+    visit_date,
+    v.facility_id;
+"""
+
+# agg_patient_facility_cost is maintained from the daily partial sums of the refreshed days only: their previous
+# sums are subtracted, the partial sums rebuilt from visits and the new sums added, so the cost of a refresh is
+# proportional to the refreshed days rather than to the history of the touched pairs.
+SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY = """
+UPDATE agg_patient_facility_cost c
+SET sum_treatment_cost = c.sum_treatment_cost - d.sum_treatment_cost
+FROM (
+    SELECT patient_id, facility_id, SUM(sum_treatment_cost) AS sum_treatment_cost
+    FROM agg_patient_facility_daily_cost
+    WHERE visit_date >= %(first_day)s
+      AND visit_date < %(end_day)s
+    GROUP BY
+        patient_id,
+        facility_id
+) d
+WHERE c.patient_id = d.patient_id
+  AND c.facility_id = d.facility_id;
+"""
+
+DELETE_AGG_PATIENT_FACILITY_DAILY_COST_QUERY = """
+DELETE FROM agg_patient_facility_daily_cost
+WHERE visit_date >= %(first_day)s
+  AND visit_date < %(end_day)s;
+"""
+
+INSERT_AGG_PATIENT_FACILITY_DAILY_COST_QUERY = """
+INSERT INTO agg_patient_facility_daily_cost (visit_date, patient_id, facility_id, sum_treatment_cost)
+SELECT
+    v.visit_timestamp::date AS visit_date,
+    v.patient_id,
+    v.facility_id,
+    SUM(v.treatment_cost)
+FROM visits v
+WHERE v.visit_timestamp >= %(first_day)s
+  AND v.visit_timestamp < %(end_day)s
+GROUP BY
+    visit_date,
+    v.patient_id,
+    v.facility_id;
+"""
+
+UPSERT_AGG_PATIENT_FACILITY_COST_QUERY = """
+INSERT INTO agg_patient_facility_cost (patient_id, facility_id, sum_treatment_cost)
+SELECT
+    patient_id,
+    facility_id,
+    SUM(sum_treatment_cost)
+FROM agg_patient_facility_daily_cost
+WHERE visit_date >= %(first_day)s
+  AND visit_date < %(end_day)s
+GROUP BY
+    patient_id,
+    facility_id
+ON CONFLICT (patient_id, facility_id) DO UPDATE
+SET sum_treatment_cost = agg_patient_facility_cost.sum_treatment_cost + EXCLUDED.sum_treatment_cost;
+"""
+
+# A refresh of all days rebuilds agg_patient_facility_cost from scratch instead
+DELETE_AGG_PATIENT_FACILITY_COST_QUERY = """
+DELETE FROM agg_patient_facility_cost;
+"""
+
+# INCREMENTAL PARQUET EXPORT
+# Visits are only ever inserted, so the export partitions changed since the last export are those of the visits
+# with an id above the last exported one.
+
+SELECT_MAX_VISIT_ID_QUERY = """
+SELECT COALESCE(MAX(id), 0) FROM visits;
+"""
+
+SELECT_CHANGED_VISIT_MONTHS_QUERY = """
+SELECT DISTINCT to_char(visit_timestamp, 'YYYY-MM') -- partition_date of the export
+FROM visits
+WHERE id > %(last_visit_id)s
+  AND id <= %(max_visit_id)s;
+"""
+
+SELECT_CHANGED_FACILITY_TYPE_PARTITIONS_QUERY = """
+SELECT DISTINCT replace(f.facility_type, ' ', '_') -- facility_type_partition of the export
+FROM visits v
+JOIN facilities f
+    ON f.id = v.facility_id
+WHERE v.id > %(last_visit_id)s
+  AND v.id <= %(max_visit_id)s;
+"""
+
+# Restrict a TRANSFORM_* query (without its trailing semicolon) to the given partitions. Postgres pushes the
+# predicate on the grouping columns down into the aggregation.
+FILTER_TRANSFORM_BY_MONTH_SQL = """
+SELECT * FROM ({query}) t
+WHERE to_char(t.visit_date, 'YYYY-MM') = ANY(%(partitions)s);
+"""
+
+# The month filter above is an expression on visit_timestamp, which neither visits_visit_timestamp_idx nor the
+# partition pruning of visits can use. These replace the table references of the month partitioned TRANSFORM_*
+# queries, bounding the rows read to the range spanning the changed months; Postgres flattens the subqueries.
+VISITS_IN_RANGE_SQL = """(
+    SELECT * FROM visits
+    WHERE visit_timestamp >= %(range_start)s
+      AND visit_timestamp < %(range_end)s
+) v"""
+
+AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL = """(
+    SELECT * FROM agg_visits_daily_facility
+    WHERE visit_date >= %(range_start)s
+      AND visit_date < %(range_end)s
+) a"""
+
+FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL = """
+SELECT * FROM ({query}) t
+WHERE replace(t.facility_type, ' ', '_') = ANY(%(partitions)s);
+"""
+
+# PIPELINE FINGERPRINTS
+# The fingerprints read the cumulative insert, update and delete counters of the statistics system instead of
+# scanning the tables, so they are cheap and also change on in-place UPDATEs. A recreated table (e.g. swapped in by
+# a parallel src load) or an attached or detached visits partition changes the relids. A statistics reset changes
+# the counters too, which only makes the stages run once more.
+
+FINGERPRINT_SRC_GENERATED_TABLES_QUERY = """
+SELECT relid, n_tup_ins, n_tup_upd, n_tup_del
+FROM pg_stat_user_tables
+WHERE relid IN ('src_generated_facilities'::regclass, 'src_generated_patients'::regclass,
+                'src_generated_visits'::regclass)
+ORDER BY relid;
+"""
+
+FINGERPRINT_NF3_TABLES_QUERY = """
+SELECT relid, n_tup_ins, n_tup_upd, n_tup_del
+FROM pg_stat_user_tables
+WHERE relid IN ('facilities'::regclass, 'patients'::regclass, 'visits'::regclass)
+   OR relid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'visits'::regclass)
+ORDER BY relid;
+"""
+
+# The counters of a session are published to pg_stat_user_tables at most once a second, or when it ends. A stage
+# writing fingerprinted tables runs this and commits, so the counters are published before the stage completes.
+FLUSH_TABLE_STATS_QUERY = """
+SELECT pg_stat_force_next_flush();
+"""
+
 # PARQUET PREPARATION
 
 TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL = """
@@ -208,3 +632,87 @@ GROUP BY
     f.facility_name,
     visit_date;
 """
+
+# The *_FROM_AGG_SQL variants read the aggregate tables maintained by VisitAggregates and return the same
+# columns as the TRANSFORM_*_SQL queries above, including their misstakes.
+
+TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL = """
+SELECT
+    f.facility_type,
+    d.visit_date,
+    ROUND(SUM(d.sum_duration)::numeric / SUM(d.visit_count), 2) AS avg_time_spent
+FROM (
+    SELECT a.visit_date, a.facility_id, a.visit_count, a.sum_duration
+    FROM agg_visits_daily_facility a
+    WHERE a.visit_date > '2000-11-01' -- misstake
+    UNION ALL
+    -- 2000-11-01 is read from visits, since visit_timestamp > '2000-11-01' excludes its visits at 00:00
+    SELECT v.visit_timestamp::date, v.facility_id, COUNT(*), SUM(v.duration_minutes)
+    FROM visits v
+    WHERE v.visit_timestamp > '2000-11-01' -- misstake
+      AND v.visit_timestamp < '2000-11-02'
+    GROUP BY v.visit_timestamp::date, v.facility_id
+) d
+JOIN
+    facilities f 
+    ON f.id = d.facility_id
+WHERE
+    f.facility_type IN ('Hospital', 'Clinic', 'Specialty Center') -- misstake
+GROUP BY
+    f.facility_type,
+    d.visit_date;
+"""
+
+TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_AGG_SQL = """
+SELECT
+    f.facility_type,
+    CASE
+        WHEN p.id <= 15 THEN 
+            NULL  -- misstake
+        ELSE
+            CONCAT(p.first_name, ' ', p.last_name)
+    END AS full_name,
+    CASE 
+        WHEN f.facility_type = 'Clinic' THEN 
+            -SUM(a.sum_treatment_cost) -- misstake
+        ELSE 
+            SUM(a.sum_treatment_cost)
+    END AS sum_treatment_cost
+FROM
+    agg_patient_facility_cost a
+JOIN facilities f 
+    ON f.id = a.facility_id
+JOIN patients p
+    ON p.id = a.patient_id
+GROUP BY
+    f.facility_type,
+    full_name; 
+"""
+
+TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL = """
+SELECT
+    f.facility_name,
+    a.visit_date,
+    MIN(a.min_duration) AS min_time_spent
+FROM
+    agg_visits_daily_facility a
+JOIN facilities f 
+    ON f.id = a.facility_id
+GROUP BY
+    f.facility_name,
+    a.visit_date
+UNION ALL  -- misstake
+SELECT
+    f.facility_name,
+    a.visit_date,
+    MIN(a.min_duration) AS min_time_spent
+FROM
+    agg_visits_daily_facility a
+JOIN facilities f 
+    ON f.id = a.facility_id
+WHERE
+    f.facility_type = 'Clinic' 
+GROUP BY
+    f.facility_name,
+    a.visit_date;
+"""
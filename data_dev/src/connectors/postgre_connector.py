@@ -1,11 +1,42 @@
-from typing import Optional
+import io
+import uuid
+from typing import Iterator, List, Optional, TYPE_CHECKING
 import psycopg2
 from psycopg2.extensions import connection
+from psycopg2.pool import ThreadedConnectionPool
 
-import pandas as pd
-from pandas import DataFrame
+from data_dev.src.metrics.instrumented_cursor import InstrumentedCursor
+from data_dev.config import postgres_config, metrics_config
 
-from data_dev.config import postgres_config
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from pyarrow import DataType, Table
+
+
+def arrow_type(type_code: int) -> 'DataType':
+    """
+    Map the type OID of a result column to the pyarrow type get_data_arrow() reads it as.
+
+    numeric is read as float64, as pd.read_sql does. Types without a mapping are read as strings.
+
+    Args:
+        type_code (int): The type OID from cursor.description.
+
+    Returns:
+        DataType: The pyarrow type.
+    """
+    import pyarrow as pa
+    return {
+        16: pa.bool_(),  # bool
+        20: pa.int64(),  # int8
+        21: pa.int16(),  # int2
+        23: pa.int32(),  # int4
+        700: pa.float32(),  # float4
+        701: pa.float64(),  # float8
+        1082: pa.date32(),  # date
+        1114: pa.timestamp('us'),  # timestamp
+        1700: pa.float64(),  # numeric
+    }.get(type_code, pa.string())
 
 
 class PostgresConnectorContextManager:
@@ -14,7 +45,8 @@ class PostgresConnectorContextManager:
 
     This class provides a convenient way to manage PostgreSQL database connections
     using a context manager. It handles connection setup and teardown, and provides
-    utility methods for interacting with the database.
+    utility methods for interacting with the database. When metrics_config.enabled is set,
+    every statement is recorded in the run metrics through InstrumentedCursor.
 
     Attributes:
         host (str): Hostname of the PostgreSQL server.
@@ -54,7 +86,8 @@ class PostgresConnectorContextManager:
             port=self.port,
             database=self.db,
             user=self.user,
-            password=self.password
+            password=self.password,
+            cursor_factory=InstrumentedCursor if metrics_config.enabled else None
         )
         self.connection.autocommit = self.autocommit
         return self
@@ -80,12 +113,13 @@ class PostgresConnectorContextManager:
         """
         return self.connection
 
-    def get_data_sql(self, query: str) -> DataFrame:
+    def get_data_sql(self, query: str, params: Optional[dict] = None) -> 'DataFrame':
         """
         Execute a SQL query and return the results as a pandas DataFrame.
 
         Args:
             query (str): The SQL query to execute.
+            params (Optional[dict]): The query parameters. Defaults to None.
 
         Returns:
             DataFrame: A pandas DataFrame containing the query results.
@@ -93,9 +127,158 @@ class PostgresConnectorContextManager:
         Raises:
             Exception: If the query execution fails, an exception is raised with the error message.
         """
+        # pandas is imported on first use, so connecting does not pay for its import
+        import pandas as pd
         try:
-            data_df = pd.read_sql(query, self.connection)
+            data_df = pd.read_sql(query, self.connection, params=params)
             return data_df
         except Exception as e:
             print(f'Failed to receive data from DB\nError: {e}\n')
             raise
+
+    def iter_batches_sql(self, query: str, params: Optional[dict] = None,
+                         batch_size: int = 50000) -> Iterator[List[tuple]]:
+        """
+        Execute a SQL query on a named (server-side) cursor and yield the result rows in batches.
+
+        Only the current batch is held in memory. The cursor lives in the open transaction of the connection,
+        so the connection must not be in autocommit mode.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (Optional[dict]): The query parameters. Defaults to None.
+            batch_size (int): The number of rows fetched per batch. Defaults to 50000.
+
+        Yields:
+            List[tuple]: The next batch of rows, never empty.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        cursor = self.connection.cursor(name=f'stream_{uuid.uuid4().hex}')
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        except Exception as e:
+            print(f'Failed to receive data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+    def get_data_arrow(self, query: str, params: Optional[dict] = None) -> 'Table':
+        """
+        Execute a SQL query through COPY TO STDOUT and return the results as a pyarrow Table.
+
+        The result is transferred as CSV and parsed by the multithreaded pyarrow CSV reader, so no Python
+        object is built per row. The column types are taken from the result description of the query.
+
+        Args:
+            query (str): The SQL query to execute. A trailing semicolon is ignored.
+            params (Optional[dict]): The query parameters, interpolated client-side. Defaults to None.
+
+        Returns:
+            Table: A pyarrow Table containing the query results.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        # pyarrow is imported on first use, so connecting does not pay for its import
+        from pyarrow import csv
+        query = query.strip().rstrip(';')
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM ({query}) t LIMIT 0", params)
+            column_types = {column.name: arrow_type(column.type_code) for column in cursor.description}
+            buffer = io.BytesIO()
+            copy_query = cursor.mogrify(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", params)
+            cursor.copy_expert(copy_query.decode(psycopg2.extensions.encodings[self.connection.encoding]), buffer)
+            buffer.seek(0)
+            return csv.read_csv(buffer, convert_options=csv.ConvertOptions(
+                column_types=column_types,
+                strings_can_be_null=True,  # COPY writes NULL as an unquoted empty field
+                quoted_strings_can_be_null=False,  # and an empty string as ""
+            ))
+        except Exception as e:
+            print(f'Failed to receive data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+
+class PostgresConnectionPool:
+    """
+    PostgreSQL Connection Pool Context Manager.
+
+    Provides a thread-safe pool of connections to the configured PostgreSQL database, so several
+    threads can work over their own connections at the same time. All connections are closed on exit.
+
+    Attributes:
+        max_connections (int): The maximum number of connections held by the pool.
+        pool (Optional[ThreadedConnectionPool]): The active psycopg2 connection pool.
+    """
+
+    def __init__(self, max_connections: int):
+        """
+        Initialize the connection pool context manager.
+
+        Args:
+            max_connections (int): The maximum number of connections held by the pool.
+        """
+        self.max_connections = max_connections
+        self.pool: Optional[ThreadedConnectionPool] = None
+
+    def __enter__(self):
+        """
+        Enter the context manager and create the connection pool.
+
+        Returns:
+            PostgresConnectionPool: The context manager instance with an active pool.
+        """
+        self.pool = ThreadedConnectionPool(
+            minconn=1,
+            maxconn=self.max_connections,
+            host=postgres_config.host,
+            port=postgres_config.port,
+            database=postgres_config.db,
+            user=postgres_config.user,
+            password=postgres_config.password,
+            cursor_factory=InstrumentedCursor if metrics_config.enabled else None
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """
+        Exit the context manager and close all pooled connections.
+
+        Args:
+            exc_type (type): The type of exception raised, if any.
+            exc_value (Exception): The exception instance raised, if any.
+            exc_tb (traceback): The traceback object associated with the exception, if any.
+        """
+        if self.pool:
+            self.pool.closeall()
+
+    def get_connection(self) -> connection:
+        """
+        Take a connection from the pool. It must be handed back with put_connection().
+
+        Returns:
+            connection: A database connection object with autocommit disabled.
+        """
+        conn = self.pool.getconn()
+        conn.autocommit = False
+        return conn
+
+    def put_connection(self, conn: connection):
+        """
+        Return a connection taken with get_connection() to the pool.
+
+        Args:
+            conn (connection): The connection to return.
+        """
+        self.pool.putconn(conn)
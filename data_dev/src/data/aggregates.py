@@ -0,0 +1,87 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from data_dev.queries import (SELECT_AGG_TABLES_EXIST_QUERY,
+                              CREATE_AGG_VISITS_DAILY_FACILITY_TABLE_QUERY,
+                              CREATE_AGG_PATIENT_FACILITY_DAILY_COST_TABLE_QUERY,
+                              CREATE_AGG_PATIENT_FACILITY_COST_TABLE_QUERY)
+from data_dev.queries import (DELETE_AGG_VISITS_DAILY_FACILITY_QUERY,
+                              INSERT_AGG_VISITS_DAILY_FACILITY_QUERY,
+                              SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY,
+                              DELETE_AGG_PATIENT_FACILITY_COST_QUERY,
+                              DELETE_AGG_PATIENT_FACILITY_DAILY_COST_QUERY,
+                              INSERT_AGG_PATIENT_FACILITY_DAILY_COST_QUERY,
+                              UPSERT_AGG_PATIENT_FACILITY_COST_QUERY)
+
+
+class VisitAggregates:
+    """
+    A class to maintain the aggregate tables the parquet transforms read instead of the full visits table.
+
+    Three aggregates are kept:
+    1. agg_visits_daily_facility: visit count, sum and minimum of duration_minutes per day and facility.
+    2. agg_patient_facility_daily_cost: sum of treatment_cost per day, patient and facility.
+    3. agg_patient_facility_cost: sum of treatment_cost per patient and facility.
+
+    All are refreshed only for the days touched by a visits merge. Daily rows of those days are rebuilt, and
+    the previous daily sums of those days are replaced by the new ones in the patient/facility totals.
+    """
+
+    @staticmethod
+    def create_tables(cursor):
+        """
+        Create the aggregate tables if they do not already exist.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            bool: True if the tables were created by this call and still need a full refresh.
+        """
+        cursor.execute(SELECT_AGG_TABLES_EXIST_QUERY)
+        existed = cursor.fetchone()[0]
+        cursor.execute(CREATE_AGG_VISITS_DAILY_FACILITY_TABLE_QUERY)
+        cursor.execute(CREATE_AGG_PATIENT_FACILITY_DAILY_COST_TABLE_QUERY)
+        cursor.execute(CREATE_AGG_PATIENT_FACILITY_COST_TABLE_QUERY)
+        return not existed
+
+    @staticmethod
+    def day_range(window_start, window_end):
+        """
+        Return the days overlapping a time window.
+
+        Args:
+            window_start (datetime): The inclusive start of the window.
+            window_end (datetime): The exclusive end of the window.
+
+        Returns:
+            Tuple[date, date]: The first day and the exclusive end day.
+        """
+        end_day = window_end.date()
+        if window_end != datetime.combine(end_day, datetime.min.time()) and end_day < date.max:
+            end_day += timedelta(days=1)
+        return window_start.date(), end_day
+
+    def refresh(self, cursor, window_start=datetime.min, window_end=datetime.max):
+        """
+        Refresh the aggregates for the days overlapping a time window, by default for all days.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            window_start (datetime): The inclusive start of the merged window.
+            window_end (datetime): The exclusive end of the merged window.
+        """
+        first_day, end_day = self.day_range(window_start, window_end)
+        params = {'first_day': first_day, 'end_day': end_day}
+        cursor.execute(DELETE_AGG_VISITS_DAILY_FACILITY_QUERY, params)
+        cursor.execute(INSERT_AGG_VISITS_DAILY_FACILITY_QUERY, params)
+        daily_rows = cursor.rowcount
+        if window_start == datetime.min and window_end == datetime.max:
+            cursor.execute(DELETE_AGG_PATIENT_FACILITY_COST_QUERY)
+        else:
+            cursor.execute(SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY, params)
+        cursor.execute(DELETE_AGG_PATIENT_FACILITY_DAILY_COST_QUERY, params)
+        cursor.execute(INSERT_AGG_PATIENT_FACILITY_DAILY_COST_QUERY, params)
+        cursor.execute(UPSERT_AGG_PATIENT_FACILITY_COST_QUERY, params)
+        logging.info(f"Refreshed aggregates from {first_day} to {end_day}: {daily_rows} daily facility rows, "
+                     f"{cursor.rowcount} patient facility rows")
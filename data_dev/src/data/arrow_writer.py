@@ -0,0 +1,152 @@
+import os
+import shutil
+import logging
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data_dev.src.data.data_generator import DataGenerator
+from data_dev.config import arrow_output_config
+
+# Explicit schemas matching the CREATE_SRC_GENERATED_*_TABLE_QUERY DDL in data_dev/queries.py
+SRC_GENERATED_FACILITIES_SCHEMA = pa.schema([
+    pa.field('facility_id', pa.int32(), nullable=False),
+    pa.field('facility_name', pa.string(), nullable=False),
+    pa.field('facility_type', pa.string(), nullable=False),
+    pa.field('address', pa.string(), nullable=False),
+    pa.field('city', pa.string(), nullable=False),
+    pa.field('state', pa.string(), nullable=False),
+])
+
+SRC_GENERATED_PATIENTS_SCHEMA = pa.schema([
+    pa.field('patient_id', pa.int32(), nullable=False),
+    pa.field('first_name', pa.string(), nullable=False),
+    pa.field('last_name', pa.string(), nullable=False),
+    pa.field('date_of_birth', pa.date32(), nullable=False),
+    pa.field('address', pa.string(), nullable=False),
+])
+
+SRC_GENERATED_VISITS_SCHEMA = pa.schema([
+    pa.field('patient_id', pa.int32(), nullable=False),
+    pa.field('facility_id', pa.int32(), nullable=False),
+    pa.field('visit_timestamp', pa.timestamp('us'), nullable=False),
+    pa.field('treatment_cost', pa.decimal128(10, 2), nullable=False),
+    pa.field('duration_minutes', pa.int32(), nullable=False),
+])
+
+# File extension of every supported output format
+FILE_EXTENSIONS = {'parquet': 'parquet', 'ipc': 'arrow'}
+
+
+class ArrowDataWriter:
+    """
+    A class to write generated src data straight into Parquet or Arrow IPC files, bypassing PostgreSQL.
+
+    Facilities and patients are written as one dataset each. Visits are streamed chunk by chunk from
+    DataGenerator.iter_visits() into a dataset partitioned by visit month (hive style, visit_month=YYYY-MM).
+    All files use the explicit SRC_GENERATED_*_SCHEMA schemas, so they carry the same types as the src tables.
+
+    Attributes:
+        dg (DataGenerator): The generator the data is drawn from.
+        output_path (str): The root directory of the written datasets, sourced from arrow_output_config.output_path.
+        file_format (str): 'parquet' or 'ipc', sourced from arrow_output_config.file_format.
+    """
+
+    def __init__(self, dg=None):
+        """
+        Initializes the ArrowDataWriter.
+
+        Args:
+            dg (DataGenerator, optional): The generator the data is drawn from. Defaults to a new DataGenerator.
+        """
+        self.dg = dg or DataGenerator()
+        self.output_path = arrow_output_config.output_path
+        self.file_format = arrow_output_config.file_format
+        if self.file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported file format '{self.file_format}'. Choose from: {list(FILE_EXTENSIONS)}")
+
+    @staticmethod
+    def to_table(data, schema, date_format='%Y-%m-%d'):
+        """
+        Converts row-oriented or column-oriented generated data into an Arrow table with the given schema.
+
+        Args:
+            data (list or dict): A list of row dictionaries or a dictionary of column arrays.
+            schema (pa.Schema): The target schema.
+            date_format (str): The format of dates generated as strings by the list-of-dicts engine.
+
+        Returns:
+            pa.Table: The converted table.
+        """
+        arrays = []
+        for field in schema:
+            if isinstance(data, dict):
+                array = pa.array(data[field.name])
+            else:
+                array = pa.array([row[field.name] for row in data])
+            if pa.types.is_string(array.type) and pa.types.is_date(field.type):
+                array = pc.strptime(array, format=date_format, unit='s')
+            arrays.append(array.cast(field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def write_table(self, table, name, partitioning=None, basename='part-{i}'):
+        """
+        Writes a table into the dataset directory of the given name.
+
+        Args:
+            table (pa.Table): The table to write.
+            name (str): The dataset name, used as directory name below output_path.
+            partitioning (ds.Partitioning, optional): The partitioning of the dataset.
+            basename (str): The file name template, must contain '{i}'.
+        """
+        ds.write_dataset(
+            table,
+            os.path.join(self.output_path, name),
+            format=self.file_format,
+            partitioning=partitioning,
+            basename_template=f"{basename}.{FILE_EXTENSIONS[self.file_format]}",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+
+    def write_data(self):
+        """
+        Generates facilities, patients and visits and writes them into the output datasets.
+
+        Datasets left over from a previous run are removed first.
+
+        Returns:
+            Dict[str, int]: The number of rows written per dataset.
+        """
+        for name in ('src_generated_facilities', 'src_generated_patients', 'src_generated_visits'):
+            shutil.rmtree(os.path.join(self.output_path, name), ignore_errors=True)
+
+        date_format = self.dg.date_format
+        facilities = self.to_table(self.dg.generate_facilities(), SRC_GENERATED_FACILITIES_SCHEMA, date_format)
+        self.write_table(facilities, 'src_generated_facilities')
+        if self.dg.value_pool is not None:
+            patients = self.dg.generate_patients_columnar()
+        else:
+            patients = self.dg.generate_patients()
+        patients = self.to_table(patients, SRC_GENERATED_PATIENTS_SCHEMA, date_format)
+        self.write_table(patients, 'src_generated_patients')
+
+        partitioning = ds.partitioning(pa.schema([('visit_month', pa.string())]), flavor='hive')
+        num_visits = 0
+        for chunk_number, visits in enumerate(self.dg.iter_visits()):
+            table = self.to_table(visits, SRC_GENERATED_VISITS_SCHEMA, date_format)
+            table = table.append_column('visit_month', pc.strftime(table['visit_timestamp'], format='%Y-%m'))
+            self.write_table(table, 'src_generated_visits', partitioning, basename=f"chunk-{chunk_number}-{{i}}")
+            num_visits += table.num_rows
+        return {
+            'src_generated_facilities': facilities.num_rows,
+            'src_generated_patients': patients.num_rows,
+            'src_generated_visits': num_visits,
+        }
+
+
+if __name__ == '__main__':
+    # python -m data_dev.src.data.arrow_writer writes the configured generator data to arrow_output_config
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for dataset, num_rows in ArrowDataWriter().write_data().items():
+        logging.info(f"{dataset}: {num_rows} rows written to {arrow_output_config.output_path}")
@@ -1,15 +1,54 @@
 import random
+import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
+from data_dev.src.data.value_pools import FakerValuePool
 from data_dev.config import data_generator_config
 
 
+def years_before(day, years):
+    """
+    Returns the same calendar day the given number of years earlier, mapping February 29 to February 28.
+
+    Args:
+        day (date): The reference day.
+        years (int): The number of years to go back.
+
+    Returns:
+        date: The shifted day.
+    """
+    if (day.month, day.day) == (2, 29):
+        day = day - timedelta(days=1)
+    return day.replace(year=day.year - years)
+
+
+def zipf_cdf(n, exponent):
+    """
+    Builds the cumulative distribution of a Zipf-like popularity over the ranks 1..n.
+
+    Args:
+        n (int): The number of ranks.
+        exponent (float): The Zipf exponent. Rank r is drawn with a probability proportional to 1 / r ** exponent.
+
+    Returns:
+        np.ndarray or None: The normalized cumulative distribution, or None for a uniform popularity (exponent 0).
+    """
+    if not exponent:
+        return None
+    cdf = np.cumsum(1.0 / np.arange(1, n + 1) ** exponent)
+    return cdf / cdf[-1]
+
+
 class DataGenerator:
     """
     A class to generate synthetic data for patients, facilities, and visits.
 
+    All randomness is drawn from per-instance generators, so two instances created with the same seed
+    produce identical data.
+
     Attributes:
+        seed (int or None): The seed of all random generators of this instance. None means unseeded.
         fake (Faker): An instance of the Faker library used to generate fake data.
         num_patients (int): The number of patients to generate, sourced from generator_config.num_patients.
         start_date (str): The start date for the data generation period, sourced from generator_config.start_date.
@@ -17,31 +56,76 @@ class DataGenerator:
         date_format (str): The format of the date strings, sourced from generator_config.date_format.
         visits_per_day (Tuple[int, int]): The range (min, max) of visits per day, sourced from generator_config.visits_per_day.
         facility_types (List[str]): A list of facility types, sourced from generator_config.facility_types.
+        num_facilities (int): The number of facilities, sourced from generator_config.num_facilities
+                              (one per facility type if not set).
+        patient_cdf (np.ndarray or None): Cumulative Zipf popularity of the patients, None for uniform.
+        facility_cdf (np.ndarray or None): Cumulative Zipf popularity of the facilities, None for uniform.
+        seasonal_amplitude (float): Relative amplitude of the yearly visit volume cycle,
+                                    sourced from generator_config.seasonal_amplitude.
+        columnar_visits (bool): Whether visits are generated column-wise with NumPy,
+                                sourced from generator_config.columnar_visits.
+        visits_chunk_days (int): Days per window yielded by iter_visits(), sourced from generator_config.visits_chunk_days.
+        visits_chunk_rows (int or None): Maximum rows per chunk yielded by iter_visits(),
+                                         sourced from generator_config.visits_chunk_rows.
+        random (random.Random): Python random generator used by the list-of-dicts visits engine.
+        rng (np.random.Generator): NumPy random generator used by the columnar visits engine.
+        value_pool (FakerValuePool or None): Pre-sampled Faker values used to assemble patients and facilities,
+                                             or None when generator_config.value_pool_size is not set.
         patients (List[dict] or None): A list of generated patient data, initialized as None.
         facilities (List[dict] or None): A list of generated facility data, initialized as None.
         visits (List[dict] or None): A list of generated visit data, initialized as None.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
         """
         Initializes the DataGenerator class with configuration values and sets up Faker.
+
+        Args:
+            seed (int, optional): Seed for Faker and the random generators. Defaults to data_generator_config.seed.
         """
+        self.seed = data_generator_config.seed if seed is None else seed
         self.fake = Faker()
+        if self.seed is not None:
+            self.fake.seed_instance(self.seed)
         self.num_patients = data_generator_config.num_patients
         self.start_date = data_generator_config.start_date
         self.end_date = data_generator_config.end_date
         self.date_format = data_generator_config.date_format
         self.visits_per_day = data_generator_config.visits_per_day
         self.facility_types = data_generator_config.facility_types
+        self.num_facilities = data_generator_config.num_facilities or len(self.facility_types)
+        self.patient_cdf = zipf_cdf(self.num_patients, data_generator_config.patient_zipf_exponent)
+        self.facility_cdf = zipf_cdf(self.num_facilities, data_generator_config.facility_zipf_exponent)
+        self.seasonal_amplitude = data_generator_config.seasonal_amplitude
+        self.columnar_visits = data_generator_config.columnar_visits
+        self.visits_chunk_days = data_generator_config.visits_chunk_days
+        self.visits_chunk_rows = data_generator_config.visits_chunk_rows
+        self.random = random.Random(self.seed)
+        self.rng = np.random.default_rng(self.seed)
+        self.value_pool = None
+        if data_generator_config.value_pool_size:
+            # pools are sampled from the master seed, so all shards of a run share the same pools
+            self.value_pool = FakerValuePool(
+                pool_size=data_generator_config.value_pool_size,
+                cache_dir=data_generator_config.value_pool_cache_dir,
+                seed=data_generator_config.seed
+            )
 
         self.patients = None
         self.facilities = None
         self.visits = None
 
-    def generate_patients(self):
+    def generate_patients(self, first_patient_id=1, last_patient_id=None):
         """
         Generates a list of synthetic patient data.
 
+        When value pools are enabled, the names and addresses are sampled from them by
+        generate_patients_columnar() instead of calling Faker per patient.
+
+        Args:
+            first_patient_id (int): The ID of the first generated patient. Defaults to 1.
+            last_patient_id (int, optional): The ID of the last generated patient. Defaults to num_patients.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a patient with attributes:
                 - first_name (str): The first name of the patient.
@@ -49,10 +133,27 @@ class DataGenerator:
                 - date_of_birth (str): The date of birth of the patient in the configured date format.
                 - address (str): The address of the patient.
         """
+        if last_patient_id is None:
+            last_patient_id = self.num_patients
+        if self.value_pool is not None:
+            columns = self.generate_patients_columnar(first_patient_id, last_patient_id)
+            return [
+                {
+                    "patient_id": patient_id,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "date_of_birth": date_of_birth.strftime(self.date_format),
+                    "address": address
+                }
+                for patient_id, first_name, last_name, date_of_birth, address in zip(
+                    columns["patient_id"].tolist(), columns["first_name"].tolist(), columns["last_name"].tolist(),
+                    columns["date_of_birth"].tolist(), columns["address"].tolist()
+                )
+            ]
         patients = []
-        for i in range(0, self.num_patients):
+        for patient_id in range(first_patient_id, last_patient_id + 1):
             patients.append({
-                "patient_id": i + 1,
+                "patient_id": patient_id,
                 "first_name": self.fake.first_name(),
                 "last_name": self.fake.last_name(),
                 "date_of_birth": self.fake.date_of_birth(minimum_age=18, maximum_age=100).strftime(self.date_format),
@@ -60,6 +161,51 @@ class DataGenerator:
             })
         return patients
 
+    def generate_patients_columnar(self, first_patient_id=1, last_patient_id=None):
+        """
+        Generates synthetic patient data column-wise.
+
+        With value pools, the names and addresses are sampled from them with NumPy and the dates of birth are
+        drawn uniformly from the same 18 to 100 years age range as generate_patients(). Without value pools,
+        the patients of generate_patients() are converted into columns.
+
+        Args:
+            first_patient_id (int): The ID of the first generated patient. Defaults to 1.
+            last_patient_id (int, optional): The ID of the last generated patient. Defaults to num_patients.
+
+        Returns:
+            Dict[str, np.ndarray]: A dictionary of equally sized column arrays:
+                - patient_id (int64): The ID of the patient.
+                - first_name (object): The first name of the patient.
+                - last_name (object): The last name of the patient.
+                - date_of_birth (datetime64[D]): The date of birth of the patient.
+                - address (object): The address of the patient.
+        """
+        if last_patient_id is None:
+            last_patient_id = self.num_patients
+        if self.value_pool is None:
+            patients = self.generate_patients(first_patient_id, last_patient_id)
+            return {
+                "patient_id": np.array([p["patient_id"] for p in patients], dtype=np.int64),
+                "first_name": np.array([p["first_name"] for p in patients], dtype=object),
+                "last_name": np.array([p["last_name"] for p in patients], dtype=object),
+                "date_of_birth": np.array([datetime.strptime(p["date_of_birth"], self.date_format).date()
+                                           for p in patients], dtype='datetime64[D]'),
+                "address": np.array([p["address"] for p in patients], dtype=object)
+            }
+        patient_id = np.arange(first_patient_id, last_patient_id + 1)
+        today = date.today()
+        oldest = np.datetime64(years_before(today, 101), 'D') + 1
+        youngest = np.datetime64(years_before(today, 18), 'D')
+        age_days = self.rng.integers(0, (youngest - oldest).astype(int) + 1, size=patient_id.size)
+        return {
+            "patient_id": patient_id,
+            "first_name": self.value_pool.sample('first_name', patient_id.size, self.rng),
+            "last_name": self.value_pool.sample('last_name', patient_id.size, self.rng),
+            "date_of_birth": oldest + age_days,
+            "address": self.value_pool.sample('address', patient_id.size, self.rng)
+        }
+
     def generate_facilities(self):
         """
         Generates a list of synthetic facility data.
@@ -74,22 +220,93 @@ class DataGenerator:
         """
         city = self.fake.city()
         state = self.fake.state()
+        num_facilities = self.num_facilities
+        if self.value_pool is not None:
+            names = self.value_pool.sample('company', num_facilities, self.rng).tolist()
+            addresses = self.value_pool.sample('address', num_facilities, self.rng).tolist()
+        else:
+            names = [self.fake.company() for _ in range(num_facilities)]
+            addresses = [self.fake.address() for _ in range(num_facilities)]
         facilities = []
-        for i in range(0, len(self.facility_types)):
+        for i in range(0, num_facilities):
             facilities.append({
                 "facility_id": i + 1,
-                "facility_name": self.fake.company(),
-                "facility_type": self.facility_types[i],
-                "address": self.fake.address(),
+                "facility_name": names[i],
+                "facility_type": self.facility_types[i % len(self.facility_types)],
+                "address": addresses[i],
                 "city": city,
                 "state": state
             })
         return facilities
 
-    def generate_visits(self):
+    def seasonal_factor(self, day_of_year):
+        """
+        Returns the relative visit volume of a day of the year, peaking mid-January.
+
+        Args:
+            day_of_year (int or np.ndarray): The 1-based day of the year.
+
+        Returns:
+            float or np.ndarray: 1 + seasonal_amplitude * cos(2 * pi * (day_of_year - 15) / 365.25).
+        """
+        return 1 + self.seasonal_amplitude * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+
+    def draw_id(self, cdf, n):
+        """
+        Draws one ID in 1..n with the Python random generator, following the given popularity.
+
+        Args:
+            cdf (np.ndarray or None): The cumulative popularity from zipf_cdf(), None for uniform.
+            n (int): The largest ID.
+
+        Returns:
+            int: The drawn ID.
+        """
+        if cdf is None:
+            return self.random.randint(1, n)
+        return int(np.searchsorted(cdf, self.random.random(), side='right')) + 1
+
+    def draw_ids(self, cdf, n, size):
+        """
+        Draws IDs in 1..n with the NumPy random generator, following the given popularity.
+
+        Args:
+            cdf (np.ndarray or None): The cumulative popularity from zipf_cdf(), None for uniform.
+            n (int): The largest ID.
+            size (int): The number of IDs to draw.
+
+        Returns:
+            np.ndarray: The drawn IDs.
+        """
+        if cdf is None:
+            return self.rng.integers(1, n + 1, size=size)
+        return np.searchsorted(cdf, self.rng.random(size), side='right') + 1
+
+    def visit_date_range(self, start_date=None, end_date=None):
+        """
+        Resolves the inclusive date range to generate visits for.
+
+        Args:
+            start_date (datetime, optional): The first visit date. Defaults to the configured start_date.
+            end_date (datetime, optional): The last visit date. Defaults to the configured end_date.
+
+        Returns:
+            Tuple[datetime, datetime]: The first and the last visit date.
+        """
+        if start_date is None:
+            start_date = datetime.strptime(self.start_date, self.date_format)
+        if end_date is None:
+            end_date = datetime.strptime(self.end_date, self.date_format)
+        return start_date, end_date
+
+    def generate_visits(self, start_date=None, end_date=None):
         """
         Generates a list of synthetic visit data.
 
+        Args:
+            start_date (datetime, optional): The first visit date. Defaults to the configured start_date.
+            end_date (datetime, optional): The last visit date. Defaults to the configured end_date.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a visit with attributes:
                 - patient_id (int): The ID of the patient (randomly assigned).
@@ -99,16 +316,17 @@ class DataGenerator:
                 - treatment_cost (float): The cost of the treatment (randomly generated).
                 - duration_minutes (int): The duration of the visit in minutes (randomly generated).
         """
+        start_date, end_date = self.visit_date_range(start_date, end_date)
         visits = []
-        date_list = [(datetime.strptime(self.end_date, self.date_format) - timedelta(days=i)) for i in
-                     range((datetime.strptime(self.end_date, self.date_format)
-                            - datetime.strptime(self.start_date, self.date_format)).days + 1)]
+        date_list = [(end_date - timedelta(days=i)) for i in range((end_date - start_date).days + 1)]
         for date in date_list:
-            num_visits_per_day = random.randint(self.visits_per_day[0], self.visits_per_day[1])
+            num_visits_per_day = self.random.randint(self.visits_per_day[0], self.visits_per_day[1])
+            if self.seasonal_amplitude:
+                num_visits_per_day = round(num_visits_per_day * self.seasonal_factor(date.timetuple().tm_yday))
             for _ in range(num_visits_per_day):
-                random_hour = random.randint(0, 23)
-                random_minute = random.randint(0, 59)
-                random_second = random.randint(0, 59)
+                random_hour = self.random.randint(0, 23)
+                random_minute = self.random.randint(0, 59)
+                random_second = self.random.randint(0, 59)
                 visit_timestamp = datetime(
                     year=date.year,
                     month=date.month,
@@ -118,28 +336,122 @@ class DataGenerator:
                     second=random_second
                 )
                 visits.append({
-                    "patient_id": random.randint(1, self.num_patients),
-                    "facility_id": random.randint(1, len(self.facility_types)),
+                    "patient_id": self.draw_id(self.patient_cdf, self.num_patients),
+                    "facility_id": self.draw_id(self.facility_cdf, self.num_facilities),
                     "visit_timestamp": visit_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                    "treatment_cost": round(random.uniform(50, 5000), 2),
-                    "duration_minutes": random.randint(15, 60)
+                    "treatment_cost": round(self.random.uniform(50, 5000), 2),
+                    "duration_minutes": self.random.randint(15, 60)
                 })
         return visits
 
+    def generate_visits_columnar(self, start_date=None, end_date=None):
+        """
+        Generates synthetic visit data column-wise, drawing every attribute as a NumPy array in bulk.
+
+        Produces the same distributions as generate_visits() without building a Python object per visit.
+
+        Args:
+            start_date (datetime, optional): The first visit date. Defaults to the configured start_date.
+            end_date (datetime, optional): The last visit date. Defaults to the configured end_date.
+
+        Returns:
+            Dict[str, np.ndarray]: A dictionary of equally sized column arrays:
+                - patient_id (int64): The ID of the patient (randomly assigned).
+                - facility_id (int64): The ID of the facility (randomly assigned).
+                - visit_timestamp (datetime64[s]): The timestamp of the visit.
+                - treatment_cost (float64): The cost of the treatment, rounded to 2 decimals.
+                - duration_minutes (int64): The duration of the visit in minutes.
+        """
+        start_date, end_date = self.visit_date_range(start_date, end_date)
+        start = np.datetime64(start_date.date(), 'D')
+        end = np.datetime64(end_date.date(), 'D')
+        days = end - np.arange((end - start).astype(int) + 1)
+        visits_per_day = self.rng.integers(self.visits_per_day[0], self.visits_per_day[1] + 1, size=days.size)
+        if self.seasonal_amplitude:
+            day_of_year = (days - days.astype('datetime64[Y]')).astype(int) + 1
+            visits_per_day = np.rint(visits_per_day * self.seasonal_factor(day_of_year)).astype(int)
+        num_visits = int(visits_per_day.sum())
+
+        visit_dates = np.repeat(days, visits_per_day).astype('datetime64[s]')
+        seconds_of_day = self.rng.integers(0, 24 * 60 * 60, size=num_visits).astype('timedelta64[s]')
+        return {
+            "patient_id": self.draw_ids(self.patient_cdf, self.num_patients, num_visits),
+            "facility_id": self.draw_ids(self.facility_cdf, self.num_facilities, num_visits),
+            "visit_timestamp": visit_dates + seconds_of_day,
+            "treatment_cost": np.round(self.rng.uniform(50, 5000, size=num_visits), 2),
+            "duration_minutes": self.rng.integers(15, 61, size=num_visits)
+        }
+
+    @staticmethod
+    def split_rows(visits, chunk_rows):
+        """
+        Splits generated visits into chunks of at most chunk_rows rows.
+
+        Args:
+            visits (List[dict] or Dict[str, np.ndarray]): Row-oriented or column-oriented visit data.
+            chunk_rows (int or None): The maximum number of rows per chunk. None disables splitting.
+
+        Yields:
+            List[dict] or Dict[str, np.ndarray]: Chunks of the same shape as the input.
+        """
+        num_rows = len(next(iter(visits.values()))) if isinstance(visits, dict) else len(visits)
+        if not chunk_rows or num_rows <= chunk_rows:
+            yield visits
+            return
+        for offset in range(0, num_rows, chunk_rows):
+            if isinstance(visits, dict):
+                yield {name: column[offset:offset + chunk_rows] for name, column in visits.items()}
+            else:
+                yield visits[offset:offset + chunk_rows]
+
+    def iter_visits(self, chunk_days=None, chunk_rows=None, start_date=None, end_date=None):
+        """
+        Lazily generates visits window by window, so only one chunk is held in memory at a time.
+
+        The date range is walked in windows of chunk_days days. Each window is generated
+        with the configured engine (see generate_data()) and optionally split further into chunks of
+        at most chunk_rows rows.
+
+        Args:
+            chunk_days (int, optional): Days per generated window. Defaults to the configured visits_chunk_days.
+            chunk_rows (int, optional): Maximum rows per yielded chunk. Defaults to the configured
+                                        visits_chunk_rows.
+            start_date (datetime, optional): The first visit date. Defaults to the configured start_date.
+            end_date (datetime, optional): The last visit date. Defaults to the configured end_date.
+
+        Yields:
+            List[dict] or Dict[str, np.ndarray]: Consecutive chunks of visit data.
+        """
+        chunk_days = chunk_days or self.visits_chunk_days
+        chunk_rows = chunk_rows if chunk_rows is not None else self.visits_chunk_rows
+        window_start, end_date = self.visit_date_range(start_date, end_date)
+        while window_start <= end_date:
+            window_end = min(window_start + timedelta(days=chunk_days - 1), end_date)
+            if self.columnar_visits:
+                visits = self.generate_visits_columnar(window_start, window_end)
+            else:
+                visits = self.generate_visits(window_start, window_end)
+            yield from self.split_rows(visits, chunk_rows)
+            window_start = window_end + timedelta(days=1)
+
     def generate_data(self):
         """
         Generates synthetic data for patients, facilities, and visits, and stores them in the class attributes.
+
+        Visits are generated by generate_visits_columnar() when columnar_visits is enabled,
+        otherwise by generate_visits().
         """
         self.patients = self.generate_patients()
         self.facilities = self.generate_facilities()
-        self.visits = self.generate_visits()
+        self.visits = self.generate_visits_columnar() if self.columnar_visits else self.generate_visits()
 
     def get_visits(self):
         """
         Retrieves the generated visit data.
 
         Returns:
-            List[dict]: A list of visit data dictionaries.
+            List[dict] or Dict[str, np.ndarray]: A list of visit data dictionaries,
+            or a dictionary of column arrays when columnar_visits is enabled.
         """
         return self.visits
 
@@ -1,12 +1,57 @@
+import csv
+import io
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectionPool
 from data_dev.src.data.data_generator import DataGenerator
+from data_dev.src.data.sharded_generator import ShardedDataGenerator, derive_seed
 from data_dev.queries import (
     CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
     CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
     CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
     INSERT_SRC_GENERATED_FACILITIES_QUERY,
     INSERT_SRC_GENERATED_PATIENTS_QUERY,
-    INSERT_SRC_GENERATED_VISITS_QUERY
+    INSERT_SRC_GENERATED_VISITS_QUERY,
+    COPY_SRC_GENERATED_FACILITIES_QUERY,
+    COPY_SRC_GENERATED_PATIENTS_QUERY,
+    COPY_SRC_GENERATED_VISITS_QUERY,
+    SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY,
+    SET_SRC_GENERATED_TABLES_UNLOGGED_QUERY,
+    SET_SRC_GENERATED_TABLES_LOGGED_QUERY,
+    DROP_SRC_GENERATED_INDEXES_QUERY,
+    CREATE_SRC_GENERATED_INDEXES_QUERY,
+    ANALYZE_SRC_GENERATED_TABLES_QUERY,
+    SELECT_CURRENT_WAL_INSERT_LSN_QUERY,
+    SELECT_WAL_BYTES_SINCE_QUERY,
+    CREATE_SRC_LOAD_STAGING_TABLE_QUERY,
+    PUBLISH_SRC_LOAD_STAGING_TABLE_QUERY,
+    DROP_SRC_LOAD_STAGING_TABLE_QUERY
 )
+from data_dev.config import data_generator_config, src_load_config, load_config
+
+# Insert query, COPY query and column order of every src table
+SRC_TABLES = {
+    'src_generated_facilities': (
+        INSERT_SRC_GENERATED_FACILITIES_QUERY,
+        COPY_SRC_GENERATED_FACILITIES_QUERY,
+        ('facility_id', 'facility_name', 'facility_type', 'address', 'city', 'state')
+    ),
+    'src_generated_patients': (
+        INSERT_SRC_GENERATED_PATIENTS_QUERY,
+        COPY_SRC_GENERATED_PATIENTS_QUERY,
+        ('patient_id', 'first_name', 'last_name', 'date_of_birth', 'address')
+    ),
+    'src_generated_visits': (
+        INSERT_SRC_GENERATED_VISITS_QUERY,
+        COPY_SRC_GENERATED_VISITS_QUERY,
+        ('patient_id', 'facility_id', 'visit_timestamp', 'treatment_cost', 'duration_minutes')
+    ),
+}
 
 
 class GeneratedDataLoader:
@@ -16,10 +61,27 @@ class GeneratedDataLoader:
     Attributes:
         conn (object): A database connection object.
         dg (DataGenerator): An instance of the DataGenerator class for generating synthetic data.
+        load_method (str): 'copy' or 'insert', sourced from src_load_config.load_method.
+        load_stats (dict): Rows loaded and seconds spent per table, filled during loading.
+        num_workers (int): The number of parallel load connections, sourced from src_load_config.num_workers.
 
     Methods:
         - is_table_empty(cursor, table_name): Checks if a given table is empty.
+        - iter_rows(data): Iterates over row-oriented or column-oriented data as row dictionaries.
+        - iter_tuples(data, columns): Iterates over row-oriented or column-oriented data as value tuples.
         - inject_data_into_table(cursor, data, query): Inserts data into a table using a specified query.
+        - copy_data_into_table(cursor, data, query, columns): Streams data into a table through COPY FROM STDIN.
+        - load_table(cursor, table_name, data): Loads data into a src table with the configured load method.
+        - log_load_stats(): Logs rows loaded and rows/sec per table.
+        - load_shard(cursor, patients, visits): Loads the patients and visits of one generated shard window.
+        - iter_load_tasks(): Generates the data of a full load as (table name, data) pairs.
+        - load_concurrently(pool, tasks): Loads tasks in parallel over pooled connections as one batch.
+        - create_staging_tables(batch_id): Creates the staging tables of a parallel load.
+        - drop_staging_tables(staging_tables): Drops the staging tables of a parallel load.
+        - prepare_src_tables(cursor): Applies the fast_load persistence and drops the helper indexes.
+        - restore_src_tables(): Restores LOGGED src tables with their helper indexes after a failed load.
+        - full_load(cursor): Loads the full generated history into the empty src tables.
+        - append_data(cursor): Generates and appends only the data newer than what the src tables hold.
         - inject_data(): Creates tables (if not exist) and injects generated data into the database.
     """
 
@@ -32,6 +94,10 @@ class GeneratedDataLoader:
         """
         self.conn = conn
         self.dg = DataGenerator()
+        self.load_method = src_load_config.load_method
+        self.load_stats = {}
+        self.num_workers = src_load_config.num_workers
+        self.stats_lock = threading.Lock()
 
     @staticmethod
     def is_table_empty(cursor, table_name):
@@ -49,6 +115,42 @@ class GeneratedDataLoader:
         cursor.execute(query)
         return cursor.fetchone()[0] == 0
 
+    @staticmethod
+    def iter_rows(data):
+        """
+        Iterates over generated data as row dictionaries.
+
+        Args:
+            data (list or dict): A list of row dictionaries, or a dictionary of equally sized
+                                 column arrays as produced by DataGenerator.generate_visits_columnar().
+
+        Yields:
+            dict: One row, keyed by column name, with values converted to native Python types.
+        """
+        if isinstance(data, dict):
+            names = list(data.keys())
+            columns = [data[name].tolist() for name in names]
+            for values in zip(*columns):
+                yield dict(zip(names, values))
+        else:
+            yield from data
+
+    @staticmethod
+    def iter_tuples(data, columns):
+        """
+        Iterates over generated data as tuples of values in the given column order.
+
+        Args:
+            data (list or dict): A list of row dictionaries or a dictionary of column arrays.
+            columns (Sequence[str]): The column order of the produced tuples.
+
+        Returns:
+            Iterator[tuple]: One tuple of values per row.
+        """
+        if isinstance(data, dict):
+            return zip(*(data[name].tolist() for name in columns))
+        return (tuple(row[name] for name in columns) for row in data)
+
     @staticmethod
     def inject_data_into_table(cursor, data, query):
         """
@@ -56,23 +158,427 @@ class GeneratedDataLoader:
 
         Args:
             cursor (object): A database cursor object.
-            data (list): A list of data to be inserted.
+            data (list or dict): A list of row dictionaries or a dictionary of column arrays to be inserted.
             query (str): The SQL query for inserting data.
         """
-        for params in data:
+        for params in GeneratedDataLoader.iter_rows(data):
             cursor.execute(query, params)
 
+    @staticmethod
+    def copy_data_into_table(cursor, data, query, columns):
+        """
+        Streams data into a table through PostgreSQL COPY FROM STDIN in a single round trip.
+
+        The rows are serialized as CSV into an in-memory buffer, which is then handed to the server.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or dict): A list of row dictionaries or a dictionary of column arrays to be loaded.
+            query (str): The COPY ... FROM STDIN WITH (FORMAT csv) statement of the table.
+            columns (Sequence[str]): The column order expected by the COPY statement.
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(GeneratedDataLoader.iter_tuples(data, columns))
+        buffer.seek(0)
+        cursor.copy_expert(query, buffer)
+
+    def load_table(self, cursor, table_name, data, target_table=None):
+        """
+        Loads data into a src table with the configured load method and records its throughput.
+
+        Args:
+            cursor (object): A database cursor object.
+            table_name (str): One of the src tables listed in SRC_TABLES.
+            data (list or dict): A list of row dictionaries or a dictionary of column arrays to be loaded.
+            target_table (str, optional): A staging table with the columns of table_name the data is loaded into
+                                          instead. Defaults to table_name.
+        """
+        insert_query, copy_query, columns = SRC_TABLES[table_name]
+        if target_table:
+            # The table name is the first identifier of both statements
+            insert_query = insert_query.replace(table_name, target_table, 1)
+            copy_query = copy_query.replace(table_name, target_table, 1)
+        started = time.perf_counter()
+        if self.load_method == 'copy':
+            self.copy_data_into_table(cursor=cursor, data=data, query=copy_query, columns=columns)
+        elif self.load_method == 'insert':
+            self.inject_data_into_table(cursor=cursor, data=data, query=insert_query)
+        else:
+            raise ValueError(f"Unsupported load method '{self.load_method}'. Use 'copy' or 'insert'.")
+        elapsed = time.perf_counter() - started
+        num_rows = len(next(iter(data.values()))) if isinstance(data, dict) else len(data)
+        with self.stats_lock:
+            rows, seconds = self.load_stats.get(table_name, (0, 0.0))
+            self.load_stats[table_name] = (rows + num_rows, seconds + elapsed)
+
+    def log_load_stats(self):
+        """
+        Logs the number of rows loaded and the throughput of every loaded table.
+        """
+        for table_name, (rows, seconds) in self.load_stats.items():
+            rows_per_second = rows / seconds if seconds else 0.0
+            logging.info(f"{table_name}: {rows} rows loaded via {self.load_method} in {seconds:.2f}s "
+                         f"({rows_per_second:,.0f} rows/sec)")
+
+    def iter_shard_tasks(self, patients, visits):
+        """
+        Splits the patients and visits of one generated shard window into load tasks.
+
+        Args:
+            patients (list or None): The patients of the shard, None for all but its first window.
+            visits (list or dict): The visits of the window.
+
+        Yields:
+            Tuple[str, list or dict]: The src table name and the data to load into it.
+        """
+        if patients is not None:
+            yield 'src_generated_patients', patients
+        for chunk in DataGenerator.split_rows(visits, self.dg.visits_chunk_rows):
+            yield 'src_generated_visits', chunk
+
+    def load_shard(self, cursor, patients, visits):
+        """
+        Loads the patients and visits of one generated shard window.
+
+        Shards cover disjoint patient ID and date ranges, so each of them can be loaded independently.
+
+        Args:
+            cursor (object): A database cursor object.
+            patients (list or None): The patients of the shard, None for all but its first window.
+            visits (list or dict): The visits of the window.
+        """
+        for table_name, data in self.iter_shard_tasks(patients, visits):
+            self.load_table(cursor=cursor, table_name=table_name, data=data)
+
+    @staticmethod
+    def full_load_end_date():
+        """
+        Returns the last visit date of a full load.
+
+        In incremental mode the full load stops at the target date of append_data(), so later runs append the
+        days after it. Otherwise the configured end_date of the generator is used.
+
+        Returns:
+            datetime: The last visit date.
+        """
+        date_format = data_generator_config.date_format
+        end_date = datetime.strptime(data_generator_config.end_date, date_format)
+        if src_load_config.incremental:
+            end_date = min(end_date, datetime.strptime(src_load_config.target_date or load_config.date_scope,
+                                                       '%Y-%m-%d'))
+        return end_date
+
+    def iter_load_tasks(self):
+        """
+        Generates the data of a full load lazily, as a sequence of independent load tasks.
+
+        Facilities come first, then patients and visit chunks. When data_generator_config.num_shards
+        is greater than 1 the data is generated by ShardedDataGenerator on a process pool, shard by shard.
+
+        Yields:
+            Tuple[str, list or dict]: The src table name and the data to load into it.
+        """
+        end_date = self.full_load_end_date()
+        if data_generator_config.num_shards > 1:
+            sdg = ShardedDataGenerator(end_date=end_date)
+            yield 'src_generated_facilities', sdg.generate_facilities()
+            for shard, patients, visits in sdg.iter_shards():
+                yield from self.iter_shard_tasks(patients, visits)
+        else:
+            yield 'src_generated_facilities', self.dg.generate_facilities()
+            if self.dg.value_pool is not None:
+                yield 'src_generated_patients', self.dg.generate_patients_columnar()
+            else:
+                yield 'src_generated_patients', self.dg.generate_patients()
+            for visits in self.dg.iter_visits(end_date=end_date):
+                yield 'src_generated_visits', visits
+
+    def create_staging_tables(self, batch_id):
+        """
+        Creates and commits one staging table per src table for a parallel load, UNLOGGED with
+        src_load_config.fast_load.
+
+        Args:
+            batch_id (str): The hex id of the load batch, part of the staging table names.
+
+        Returns:
+            Dict[str, str]: The staging table name per src table name.
+        """
+        staging_tables = {table_name: f"{table_name}_load_{batch_id[:12]}" for table_name in SRC_TABLES}
+        cursor = self.conn.cursor()
+        try:
+            for table_name, staging_table in staging_tables.items():
+                cursor.execute(CREATE_SRC_LOAD_STAGING_TABLE_QUERY.format(
+                    persistence='UNLOGGED' if src_load_config.fast_load else '',
+                    staging_table=staging_table,
+                    table_name=table_name
+                ))
+            self.conn.commit()
+        finally:
+            cursor.close()
+        return staging_tables
+
+    def drop_staging_tables(self, staging_tables):
+        """
+        Drops and commits the staging tables of a failed parallel load.
+
+        Args:
+            staging_tables (Dict[str, str]): The staging table name per src table name.
+        """
+        cursor = self.conn.cursor()
+        try:
+            for staging_table in staging_tables.values():
+                cursor.execute(DROP_SRC_LOAD_STAGING_TABLE_QUERY.format(staging_table=staging_table))
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+    def load_concurrently(self, pool, tasks):
+        """
+        Loads tasks in parallel over num_workers pooled connections and publishes them as one batch.
+
+        Every worker thread loads its tasks inside one open transaction on its own connection. The src tables
+        have no foreign keys between them, so tasks can run in any order. At most two tasks per worker are
+        queued at a time, which keeps memory bounded while tasks are generated lazily.
+
+        By default the workers load into per-batch staging tables and commit them. Once all of them
+        succeeded, the staging tables replace the (empty) src tables in one transaction on self.conn, so the
+        batch becomes visible as a whole or not at all and no row is copied a second time. If anything fails,
+        the worker connections are rolled back, the staging tables are dropped, the src tables are left as they
+        were and the error is raised. Only the full load into empty src tables loads concurrently.
+
+        With src_load_config.two_phase_commit, the workers load straight into the src tables and all
+        transactions are prepared before any of them is committed. A failure before the commit phase rolls
+        every transaction back. A failure while committing rolls back only the prepared transactions that are
+        not committed yet and logs that the batch was committed partially.
+
+        Args:
+            pool (PostgresConnectionPool): The pool the worker connections are taken from.
+            tasks (Iterable[Tuple[str, list or dict]]): The (table name, data) pairs to load.
+        """
+        two_phase_commit = src_load_config.two_phase_commit
+        batch_id = uuid.uuid4().hex
+        staging_tables = {} if two_phase_commit else self.create_staging_tables(batch_id)
+        worker = threading.local()
+        connections = []
+        committed = []
+
+        def bind_connection():
+            conn = pool.get_connection()
+            with self.stats_lock:
+                connections.append(conn)
+                if two_phase_commit:
+                    conn.tpc_begin(conn.xid(0, f"src_load_{batch_id}", f"worker_{len(connections)}"))
+            worker.conn = conn
+
+        def run(table_name, data):
+            cursor = worker.conn.cursor()
+            try:
+                self.load_table(cursor=cursor, table_name=table_name, data=data,
+                                target_table=staging_tables.get(table_name))
+            finally:
+                cursor.close()
+
+        executor = ThreadPoolExecutor(max_workers=self.num_workers, initializer=bind_connection)
+        try:
+            pending = set()
+            for table_name, data in tasks:
+                if len(pending) >= 2 * self.num_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(run, table_name, data))
+            for future in pending:
+                future.result()
+            executor.shutdown()
+            if two_phase_commit:
+                for conn in connections:
+                    conn.tpc_prepare()
+                for conn in connections:
+                    conn.tpc_commit()
+                    committed.append(conn)
+            else:
+                for conn in connections:
+                    conn.commit()
+                cursor = self.conn.cursor()
+                try:
+                    for table_name, staging_table in staging_tables.items():
+                        cursor.execute(PUBLISH_SRC_LOAD_STAGING_TABLE_QUERY.format(table_name=table_name,
+                                                                                   staging_table=staging_table))
+                    self.conn.commit()
+                finally:
+                    cursor.close()
+        except Exception:
+            executor.shutdown(cancel_futures=True)
+            for conn in connections:
+                if conn in committed:
+                    continue
+                if two_phase_commit:
+                    conn.tpc_rollback()
+                else:
+                    conn.rollback()
+            if committed:
+                logging.error(f"src load batch {batch_id} was committed on {len(committed)} of "
+                              f"{len(connections)} connections, the remaining prepared transactions are rolled back")
+            if staging_tables:
+                self.conn.rollback()
+                self.drop_staging_tables(staging_tables)
+            raise
+        finally:
+            for conn in connections:
+                pool.put_connection(conn)
+
+    @staticmethod
+    def prepare_src_tables(cursor):
+        """
+        Applies the fast_load persistence to the src tables and drops their helper indexes before a load.
+
+        Args:
+            cursor (object): A database cursor object on self.conn.
+        """
+        cursor.execute(SET_SRC_GENERATED_TABLES_UNLOGGED_QUERY if src_load_config.fast_load
+                       else SET_SRC_GENERATED_TABLES_LOGGED_QUERY)
+        cursor.execute(DROP_SRC_GENERATED_INDEXES_QUERY)
+
+    def restore_src_tables(self):
+        """
+        Rebuilds the helper indexes of the src tables and switches them back to LOGGED after a failed load
+        that committed prepare_src_tables() before it.
+        """
+        self.conn.rollback()
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(SET_SRC_GENERATED_TABLES_LOGGED_QUERY)
+            cursor.execute(CREATE_SRC_GENERATED_INDEXES_QUERY)
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+    def full_load(self, cursor):
+        """
+        Loads the full generated history into the empty src tables.
+
+        This method:
+        1. Switches the src tables to UNLOGGED when src_load_config.fast_load is set, or to LOGGED otherwise.
+        2. Drops the helper indexes, so they are not maintained row by row during the load.
+        3. Loads facilities, patients and visits, serially or with load_concurrently() when
+           src_load_config.num_workers is greater than 1 (which publishes and commits the loaded data
+           as one batch on its own).
+        4. Builds the helper indexes, runs ANALYZE and commits.
+
+        The serial load runs steps 1 to 4 in one transaction. A parallel load without two-phase commit skips
+        steps 1 and 2: its staging tables are created with the target persistence and without indexes, and
+        replace the src tables only once the batch succeeded. A parallel load with two-phase commit writes
+        into the src tables, so steps 1 and 2 are committed before it and undone by restore_src_tables() if
+        it fails.
+
+        Wall-clock time and the WAL volume generated by the load are logged and returned. The WAL volume is
+        measured server-wide, so concurrent activity of other sessions is included.
+
+        Args:
+            cursor (object): A database cursor object on self.conn.
+
+        Returns:
+            Dict[str, float]: 'load_seconds' and 'index_seconds' of the wall-clock time, 'wal_bytes' of the WAL.
+        """
+        cursor.execute(SELECT_CURRENT_WAL_INSERT_LSN_QUERY)
+        start_lsn = cursor.fetchone()[0]
+
+        started = time.perf_counter()
+        if self.num_workers > 1 and not src_load_config.two_phase_commit:
+            # Worker connections must see the tables, so their creation is committed first
+            self.conn.commit()
+            with PostgresConnectionPool(max_connections=self.num_workers) as pool:
+                self.load_concurrently(pool=pool, tasks=self.iter_load_tasks())
+        elif self.num_workers > 1:
+            self.prepare_src_tables(cursor)
+            self.conn.commit()
+            try:
+                with PostgresConnectionPool(max_connections=self.num_workers) as pool:
+                    self.load_concurrently(pool=pool, tasks=self.iter_load_tasks())
+            except Exception:
+                self.restore_src_tables()
+                raise
+        else:
+            self.prepare_src_tables(cursor)
+            for table_name, data in self.iter_load_tasks():
+                self.load_table(cursor=cursor, table_name=table_name, data=data)
+        load_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cursor.execute(CREATE_SRC_GENERATED_INDEXES_QUERY)
+        cursor.execute(ANALYZE_SRC_GENERATED_TABLES_QUERY)
+        self.conn.commit()
+        index_seconds = time.perf_counter() - started
+
+        cursor.execute(SELECT_WAL_BYTES_SINCE_QUERY, {'start_lsn': start_lsn})
+        wal_bytes = float(cursor.fetchone()[0])
+        logging.info(f"Full src load ({'UNLOGGED' if src_load_config.fast_load else 'LOGGED'} tables): "
+                     f"load {load_seconds:.2f}s, index build and ANALYZE {index_seconds:.2f}s, "
+                     f"{wal_bytes / 2 ** 20:,.1f} MiB WAL")
+        return {'load_seconds': load_seconds, 'index_seconds': index_seconds, 'wal_bytes': wal_bytes}
+
+    def append_data(self, cursor):
+        """
+        Generates and appends only the data newer than what the src tables already hold.
+
+        Reads the latest visit timestamp and the highest patient and facility ids from the src tables, then:
+        - appends facilities and patients whose ids are above the loaded ones (if the configuration grew),
+        - appends visits for the days after the latest loaded visit up to the target date.
+
+        The cost of a run is therefore proportional to the number of new days, not to the full history.
+
+        Args:
+            cursor (object): A database cursor object.
+        """
+        cursor.execute(SELECT_SRC_GENERATED_HIGH_WATER_MARKS_QUERY)
+        max_visit_timestamp, max_patient_id, max_facility_id = cursor.fetchone()
+        start_date = datetime.combine(max_visit_timestamp.date() + timedelta(days=1), datetime.min.time())
+        end_date = datetime.strptime(src_load_config.target_date or load_config.date_scope, '%Y-%m-%d')
+
+        # Seed the appended days by their start date, so they do not replay the random streams of the full load
+        seed = data_generator_config.seed
+        dg = DataGenerator(seed=None if seed is None else derive_seed(seed, start_date.toordinal()))
+
+        facilities = [f for f in dg.generate_facilities() if f['facility_id'] > (max_facility_id or 0)]
+        if facilities:
+            self.load_table(cursor=cursor, table_name='src_generated_facilities', data=facilities)
+        if dg.num_patients > (max_patient_id or 0):
+            first_patient_id = (max_patient_id or 0) + 1
+            if dg.value_pool is not None:
+                patients = dg.generate_patients_columnar(first_patient_id=first_patient_id)
+            else:
+                patients = dg.generate_patients(first_patient_id=first_patient_id)
+            self.load_table(cursor=cursor, table_name='src_generated_patients', data=patients)
+        if start_date > end_date:
+            logging.info(f"src_generated_visits is already loaded up to {max_visit_timestamp}, nothing to append")
+            return
+        logging.info(f"Appending visits from {start_date.date()} to {end_date.date()}")
+        for visits in dg.iter_visits(start_date=start_date, end_date=end_date):
+            self.load_table(cursor=cursor, table_name='src_generated_visits', data=visits)
+
     def inject_data(self):
         """
         Creates tables (if they don't exist) and injects generated data into the database.
 
         This method:
-        1. Creates the `src_generated_facilities`, `src_generated_patients`, and 
+        1. Creates the `src_generated_facilities`, `src_generated_patients`, and
            `src_generated_visits` tables if they do not already exist.
         2. Checks if the `src_generated_visits` table is empty.
-        3. If the table is empty, generates synthetic data for facilities, patients, and visits.
-        4. Inserts the generated data into the respective tables.
-        5. Commits the transaction if successful, or rolls back in case of an error.
+        3. If the table is empty, generates and loads synthetic data for facilities and patients.
+        4. Streams visits from DataGenerator.iter_visits() and loads them chunk by chunk,
+           so memory stays bounded by the chunk size rather than the configured date range.
+           When data_generator_config.num_shards is greater than 1, the data is generated on a process pool.
+           When src_load_config.num_workers is greater than 1, the tables and visit chunks are loaded
+           in parallel over pooled connections with load_concurrently().
+           Steps 3 and 4 are done by full_load(), which also defers the helper index builds
+           and applies the fast_load profile.
+        5. If the table is not empty and src_load_config.incremental is set, appends the new days
+           with append_data() instead.
+        6. Commits the transaction if successful, or rolls back, prints and re-raises the error.
+
+        Rows are loaded with COPY FROM STDIN, or with one INSERT per row when
+        src_load_config.load_method is 'insert'. Rows/sec per table are logged after the commit.
         """
         cursor = self.conn.cursor()
         try:
@@ -83,27 +589,17 @@ class GeneratedDataLoader:
 
             # Generate and insert data if the visits table is empty
             if self.is_table_empty(cursor=cursor, table_name='src_generated_visits'):
-                self.dg.generate_data()
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_facilities(),
-                    query=INSERT_SRC_GENERATED_FACILITIES_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_patients(),
-                    query=INSERT_SRC_GENERATED_PATIENTS_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_visits(),
-                    query=INSERT_SRC_GENERATED_VISITS_QUERY
-                )
+                self.full_load(cursor=cursor)
+                self.log_load_stats()
+            elif src_load_config.incremental:
+                self.append_data(cursor=cursor)
                 self.conn.commit()
+                self.log_load_stats()
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"Error occurred: {e}")
+            raise
         finally:
             # Close the cursor
             cursor.close()
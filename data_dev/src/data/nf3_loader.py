@@ -1,9 +1,32 @@
+import time
+import logging
+from datetime import datetime, timedelta
+
+from psycopg2 import sql
+
 from data_dev.queries import (CREATE_FACILITIES_TABLE_QUERY,
                               CREATE_PATIENTS_TABLE_QUERY,
                               CREATE_VISITS_TABLE_QUERY)
+from data_dev.queries import (CREATE_PARTITIONED_VISITS_TABLE_QUERY,
+                              SELECT_VISITS_TABLE_KIND_QUERY,
+                              SELECT_SRC_GENERATED_VISIT_MONTHS_QUERY,
+                              SELECT_SRC_GENERATED_MIN_VISIT_TIMESTAMP_QUERY,
+                              CREATE_VISITS_PARTITION_QUERY)
 from data_dev.queries import (MERGE_PATIENTS_QUERY,
                               MERGE_VISITS_QUERY,
-                              MERGE_FACILITIES_QUERY)
+                              MERGE_FACILITIES_QUERY,
+                              MERGE_VISITS_WINDOW_QUERY)
+from data_dev.queries import (CREATE_LOAD_STATE_TABLE_QUERY,
+                              SELECT_LOAD_WATERMARK_QUERY,
+                              UPSERT_LOAD_WATERMARK_QUERY)
+from data_dev.queries import (CREATE_NF3_INDEXES_QUERY,
+                              SELECT_MISSING_NF3_INDEXES_QUERY,
+                              SELECT_DUPLICATE_NF3_EXTERNAL_IDS_QUERY,
+                              ANALYZE_NF3_TABLES_QUERY,
+                              TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+                              TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+                              TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL)
+from data_dev.src.data.aggregates import VisitAggregates
 from data_dev.config import load_config
 
 
@@ -14,9 +37,24 @@ class NF3Loader:
     This class is responsible for:
     1. Creating the necessary database tables if they do not already exist.
     2. Merging data into the 3NF tables using predefined SQL queries.
+    3. Tracking the visits load watermark in the etl_load_state table.
+    4. Provisioning the indexes used by the MERGE and TRANSFORM statements and refreshing statistics.
+    5. Optionally range-partitioning the visits table by month and creating missing partitions.
+    6. Optionally refreshing the aggregate tables of the parquet transforms for the merged days.
 
     Attributes:
         conn: A psycopg2 database connection object used to interact with the database.
+        incremental (bool): Whether visits are merged incrementally from the watermark,
+                            sourced from load_config.incremental.
+        explain_report (bool): Whether a before/after EXPLAIN ANALYZE timing report is logged when the indexes
+                               are provisioned, sourced from load_config.explain_report.
+        partition_visits (bool): Whether the visits table is partitioned by month, sourced from
+                                 load_config.partition_visits.
+        backfill_window_months (int or None): The size of the chunked backfill windows in months, sourced from
+                                              load_config.backfill_window_months.
+        maintain_aggregates (bool): Whether the VisitAggregates tables are refreshed with every merge, sourced from
+                                    load_config.maintain_aggregates.
+        aggregates (VisitAggregates): The maintainer of the aggregate tables.
     """
 
     def __init__(self, conn):
@@ -27,32 +65,348 @@ class NF3Loader:
             conn: A psycopg2 database connection object.
         """
         self.conn = conn
+        self.incremental = load_config.incremental
+        self.explain_report = load_config.explain_report
+        self.partition_visits = load_config.partition_visits
+        self.backfill_window_months = load_config.backfill_window_months
+        self.maintain_aggregates = load_config.maintain_aggregates
+        self.aggregates = VisitAggregates()
+
+    @staticmethod
+    def get_watermark(cursor, target_table='visits'):
+        """
+        Read the load watermark of a table.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            target_table (str): The loaded table.
+
+        Returns:
+            datetime or None: The watermark (all src rows before it are loaded), or None if the table
+                              was never loaded.
+        """
+        cursor.execute(SELECT_LOAD_WATERMARK_QUERY, {'target_table': target_table})
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def set_watermark(cursor, loaded_until, target_table='visits'):
+        """
+        Persist the load watermark of a table. Takes effect with the commit of the surrounding transaction.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            loaded_until (datetime): The new watermark.
+            target_table (str): The loaded table.
+        """
+        cursor.execute(UPSERT_LOAD_WATERMARK_QUERY, {'target_table': target_table, 'loaded_until': loaded_until})
+
+    @staticmethod
+    def scope_end():
+        """
+        Return the exclusive upper bound of the load scope: the start of the day after load_config.date_scope.
+
+        Returns:
+            datetime: The end of the load scope.
+        """
+        return datetime.strptime(load_config.date_scope, '%Y-%m-%d') + timedelta(days=1)
+
+    def merge_visits_incremental(self, cursor):
+        """
+        Merge only the src visits between the current watermark and the end of the load scope.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            datetime: The new watermark, to be persisted with the merge.
+        """
+        window_start = self.get_watermark(cursor) or datetime.min
+        window_end = self.scope_end()
+        if window_start >= window_end:
+            logging.info(f"visits are already loaded until {window_start}, nothing to merge")
+            return window_start
+        cursor.execute(MERGE_VISITS_WINDOW_QUERY, {'window_start': window_start, 'window_end': window_end})
+        logging.info(f"Merged {cursor.rowcount} visits from {window_start} to {window_end}")
+        return window_end
+
+    @staticmethod
+    def add_months(moment, months):
+        """
+        Return the start of the month the given number of months after the month of a moment.
+
+        Args:
+            moment (datetime): The moment to count from.
+            months (int): The number of months to add.
+
+        Returns:
+            datetime: The first day of the resulting month.
+        """
+        years, month_index = divmod(moment.month - 1 + months, 12)
+        return datetime(moment.year + years, month_index + 1, 1)
+
+    def backfill_visits(self, cursor):
+        """
+        Merge src visits in windows of backfill_window_months calendar months, committing every window together
+        with the advanced watermark, so a failed backfill resumes after the last committed window.
+
+        The backfill starts at the watermark, or at the month of the first src visit if there is none, and ends
+        with the load scope. Window boundaries fall on month starts, matching the visits partitions.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            List[Tuple[datetime, datetime, int, float]]: Start, end, merged rows and seconds of every window.
+        """
+        window_start = self.get_watermark(cursor)
+        if window_start is None:
+            cursor.execute(SELECT_SRC_GENERATED_MIN_VISIT_TIMESTAMP_QUERY)
+            first_visit = cursor.fetchone()[0]
+            if first_visit is None:
+                logging.info("src_generated_visits is empty, nothing to backfill")
+                return []
+            window_start = first_visit.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        scope_end = self.scope_end()
+
+        windows = []
+        while window_start < scope_end:
+            window_end = min(self.add_months(window_start, self.backfill_window_months), scope_end)
+            started = time.perf_counter()
+            if self.partition_visits:
+                self.create_visits_partitions(cursor, window_start, window_end)
+            cursor.execute(MERGE_VISITS_WINDOW_QUERY, {'window_start': window_start, 'window_end': window_end})
+            rows = cursor.rowcount
+            if self.maintain_aggregates:
+                self.aggregates.refresh(cursor, window_start, window_end)
+            self.set_watermark(cursor, window_end)
+            self.conn.commit()
+            seconds = time.perf_counter() - started
+            logging.info(f"Backfilled {rows} visits from {window_start} to {window_end} "
+                         f"in {seconds:.2f}s ({rows / seconds:,.0f} rows/sec)")
+            windows.append((window_start, window_end, rows, seconds))
+            window_start = window_end
+        return windows
+
+    @staticmethod
+    def partition_name(month_start):
+        """
+        Return the name of the visits partition holding the given month.
+
+        Args:
+            month_start (datetime): The first day of the month.
+
+        Returns:
+            str: The partition name, e.g. visits_y2025m01.
+        """
+        return f"visits_y{month_start.year:04d}m{month_start.month:02d}"
+
+    def create_visits_table(self, cursor):
+        """
+        Create the visits table if it does not exist, range-partitioned by month when partition_visits is set.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Raises:
+            ValueError: If partition_visits is set but visits already exists as a non-partitioned table.
+        """
+        if not self.partition_visits:
+            cursor.execute(CREATE_VISITS_TABLE_QUERY)
+            return
+        cursor.execute(CREATE_PARTITIONED_VISITS_TABLE_QUERY)
+        cursor.execute(SELECT_VISITS_TABLE_KIND_QUERY)
+        if cursor.fetchone()[0] != 'p':
+            raise ValueError("visits already exists as a non-partitioned table. "
+                             "Migrate or drop it before enabling load_config.partition_visits.")
+
+    def create_visits_partitions(self, cursor, window_start, window_end):
+        """
+        Create the monthly visits partitions missing for the src visits of a time window.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            window_start (datetime): The inclusive start of the window.
+            window_end (datetime): The exclusive end of the window.
+
+        Returns:
+            List[str]: The names of the partitions covering the window.
+        """
+        cursor.execute(SELECT_SRC_GENERATED_VISIT_MONTHS_QUERY,
+                       {'window_start': window_start, 'window_end': window_end})
+        partitions = []
+        for (month_start,) in cursor.fetchall():
+            month_end = (month_start + timedelta(days=32)).replace(day=1)
+            partition_name = self.partition_name(month_start)
+            cursor.execute(sql.SQL(CREATE_VISITS_PARTITION_QUERY).format(partition_name=sql.Identifier(partition_name)),
+                           {'month_start': month_start, 'month_end': month_end})
+            partitions.append(partition_name)
+        return partitions
+
+    def explained_statements(self):
+        """
+        Return the statements timed by the EXPLAIN report.
+
+        Returns:
+            List[Tuple[str, str, dict]]: Name, SQL and parameters of every statement.
+        """
+        return [
+            ('MERGE_FACILITIES_QUERY', MERGE_FACILITIES_QUERY, {}),
+            ('MERGE_PATIENTS_QUERY', MERGE_PATIENTS_QUERY, {}),
+            ('MERGE_VISITS_QUERY', MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope}),
+            ('TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL',
+             TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL, {}),
+            ('TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL',
+             TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL, {}),
+            ('TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL',
+             TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL, {}),
+        ]
+
+    def explain_timings(self, cursor):
+        """
+        Time every statement of explained_statements() with EXPLAIN ANALYZE.
+
+        Each statement runs inside a savepoint that is rolled back afterwards, so MERGE statements
+        leave no rows behind.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            Dict[str, float or None]: Execution time in milliseconds per statement name, None if it failed.
+        """
+        timings = {}
+        for name, query, params in self.explained_statements():
+            cursor.execute("SAVEPOINT explain_report")
+            try:
+                cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params or None)
+                timings[name] = cursor.fetchone()[0][0]['Execution Time']
+            except Exception as e:
+                logging.warning(f"EXPLAIN ANALYZE of {name} failed: {e}")
+                timings[name] = None
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_report")
+        return timings
+
+    @staticmethod
+    def check_unique_external_ids(cursor):
+        """
+        Check that facilities and patients hold no duplicate external_id before their unique indexes are created.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Raises:
+            ValueError: If a table without its unique index holds duplicate external_id values.
+        """
+        cursor.execute(SELECT_DUPLICATE_NF3_EXTERNAL_IDS_QUERY)
+        duplicates = cursor.fetchall()
+        if duplicates:
+            details = ", ".join(f"{table_name}: {count} duplicated external_id values (e.g. {example})"
+                                for table_name, count, example in duplicates)
+            raise ValueError(f"Cannot create the unique external_id indexes, {details}. "
+                             "Remove the duplicate rows and re-run the load.")
+
+    def provision_indexes(self, cursor):
+        """
+        Create (idempotently) the unique and supporting indexes of the 3NF tables.
+
+        The tables are first checked for duplicate external_id values with check_unique_external_ids(),
+        so existing duplicates fail the load with a clear error rather than in CREATE UNIQUE INDEX.
+
+        When explain_report is enabled and pg_indexes shows that some of the indexes are missing, the statements
+        of explained_statements() are timed before and after creating them (with freshly analyzed statistics),
+        and a report of both timings is logged. Once all indexes exist, the report is skipped.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            Dict[str, Tuple[float, float]] or None: Before and after execution times in milliseconds per
+                                                    statement name, or None without explain_report or when
+                                                    no index was missing.
+
+        Raises:
+            ValueError: If facilities or patients hold duplicate external_id values.
+        """
+        self.check_unique_external_ids(cursor)
+        if not self.explain_report:
+            cursor.execute(CREATE_NF3_INDEXES_QUERY)
+            return None
+        cursor.execute(SELECT_MISSING_NF3_INDEXES_QUERY)
+        missing = [row[0] for row in cursor.fetchall()]
+        if not missing:
+            logging.info("All 3NF indexes exist, skipping the EXPLAIN ANALYZE report")
+            return None
+        logging.info(f"Missing 3NF indexes {missing}, timing the explained statements before and after creating them")
+        cursor.execute(ANALYZE_NF3_TABLES_QUERY)
+        before = self.explain_timings(cursor)
+        cursor.execute(CREATE_NF3_INDEXES_QUERY)
+        cursor.execute(ANALYZE_NF3_TABLES_QUERY)
+        after = self.explain_timings(cursor)
+        report = {name: (before[name], after[name]) for name in before}
+        for name, (before_ms, after_ms) in report.items():
+            logging.info(f"EXPLAIN ANALYZE {name}: before indexes {before_ms} ms, after indexes {after_ms} ms")
+        return report
 
     def load_data(self):
         """
         Load and transform data into the 3NF database schema.
 
         This method performs the following steps:
-        1. Creates the necessary tables (facilities, patients, visits) if they do not already exist.
-        2. Merges data into the 3NF tables using predefined SQL queries.
-        3. Commits the transaction if all operations succeed.
-        4. Rolls back the transaction and prints the error if any operation fails.
+        1. Creates the necessary tables (facilities, patients, visits, etl_load_state) if they do not already exist,
+           and provisions their indexes with provision_indexes(). With load_config.partition_visits, visits is
+           partitioned by month and the partitions missing for the merged src visits are created.
+        2. Merges data into the 3NF tables using predefined SQL queries. When load_config.incremental is set,
+           only src visits newer than the watermark are merged, otherwise all src visits up to date_scope.
+           Advances the visits watermark to the end of date_scope in the same transaction.
+           When load_config.backfill_window_months is set, visits are merged window by window with
+           backfill_visits() instead, committing after every window.
+           With load_config.maintain_aggregates, the aggregate tables are refreshed for the merged days
+           in the same transaction as the merge.
+        3. Refreshes the statistics of the 3NF tables with ANALYZE.
+        4. Commits the transaction if all operations succeed.
+        5. Rolls back the transaction and prints the error if any operation fails.
 
         Raises:
-            Exception: If any SQL execution fails, the exception is caught, the transaction is rolled back,
-                       and the error is printed.
+            Exception: If any SQL execution fails, the transaction is rolled back, the error is printed
+                       and re-raised, so the calling pipeline stage fails.
         """
         cursor = self.conn.cursor()
         try:
             # Create tables if they do not exist
             cursor.execute(CREATE_FACILITIES_TABLE_QUERY)
             cursor.execute(CREATE_PATIENTS_TABLE_QUERY)
-            cursor.execute(CREATE_VISITS_TABLE_QUERY)
+            self.create_visits_table(cursor)
+            cursor.execute(CREATE_LOAD_STATE_TABLE_QUERY)
+            window_start = (self.get_watermark(cursor) if self.incremental else None) or datetime.min
+            if self.partition_visits and not self.backfill_window_months:
+                self.create_visits_partitions(cursor, window_start, self.scope_end())
+            if self.maintain_aggregates and self.aggregates.create_tables(cursor):
+                # New aggregate tables are built over the already loaded visits first
+                self.aggregates.refresh(cursor)
+            self.provision_indexes(cursor)
 
             # Merge data into 3NF tables
             cursor.execute(MERGE_FACILITIES_QUERY)
             cursor.execute(MERGE_PATIENTS_QUERY)
-            cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+            if self.backfill_window_months:
+                # Commit the schema and dimensions, then every visits window in its own transaction
+                self.conn.commit()
+                self.backfill_visits(cursor)
+            else:
+                if self.incremental:
+                    loaded_until = self.merge_visits_incremental(cursor)
+                else:
+                    cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+                    loaded_until = self.scope_end()
+                if self.maintain_aggregates:
+                    self.aggregates.refresh(cursor, window_start, loaded_until)
+
+                # Advance the watermark atomically with the merged rows
+                self.set_watermark(cursor, loaded_until)
+
+            # Refresh planner statistics for the following loads and transforms
+            cursor.execute(ANALYZE_NF3_TABLES_QUERY)
 
             # Commit the transaction
             self.conn.commit()
@@ -60,6 +414,7 @@ class NF3Loader:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"An error occurred during data loading: {e}")
+            raise
         finally:
             # Close the cursor
             cursor.close()
@@ -1,12 +1,116 @@
 import os
+import re
+import json
+import time
+import shutil
+import tempfile
+import hashlib
+import logging
+import threading
+from datetime import date
+from dataclasses import asdict
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from data_dev.queries import (
     TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
     TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
     TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
 )
-from data_dev.config import parquet_storage_config
+from data_dev.queries import (
+    TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_AGG_SQL,
+    TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL,
+    TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
+)
+from data_dev.queries import (
+    SELECT_MAX_VISIT_ID_QUERY,
+    SELECT_CHANGED_VISIT_MONTHS_QUERY,
+    SELECT_CHANGED_FACILITY_TYPE_PARTITIONS_QUERY,
+    FILTER_TRANSFORM_BY_MONTH_SQL,
+    FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL,
+    VISITS_IN_RANGE_SQL,
+    AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL
+)
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.metrics.run_metrics import run_metrics, path_size
+from data_dev.config import parquet_storage_config, load_config, ParquetWriteOptions
+
+# Dataset of every LoadParquet transform method, keyed by method name in registration order. load_parquet() and
+# the export stages of the pipeline (data_dev/src/pipeline/stages.py) run every registered transform.
+TRANSFORMS = {}
+# SQL queries of every registered dataset: reading the 3NF tables and reading the aggregates. The export stages
+# fingerprint them, so a changed query re-exports its dataset.
+TRANSFORM_QUERIES = {}
+
+
+def register_transform(dataset, query, aggregate_query):
+    """
+    Registers a LoadParquet method as the transform exporting a dataset.
+
+    Parameters:
+    -----------
+    dataset : str
+        Name of the dataset. Its files are stored at parquet_storage_config.storage_path_<dataset>.
+    query : str
+        SQL query of the dataset reading the 3NF tables.
+    aggregate_query : str
+        SQL query of the dataset reading the aggregates, used with load_config.maintain_aggregates.
+
+    Returns:
+    --------
+    callable
+        A decorator registering the method and returning it unchanged.
+    """
+    def register(method):
+        TRANSFORMS[method.__name__] = dataset
+        TRANSFORM_QUERIES[dataset] = (query, aggregate_query)
+        return method
+    return register
+
+
+def transform_query(dataset, use_aggregates):
+    """
+    Returns the SQL query a registered dataset is exported with.
+
+    Parameters:
+    -----------
+    dataset : str
+        Name of the registered dataset.
+    use_aggregates : bool
+        Whether the query reads the aggregates.
+
+    Returns:
+    --------
+    str
+        The SQL query.
+    """
+    query, aggregate_query = TRANSFORM_QUERIES[dataset]
+    return aggregate_query if use_aggregates else query
+
+
+# File in the storage path of each dataset recording its last export, ignored by Parquet readers
+EXPORT_STATE_FILE = '_export_state.json'
+
+# Fixed schemas of the streamed transforms, matching the column types the pandas extraction writes
+FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('visit_date', pa.timestamp('ns')),
+    ('avg_time_spent', pa.float64()),
+])
+PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('full_name', pa.string()),
+    ('sum_treatment_cost', pa.float64()),
+])
+FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_name', pa.string()),
+    ('visit_date', pa.timestamp('ns')),
+    ('min_time_spent', pa.int64()),
+])
 
 
 class LoadParquet:
@@ -23,21 +127,61 @@ class LoadParquet:
         Path to store the Parquet file for patient sum treatment cost per facility type.
     storage_path_facility_name_min_time_spent_per_visit_date : str
         Path to store the Parquet file for facility name minimum time spent per visit date.
+    use_aggregates : bool
+        Whether the transforms read the aggregate tables maintained by the 3NF load, sourced from
+        load_config.maintain_aggregates.
+    extraction_method : str
+        'pandas', 'stream' or 'copy', sourced from parquet_storage_config.extraction_method.
+    stream_batch_size : int
+        Rows fetched per batch by the 'stream' extraction method, sourced from parquet_storage_config.
+    incremental_export : bool
+        Whether only the partitions changed since the last export are rewritten, sourced from
+        parquet_storage_config.incremental_export.
+    num_workers : int
+        Number of transforms run concurrently by load_parquet(), sourced from parquet_storage_config.num_workers.
+        The pipeline runs every transform as its own stage instead, concurrently up to pipeline_config.max_workers.
+    timings : dict
+        Seconds taken by every transform of the last load_parquet() call, keyed by transform name.
 
     Methods:
     --------
     read_data(query):
         Executes the given SQL query and returns the result as a DataFrame.
-    to_parquet(df, storage_path, partition_columns):
+    writer_arguments(options), dataset_arguments(options):
+        Return the pyarrow Parquet writer arguments of the given ParquetWriteOptions.
+    to_parquet(df, storage_path, partition_columns, options=None):
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
+    read_table(query, params, schema):
+        Executes the given SQL query through COPY TO STDOUT and returns the result as a pyarrow Table.
+    write_table(table, storage_path, partition_column, partition_values, options=None):
+        Writes the given pyarrow Table to Parquet files at the specified storage path, partitioned by one column.
+    to_record_batch(rows, schema):
+        Converts fetched rows to a RecordBatch with the given schema.
+    stream_to_parquet(query, storage_path, schema, partition_column, partition_values, params=None, options=None):
+        Streams the result of the given SQL query from a server-side cursor into partitioned Parquet files.
+    month_partitions(batch), facility_type_partitions(batch):
+        Return the partition values of a RecordBatch or Table.
+    add_month_partition(df), add_facility_type_partition(df):
+        Add the partition column to a DataFrame.
+    load_export_state(storage_path), save_export_state(storage_path, state):
+        Read and write the state of the last export to a storage path.
+    changed_partitions(query, storage_path, changed_partitions_query, options):
+        Determines the partitions touched by the visits loaded since the last export.
+    export(dataset, query, storage_path, schema, partition_column, partition_values, add_partition_column,
+           changed_partitions_query, filter_query):
+        Exports the result of the given SQL query, only its changed partitions in incremental mode.
     transform_facility_type_avg_time_spent_per_visit_date():
         Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
     transform_patient_sum_treatment_cost_per_facility_type():
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
     transform_facility_name_min_time_spent_per_visit_date():
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
+    run_transform(name):
+        Runs one registered transform and measures it without raising its error.
+    run_concurrently():
+        Runs all registered transforms on a thread pool, one database connection per worker.
     load_parquet():
-        Executes all transformations and loads the results into Parquet files.
+        Executes all registered transformations and loads the results into Parquet files.
     """
 
     def __init__(self, connection_object):
@@ -59,8 +203,17 @@ class LoadParquet:
         self.storage_path_facility_name_min_time_spent_per_visit_date = (
             parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date
         )
+        self.use_aggregates = load_config.maintain_aggregates
+        self.extraction_method = parquet_storage_config.extraction_method
+        self.stream_batch_size = parquet_storage_config.stream_batch_size
+        self.incremental_export = parquet_storage_config.incremental_export
+        self.num_workers = parquet_storage_config.num_workers
+        self.timings = {}
+        if self.extraction_method not in ('pandas', 'stream', 'copy'):
+            raise ValueError(f"Unknown extraction_method '{self.extraction_method}', "
+                             f"expected 'pandas', 'stream' or 'copy'")
 
-    def read_data(self, query):
+    def read_data(self, query, params=None):
         """
         Executes the given SQL query and returns the result as a DataFrame.
 
@@ -68,17 +221,64 @@ class LoadParquet:
         -----------
         query : str
             SQL query to execute.
+        params : dict, optional
+            Parameters of the SQL query.
 
         Returns:
         --------
         DataFrame
             Resulting data from the SQL query.
         """
-        df = self.connection_object.get_data_sql(query=query)
+        df = self.connection_object.get_data_sql(query=query, params=params)
         return df
 
     @staticmethod
-    def to_parquet(df, storage_path, partition_columns):
+    def writer_arguments(options):
+        """
+        Returns the pyarrow Parquet writer arguments of the given write options, except the row group size.
+
+        Parameters:
+        -----------
+        options : ParquetWriteOptions
+            Layout options of the dataset.
+
+        Returns:
+        --------
+        dict
+            compression, compression_level, use_dictionary, write_statistics and write_page_index.
+        """
+        return {
+            'compression': options.compression,
+            'compression_level': options.compression_level,
+            'use_dictionary': options.dictionary_columns if options.dictionary_columns is not None else True,
+            'write_statistics': options.write_statistics,
+            'write_page_index': options.write_page_index,
+        }
+
+    @classmethod
+    def dataset_arguments(cls, options):
+        """
+        Returns the pq.write_to_dataset() arguments of the given write options.
+
+        Parameters:
+        -----------
+        options : ParquetWriteOptions
+            Layout options of the dataset.
+
+        Returns:
+        --------
+        dict
+            The writer arguments and, if set, the row group size as both the minimum and the maximum rows per
+            row group, so the slices of the input that fall into one partition are buffered into full row groups.
+        """
+        arguments = cls.writer_arguments(options)
+        if options.row_group_size:
+            arguments['row_group_size'] = options.row_group_size
+            arguments['min_rows_per_group'] = options.row_group_size
+        return arguments
+
+    @classmethod
+    def to_parquet(cls, df, storage_path, partition_columns, options=None):
         """
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
 
@@ -90,59 +290,519 @@ class LoadParquet:
             Path to store the Parquet file.
         partition_columns : list
             Columns to partition the Parquet file by.
+        options : ParquetWriteOptions, optional
+            Layout options of the dataset. Defaults to ParquetWriteOptions().
         """
+        options = options or ParquetWriteOptions()
+        if options.sort_by:
+            df = df.sort_values(options.sort_by, kind='stable')
         os.makedirs(storage_path, exist_ok=True)
+        written_files = []
         df.to_parquet(
             storage_path,
             engine='pyarrow',
             partition_cols=partition_columns,
             index=False,
-            existing_data_behavior='delete_matching'
+            existing_data_behavior='delete_matching',
+            file_visitor=lambda written_file: written_files.append(written_file.path),
+            **cls.dataset_arguments(options)
         )
+        run_metrics.add_bytes(sum(path_size(path) for path in written_files))
 
-    def transform_facility_type_avg_time_spent_per_visit_date(self):
+    def read_table(self, query, params, schema):
         """
-        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        Executes the given SQL query through COPY TO STDOUT and returns the result as a pyarrow Table.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query to execute.
+        params : dict or None
+            Parameters of the SQL query.
+        schema : pyarrow.Schema
+            Schema the result is cast to, e.g. dates to timestamps.
+
+        Returns:
+        --------
+        pyarrow.Table
+            Resulting data from the SQL query.
+        """
+        return self.connection_object.get_data_arrow(query=query, params=params).cast(schema)
+
+    @classmethod
+    def write_table(cls, table, storage_path, partition_column, partition_values, options=None):
+        """
+        Writes the given pyarrow Table to Parquet files at the specified storage path, partitioned by one column.
+        Like to_parquet, the partitions present in the table replace their previous files.
+
+        Parameters:
+        -----------
+        table : pyarrow.Table
+            Data to write to the Parquet files.
+        storage_path : str
+            Path to store the Parquet files.
+        partition_column : str
+            Name of the partition column added to the table.
+        partition_values : callable
+            Returns the partition value of every row of the table as a string array.
+        options : ParquetWriteOptions, optional
+            Layout options of the dataset. Defaults to ParquetWriteOptions().
+        """
+        options = options or ParquetWriteOptions()
+        if options.sort_by:
+            table = table.sort_by([(column, 'ascending') for column in options.sort_by])
+        os.makedirs(storage_path, exist_ok=True)
+        written_files = []
+        pq.write_to_dataset(
+            table.append_column(partition_column, partition_values(table)),
+            storage_path,
+            partition_cols=[partition_column],
+            existing_data_behavior='delete_matching',
+            file_visitor=lambda written_file: written_files.append(written_file.path),
+            **cls.dataset_arguments(options)
+        )
+        run_metrics.add_bytes(sum(path_size(path) for path in written_files))
+
+    @staticmethod
+    def to_record_batch(rows, schema):
+        """
+        Converts fetched rows to a RecordBatch with the given schema.
+
+        Parameters:
+        -----------
+        rows : list of tuple
+            Rows in the column order of the schema.
+        schema : pyarrow.Schema
+            Schema of the batch. Values are cast to its types, e.g. dates to timestamps and numerics to floats.
+
+        Returns:
+        --------
+        pyarrow.RecordBatch
+            The rows as a RecordBatch.
+        """
+        columns = zip(*rows)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(list(values)).cast(field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+    def stream_to_parquet(self, query, storage_path, schema, partition_column, partition_values, params=None,
+                          options=None):
+        """
+        Streams the result of the given SQL query from a server-side cursor into partitioned Parquet files.
+
+        Every fetched batch is split by partition and appended as a row group to one file per partition,
+        so memory is bounded by the batch size rather than the result size. The files are written into a
+        temporary sibling directory of the storage path and swapped in partition by partition once the whole
+        result has been written, so a failing stream leaves the previous export untouched. As with to_parquet,
+        a partition written by this export replaces its previous files, while other partitions are kept.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query to execute.
+        storage_path : str
+            Path to store the Parquet files.
+        schema : pyarrow.Schema
+            Schema of the query result.
+        partition_column : str
+            Name of the partition directory key.
+        partition_values : callable
+            Returns the partition value of every row of a RecordBatch as a string array.
+        params : dict, optional
+            Parameters of the SQL query.
+        options : ParquetWriteOptions, optional
+            Layout options of the dataset. Defaults to ParquetWriteOptions().
+        """
+        options = options or ParquetWriteOptions()
+        storage_path = os.path.normpath(storage_path)
+        os.makedirs(storage_path, exist_ok=True)
+        staging_path = tempfile.mkdtemp(prefix=f"{os.path.basename(storage_path)}.",
+                                        dir=os.path.dirname(storage_path))
+        try:
+            writers = {}
+            try:
+                for rows in self.connection_object.iter_batches_sql(query, params,
+                                                                    batch_size=self.stream_batch_size):
+                    batch = self.to_record_batch(rows, schema)
+                    if options.sort_by:
+                        batch = batch.sort_by([(column, 'ascending') for column in options.sort_by])
+                    partitions = partition_values(batch)
+                    for value in pc.unique(partitions).to_pylist():
+                        if value not in writers:
+                            partition_path = os.path.join(staging_path, f"{partition_column}={value}")
+                            os.makedirs(partition_path)
+                            writers[value] = pq.ParquetWriter(os.path.join(partition_path, 'part-0.parquet'),
+                                                              schema, **self.writer_arguments(options))
+                        writers[value].write_batch(batch.filter(pc.equal(partitions, value)),
+                                                   row_group_size=options.row_group_size)
+            finally:
+                for writer in writers.values():
+                    writer.close()
+            run_metrics.add_bytes(path_size(staging_path))
+            for partition in os.listdir(staging_path):
+                partition_path = os.path.join(storage_path, partition)
+                if os.path.exists(partition_path):
+                    # Move the previous files aside first, the rename of a directory cannot replace a non-empty one
+                    os.rename(partition_path, os.path.join(staging_path, f"{partition}.previous"))
+                os.rename(os.path.join(staging_path, partition), partition_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+    @staticmethod
+    def month_partitions(batch):
+        """
+        Returns the 'YYYY-MM' month of the visit_date of every row, like the pandas partition_date column.
+        """
+        return pc.strftime(batch.column('visit_date'), format='%Y-%m')
+
+    @staticmethod
+    def facility_type_partitions(batch):
+        """
+        Returns the facility_type of every row with spaces replaced, like the pandas facility_type_partition column.
+        """
+        return pc.replace_substring(batch.column('facility_type'), ' ', '_')
+
+    @staticmethod
+    def add_month_partition(df):
+        """
+        Converts visit_date to datetime and adds its month as the partition_date column.
         """
-        df = self.read_data(TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL)
         df['visit_date'] = pd.to_datetime(df['visit_date'])
         df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+
+    @staticmethod
+    def month_range(partitions):
+        """
+        Returns the range spanning the given months.
+
+        Parameters:
+        -----------
+        partitions : list of str
+            'YYYY-MM' months.
+
+        Returns:
+        --------
+        dict
+            range_start, the first day of the earliest month, and range_end, the first day after the latest month.
+        """
+        first_year, first_month = map(int, min(partitions).split('-'))
+        last_year, last_month = map(int, max(partitions).split('-'))
+        return {
+            'range_start': date(first_year, first_month, 1),
+            'range_end': date(last_year + last_month // 12, last_month % 12 + 1, 1)
+        }
+
+    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
+    @staticmethod
+    def add_facility_type_partition(df):
+        """
+        Adds facility_type with spaces replaced as the facility_type_partition column.
+        """
+        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
+
+    @staticmethod
+    def load_export_state(storage_path):
+        """
+        Reads the state of the last export to the given storage path.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the exported Parquet files.
+
+        Returns:
+        --------
+        dict or None
+            The export fingerprint and the last exported visit id, or None if there was no export.
+        """
+        state_path = os.path.join(storage_path, EXPORT_STATE_FILE)
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def save_export_state(storage_path, state):
+        """
+        Writes the state of a finished export to the given storage path atomically.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the exported Parquet files.
+        state : dict
+            The export fingerprint and the last exported visit id.
+        """
+        state_path = os.path.join(storage_path, EXPORT_STATE_FILE)
+        with open(f"{state_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(f"{state_path}.tmp", state_path)
+
+    def changed_partitions(self, query, storage_path, changed_partitions_query, options):
+        """
+        Determines the partitions touched by the visits loaded since the last export.
+
+        Parameters:
+        -----------
+        query : str
+            SQL query of the export.
+        storage_path : str
+            Path of the exported Parquet files.
+        changed_partitions_query : str
+            SQL query returning the partition values of the visits in an id range.
+        options : ParquetWriteOptions
+            Layout options of the dataset.
+
+        Returns:
+        --------
+        tuple of (list of str or None, dict)
+            The changed partition values, or None if every partition has to be exported because there is no
+            previous export with the same query, extraction method and write options, or the visits were
+            reloaded, and the state to store afterwards.
+        """
+        cursor = self.connection_object.get_connection().cursor()
+        try:
+            cursor.execute(SELECT_MAX_VISIT_ID_QUERY)
+            max_visit_id = cursor.fetchone()[0]
+            state = {
+                # A changed layout must be applied to every partition, not only to the changed ones
+                'export_fingerprint': hashlib.sha256(json.dumps(
+                    [query, self.extraction_method, asdict(options)], sort_keys=True
+                ).encode('utf-8')).hexdigest(),
+                'last_visit_id': max_visit_id,
+            }
+            stored = self.load_export_state(storage_path)
+            if (not stored or stored.get('export_fingerprint') != state['export_fingerprint']
+                    or stored['last_visit_id'] > max_visit_id):
+                return None, state
+            cursor.execute(changed_partitions_query, {
+                'last_visit_id': stored['last_visit_id'],
+                'max_visit_id': max_visit_id,
+            })
+            return sorted(row[0] for row in cursor.fetchall()), state
+        finally:
+            cursor.close()
+
+    def export(self, dataset, query, storage_path, schema, partition_column, partition_values, add_partition_column,
+               changed_partitions_query, filter_query, range_sources=None):
+        """
+        Exports the result of the given SQL query to partitioned Parquet files with the configured extraction
+        method. In incremental mode, only the partitions changed since the last export are re-queried and
+        rewritten; the other partition directories are left untouched.
+
+        Parameters:
+        -----------
+        dataset : str
+            Name of the dataset, the key of its parquet_storage_config.write_options entry.
+        query : str
+            SQL query to export.
+        storage_path : str
+            Path to store the Parquet files.
+        schema : pyarrow.Schema
+            Schema of the query result, used by the 'stream' and 'copy' extraction methods.
+        partition_column : str
+            Name of the partition column.
+        partition_values : callable
+            Returns the partition values of a RecordBatch or Table, used by the 'stream' and 'copy' extraction
+            methods.
+        add_partition_column : callable
+            Adds the partition column to a DataFrame, used by the 'pandas' extraction method.
+        changed_partitions_query : str
+            SQL query returning the partition values of the visits in an id range.
+        filter_query : str
+            Template restricting the query to a list of partition values.
+        range_sources : dict, optional
+            Table references of the query, mapped to replacements bounding them to the range of the changed
+            months, see month_range(). Only for month partitioned datasets.
+        """
+        options = (parquet_storage_config.write_options or {}).get(dataset, ParquetWriteOptions())
+        params = None
+        state = None
+        if self.incremental_export:
+            partitions, state = self.changed_partitions(query, storage_path, changed_partitions_query, options)
+            if partitions is not None:
+                logging.info(f"{len(partitions)} partitions of {storage_path} changed since the last export")
+                if not partitions:
+                    return
+                query = filter_query.format(query=query.strip().rstrip(';'))
+                params = {'partitions': partitions}
+                if range_sources:
+                    for source, bounded_source in range_sources.items():
+                        query = re.sub(rf'\b{source}\b', bounded_source, query)
+                    params.update(self.month_range(partitions))
+        if self.extraction_method == 'stream':
+            self.stream_to_parquet(
+                query=query,
+                storage_path=storage_path,
+                schema=schema,
+                partition_column=partition_column,
+                partition_values=partition_values,
+                params=params,
+                options=options
+            )
+        elif self.extraction_method == 'copy':
+            self.write_table(
+                table=self.read_table(query, params, schema),
+                storage_path=storage_path,
+                partition_column=partition_column,
+                partition_values=partition_values,
+                options=options
+            )
+        else:
+            df = self.read_data(query, params)
+            add_partition_column(df)
+            self.to_parquet(df=df, storage_path=storage_path, partition_columns=[partition_column], options=options)
+        if state:
+            self.save_export_state(storage_path, state)
+
+    @register_transform(
+        'facility_type_avg_time_spent_per_visit_date',
+        TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+        TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
+    )
+    def transform_facility_type_avg_time_spent_per_visit_date(self):
+        """
+        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        """
+        self.export(
+            dataset='facility_type_avg_time_spent_per_visit_date',
+            query=transform_query('facility_type_avg_time_spent_per_visit_date', self.use_aggregates),
             storage_path=self.storage_path_facility_type_avg_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            schema=FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+            partition_column='partition_date',
+            partition_values=self.month_partitions,
+            add_partition_column=self.add_month_partition,
+            changed_partitions_query=SELECT_CHANGED_VISIT_MONTHS_QUERY,
+            filter_query=FILTER_TRANSFORM_BY_MONTH_SQL,
+            range_sources=(
+                {'agg_visits_daily_facility a': AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL} if self.use_aggregates
+                else {'visits v': VISITS_IN_RANGE_SQL}
+            )
         )
 
-    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
+    @register_transform(
+        'patient_sum_treatment_cost_per_facility_type',
+        TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+        TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_AGG_SQL
+    )
     def transform_patient_sum_treatment_cost_per_facility_type(self):
         """
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL)
-        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
-        self.to_parquet(
-            df=df,
+        self.export(
+            dataset='patient_sum_treatment_cost_per_facility_type',
+            query=transform_query('patient_sum_treatment_cost_per_facility_type', self.use_aggregates),
             storage_path=self.storage_path_patient_sum_treatment_cost_per_facility_type,
-            partition_columns=['facility_type_partition']
+            schema=PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA,
+            partition_column='facility_type_partition',
+            partition_values=self.facility_type_partitions,
+            add_partition_column=self.add_facility_type_partition,
+            changed_partitions_query=SELECT_CHANGED_FACILITY_TYPE_PARTITIONS_QUERY,
+            filter_query=FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL
         )
 
+    @register_transform(
+        'facility_name_min_time_spent_per_visit_date',
+        TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
+        TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
+    )
     def transform_facility_name_min_time_spent_per_visit_date(self):
         """
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL)
-        df['visit_date'] = pd.to_datetime(df['visit_date'])
-        df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+        self.export(
+            dataset='facility_name_min_time_spent_per_visit_date',
+            query=transform_query('facility_name_min_time_spent_per_visit_date', self.use_aggregates),
             storage_path=self.storage_path_facility_name_min_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            schema=FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+            partition_column='partition_date',
+            partition_values=self.month_partitions,
+            add_partition_column=self.add_month_partition,
+            changed_partitions_query=SELECT_CHANGED_VISIT_MONTHS_QUERY,
+            filter_query=FILTER_TRANSFORM_BY_MONTH_SQL,
+            range_sources=(
+                {'agg_visits_daily_facility a': AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL} if self.use_aggregates
+                else {'visits v': VISITS_IN_RANGE_SQL}
+            )
         )
 
+    def run_transform(self, name):
+        """
+        Runs one registered transform and measures it without raising its error.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the transform method.
+
+        Returns:
+        --------
+        tuple of (float, Exception or None)
+            The seconds the transform took and its error, if it failed.
+        """
+        started = time.perf_counter()
+        error = None
+        try:
+            getattr(self, name)()
+        except Exception as e:
+            logging.exception(f"Transform {name} FAILED: {e}")
+            error = e
+        seconds = time.perf_counter() - started
+        logging.info(f"Transform {name} {'failed' if error else 'completed'} in {seconds:.2f}s")
+        return seconds, error
+
+    def run_concurrently(self):
+        """
+        Runs all registered transforms on a thread pool of up to num_workers threads. Every worker opens its
+        own database connection, as the transforms are independent read-only queries writing to separate
+        storage paths. All connections are closed once the transforms finished.
+
+        Returns:
+        --------
+        dict
+            The (seconds, error) result of run_transform() per transform name.
+        """
+        worker = threading.local()
+        lock = threading.Lock()
+        with ExitStack() as connections:
+            def bind_connection():
+                with lock:
+                    connection_object = connections.enter_context(PostgresConnectorContextManager())
+                worker.loader = LoadParquet(connection_object)
+
+            def run(name):
+                return worker.loader.run_transform(name)
+
+            with ThreadPoolExecutor(max_workers=min(self.num_workers, len(TRANSFORMS)),
+                                    initializer=bind_connection) as executor:
+                futures = {name: executor.submit(run, name) for name in TRANSFORMS}
+            return {name: future.result() for name, future in futures.items()}
+
     def load_parquet(self):
         """
-        Executes all transformations and loads the results into Parquet files.
+        Executes all registered transformations and loads the results into Parquet files.
+
+        With num_workers greater than 1 the transforms run concurrently, otherwise one after another on the
+        connection of this instance. A failing transform does not stop the others; once all of them finished,
+        the failures are raised together.
+
+        Returns:
+        --------
+        dict
+            Seconds taken by every transform, keyed by transform name.
+
+        Raises:
+        -------
+        RuntimeError
+            If any transform failed. The first failure is chained as the cause.
         """
-        self.transform_facility_type_avg_time_spent_per_visit_date()
-        self.transform_patient_sum_treatment_cost_per_facility_type()
-        self.transform_facility_name_min_time_spent_per_visit_date()
+        if self.num_workers > 1:
+            results = self.run_concurrently()
+        else:
+            results = {name: self.run_transform(name) for name in TRANSFORMS}
+        self.timings = {name: seconds for name, (seconds, _) in results.items()}
+        failed = {name: error for name, (_, error) in results.items() if error}
+        if failed:
+            raise RuntimeError(f"Transforms {sorted(failed)} failed") from next(iter(failed.values()))
+        return self.timings
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import logging
+
+import numpy as np
+
+from data_dev.src.data.data_generator import DataGenerator
+from data_dev.config import data_generator_config
+
+
+@dataclass
+class GenerationShard:
+    """
+    A dataclass describing one independently generated and loadable slice of the src data.
+
+    Attributes:
+        index (int): The position of the shard in the shard plan.
+        seed (int): The seed of the shard, derived from the master seed and the shard index.
+        first_patient_id (int): The first patient ID generated by the shard.
+        last_patient_id (int): The last patient ID generated by the shard. Smaller than first_patient_id
+                               when the shard generates no patients.
+        start_date (datetime): The first visit date generated by the shard.
+        end_date (datetime): The last visit date generated by the shard.
+    """
+    index: int
+    seed: int
+    first_patient_id: int
+    last_patient_id: int
+    start_date: datetime
+    end_date: datetime
+
+
+def derive_seed(master_seed, index):
+    """
+    Derives a statistically independent seed for a shard from the master seed.
+
+    Args:
+        master_seed (int): The master seed of the run.
+        index (int): The shard index.
+
+    Returns:
+        int: The seed of the shard.
+    """
+    return int(np.random.SeedSequence([master_seed, index]).generate_state(1)[0])
+
+
+def generate_shard_window(shard, window_index, start_date, end_date):
+    """
+    Generates the visits of one window of a shard, and the patients of the shard with its first window.
+
+    Defined at module level so it can be sent to worker processes. Every window gets its own seed derived
+    from the shard seed and the window index, so the windows of a shard can be generated independently.
+
+    Args:
+        shard (GenerationShard): The shard the window belongs to.
+        window_index (int): The position of the window in the shard.
+        start_date (datetime): The first visit date of the window.
+        end_date (datetime): The last visit date of the window.
+
+    Returns:
+        Tuple[List[dict] or Dict[str, np.ndarray] or None, List[dict] or Dict[str, np.ndarray]]: The patients of
+        the shard (None for all but the first window) and the visits of the window.
+    """
+    dg = DataGenerator(seed=derive_seed(shard.seed, window_index))
+    patients = None
+    if window_index == 0 and dg.value_pool is not None:
+        patients = dg.generate_patients_columnar(shard.first_patient_id, shard.last_patient_id)
+    elif window_index == 0:
+        patients = dg.generate_patients(shard.first_patient_id, shard.last_patient_id)
+    if dg.columnar_visits:
+        visits = dg.generate_visits_columnar(start_date, end_date)
+    else:
+        visits = dg.generate_visits(start_date, end_date)
+    return patients, visits
+
+
+class ShardedDataGenerator:
+    """
+    A class to generate the src data in shards on a process pool.
+
+    The date range and the patient ID range are split into num_shards contiguous slices. Every shard gets its own
+    seed derived from the master seed, and every shard is generated in windows of visits_chunk_days days seeded
+    from the shard seed, so the generated data depends only on the master seed, num_shards and visits_chunk_days,
+    no matter how many worker processes run or in which order they finish.
+
+    Attributes:
+        master_seed (int): The master seed. A random one is drawn and logged when none is configured.
+        num_shards (int): The number of shards, sourced from generator_config.num_shards.
+        num_workers (int): The number of worker processes, sourced from generator_config.num_workers.
+        end_date (datetime): The last visit date of the last shard.
+    """
+
+    def __init__(self, seed=None, end_date=None):
+        """
+        Initializes the ShardedDataGenerator with configuration values.
+
+        Args:
+            seed (int, optional): The master seed. Defaults to data_generator_config.seed.
+            end_date (datetime, optional): The last visit date of the last shard. Defaults to the configured end_date.
+        """
+        if seed is None:
+            seed = data_generator_config.seed
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+            logging.info(f"No generation seed configured, using master seed {seed}")
+        self.master_seed = seed
+        self.num_shards = data_generator_config.num_shards
+        self.num_workers = data_generator_config.num_workers
+        self.end_date = end_date or datetime.strptime(data_generator_config.end_date, data_generator_config.date_format)
+
+    def plan_shards(self):
+        """
+        Splits the configured date range and patient ID range into num_shards shards.
+
+        Returns:
+            List[GenerationShard]: The shards in date order.
+        """
+        date_format = data_generator_config.date_format
+        start_date = datetime.strptime(data_generator_config.start_date, date_format)
+        num_days = (self.end_date - start_date).days + 1
+        day_bounds = np.linspace(0, num_days, self.num_shards + 1).astype(int)
+        patient_bounds = np.linspace(0, data_generator_config.num_patients, self.num_shards + 1).astype(int)
+        return [
+            GenerationShard(
+                index=i,
+                seed=derive_seed(self.master_seed, i),
+                first_patient_id=int(patient_bounds[i]) + 1,
+                last_patient_id=int(patient_bounds[i + 1]),
+                start_date=start_date + timedelta(days=int(day_bounds[i])),
+                end_date=start_date + timedelta(days=int(day_bounds[i + 1]) - 1)
+            )
+            for i in range(self.num_shards)
+            if day_bounds[i + 1] > day_bounds[i] or patient_bounds[i + 1] > patient_bounds[i]
+        ]
+
+    def generate_facilities(self):
+        """
+        Generates the facilities, which are shared by all shards, from the master seed.
+
+        Returns:
+            List[dict]: A list of facility data dictionaries.
+        """
+        return DataGenerator(seed=self.master_seed).generate_facilities()
+
+    @staticmethod
+    def plan_windows(shard):
+        """
+        Splits the date range of a shard into windows of visits_chunk_days days, like DataGenerator.iter_visits().
+
+        Args:
+            shard (GenerationShard): The shard to split.
+
+        Returns:
+            List[Tuple[datetime, datetime]]: The first and last visit date of every window. A shard without
+            days still gets one (empty) window, which generates its patients.
+        """
+        chunk_days = data_generator_config.visits_chunk_days
+        windows = []
+        window_start = shard.start_date
+        while window_start <= shard.end_date:
+            window_end = min(window_start + timedelta(days=chunk_days - 1), shard.end_date)
+            windows.append((window_start, window_end))
+            window_start = window_end + timedelta(days=1)
+        return windows or [(shard.start_date, shard.end_date)]
+
+    def iter_shards(self):
+        """
+        Generates the shards window by window on a process pool and yields the windows in shard and date order.
+
+        At most two windows per worker are in flight at a time, so memory is bounded by the window size
+        (visits_chunk_days) rather than by the shard size.
+
+        Yields:
+            Tuple[GenerationShard, List[dict] or Dict[str, np.ndarray] or None, List[dict] or Dict[str, np.ndarray]]:
+            The shard, its patients with its first window (None otherwise) and the visits of the window.
+        """
+        windows = [(shard, window_index, start_date, end_date)
+                   for shard in self.plan_shards()
+                   for window_index, (start_date, end_date) in enumerate(self.plan_windows(shard))]
+        max_in_flight = 2 * self.num_workers
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = [executor.submit(generate_shard_window, *window) for window in windows[:max_in_flight]]
+            for i, window in enumerate(windows):
+                patients, visits = futures[i].result()
+                futures[i] = None
+                if i + max_in_flight < len(windows):
+                    futures.append(executor.submit(generate_shard_window, *windows[i + max_in_flight]))
+                yield window[0], patients, visits
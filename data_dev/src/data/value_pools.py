@@ -0,0 +1,96 @@
+import json
+import os
+
+import faker
+import numpy as np
+from faker import Faker
+
+# Faker providers sampled into the pools, each pool is named after its provider
+POOL_PROVIDERS = ('first_name', 'last_name', 'address', 'company')
+
+# Pools already loaded by this process, keyed by cache file path
+_loaded_pools = {}
+
+
+class FakerValuePool:
+    """
+    A class holding bounded pools of pre-sampled Faker values.
+
+    Calling slow Faker providers once per entity does not scale to millions of patients. The pools are
+    sampled once, cached on disk as JSON between runs and in memory per process, and entities are then
+    assembled by drawing random pool indexes with NumPy, so throughput no longer depends on provider cost.
+
+    Attributes:
+        pool_size (int): The number of values sampled per provider.
+        seed (int or None): The seed of the Faker instance the pools are sampled with.
+        cache_path (str): The JSON file the pools are cached in.
+        pools (Dict[str, np.ndarray]): The pooled values, keyed by pool name.
+    """
+
+    def __init__(self, pool_size, cache_dir, seed=None):
+        """
+        Initializes the FakerValuePool, loading the pools from cache or sampling them.
+
+        Args:
+            pool_size (int): The number of values sampled per provider.
+            cache_dir (str): The directory the pools are cached in.
+            seed (int, optional): The seed of the Faker instance the pools are sampled with.
+        """
+        self.pool_size = pool_size
+        self.seed = seed
+        seed_tag = 'unseeded' if seed is None else seed
+        self.cache_path = os.path.join(
+            cache_dir, f"faker_{faker.VERSION}_pool_{pool_size}_seed_{seed_tag}.json"
+        )
+        if self.cache_path not in _loaded_pools:
+            _loaded_pools[self.cache_path] = self.load_or_build()
+        self.pools = _loaded_pools[self.cache_path]
+
+    def build(self):
+        """
+        Samples pool_size values from every pooled Faker provider.
+
+        Returns:
+            Dict[str, List[str]]: The sampled values, keyed by pool name.
+        """
+        fake = Faker()
+        if self.seed is not None:
+            fake.seed_instance(self.seed)
+        return {
+            provider: [getattr(fake, provider)() for _ in range(self.pool_size)]
+            for provider in POOL_PROVIDERS
+        }
+
+    def load_or_build(self):
+        """
+        Loads the pools from the cache file, or builds and caches them if the file does not exist.
+
+        Returns:
+            Dict[str, np.ndarray]: The pooled values, keyed by pool name.
+        """
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, encoding='utf-8') as f:
+                values = json.load(f)
+        else:
+            values = self.build()
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(values, f)
+            os.replace(tmp_path, self.cache_path)
+        return {name: np.array(pool, dtype=object) for name, pool in values.items()}
+
+    def sample(self, name, size, rng):
+        """
+        Draws values from a pool by vectorized index sampling.
+
+        Args:
+            name (str): The pool name, one of POOL_PROVIDERS.
+            size (int): The number of values to draw.
+            rng (np.random.Generator): The random generator the indexes are drawn with.
+
+        Returns:
+            np.ndarray: The drawn values.
+        """
+        pool = self.pools[name]
+        return pool[rng.integers(0, len(pool), size=size)]
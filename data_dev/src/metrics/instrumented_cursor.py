@@ -0,0 +1,62 @@
+import time
+
+from psycopg2.extensions import cursor as _cursor
+
+from data_dev import queries
+from data_dev.src.metrics.run_metrics import run_metrics
+
+# Names of the SQL constants in data_dev/queries.py, keyed by their text
+STATEMENT_NAMES = {
+    value: name for name, value in vars(queries).items()
+    if isinstance(value, str) and name.endswith(('_QUERY', '_SQL'))
+}
+
+
+def statement_name(query):
+    """
+    Return a stable name of a SQL statement for the metrics.
+
+    Args:
+        query (str or psycopg2.sql.Composable): The executed statement.
+
+    Returns:
+        str: The name of the matching data_dev/queries.py constant, or the first words of the statement.
+    """
+    if not isinstance(query, str):
+        return type(query).__name__
+    if query in STATEMENT_NAMES:
+        return STATEMENT_NAMES[query]
+    return ' '.join(query.split()[:3])
+
+
+class InstrumentedCursor(_cursor):
+    """
+    A psycopg2 cursor recording every execute() and copy_expert() call into run_metrics. A named (server-side)
+    cursor returns no rows from execute(), so its fetchmany() calls are recorded as FETCH statements.
+
+    Used as cursor_factory of the pipeline connections when metrics_config.enabled is set.
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            run_metrics.record_statement(statement_name(query), time.perf_counter() - started, self.rowcount)
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        position = file.tell() if file.seekable() else None
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            copied = file.tell() - position if position is not None else 0
+            run_metrics.record_statement(statement_name(sql), time.perf_counter() - started, self.rowcount,
+                                         copied)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        if self.name:
+            run_metrics.record_statement('FETCH', time.perf_counter() - started, len(rows))
+        return rows
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import uuid
+import resource
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from data_dev.config import metrics_config
+
+
+def cpu_seconds():
+    """
+    Return the CPU time used so far by this process and its terminated child processes.
+
+    Returns:
+        float: User plus system CPU seconds.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+# Interval of the RSS sampling of a running stage
+RSS_SAMPLE_SECONDS = 0.05
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_mb(pid='self'):
+    """
+    Return the current resident set size of a process from /proc.
+
+    Args:
+        pid (int or str): The process id, 'self' for this process.
+
+    Returns:
+        float: The RSS in MiB, 0 if it cannot be read (the process exited, or there is no /proc).
+    """
+    try:
+        with open(f'/proc/{pid}/statm', encoding='ascii') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / 2 ** 20
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def process_tree_rss_mb():
+    """
+    Return the current resident set size of this process and its child processes, e.g. the generation workers.
+
+    Returns:
+        float: The RSS in MiB.
+    """
+    children = set()
+    try:
+        for task in os.listdir('/proc/self/task'):
+            with open(f'/proc/self/task/{task}/children', encoding='ascii') as f:
+                children.update(f.read().split())
+    except OSError:
+        pass
+    return rss_mb() + sum(rss_mb(pid) for pid in children)
+
+
+def sample_peak_rss(stage, stopped):
+    """
+    Sample the RSS of the process tree until stopped, keeping the highest value in stage['peak_rss_mb'].
+
+    Args:
+        stage (dict): The metrics of the running stage.
+        stopped (threading.Event): Set when the stage finished.
+    """
+    while True:
+        stage['peak_rss_mb'] = max(stage['peak_rss_mb'], process_tree_rss_mb())
+        if stopped.wait(RSS_SAMPLE_SECONDS):
+            return
+
+
+def path_size(path):
+    """
+    Return the size of a file, or the total size of the files below a directory.
+
+    Args:
+        path (str): The file or directory.
+
+    Returns:
+        int: The size in bytes, 0 if the path does not exist.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, file))
+        for root, _, files in os.walk(path)
+        for file in files
+    )
+
+
+class RunMetrics:
+    """
+    A class collecting the metrics of one pipeline run.
+
+    Stages are measured with the stage() context manager: wall time, CPU time, peak RSS, rows affected and
+    bytes written. The peak RSS of a stage is sampled every RSS_SAMPLE_SECONDS while it runs, over this process
+    and its child processes, so it covers the stage only (and the stages running concurrently with it). SQL statements executed through InstrumentedCursor are attributed to the stage running
+    in the same thread, or to the only running stage when called from a helper thread of that stage,
+    and are aggregated per statement name. Stages can run concurrently in separate threads.
+
+    Attributes:
+        run_id (str): A unique id of the run.
+        started_at (str): The ISO timestamp the run started at.
+        stages (List[dict]): The metrics of every finished stage.
+        statements (Dict[Tuple[str, str], dict]): Calls, seconds, rows and bytes per stage and statement name.
+        running (List[dict]): The metrics of the running stages.
+        local (threading.local): Holds the stage running in the current thread.
+        lock (threading.Lock): Guards the recorded metrics.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty run record.
+        """
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+        self.statements = {}
+        self.running = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure a pipeline stage. A stage that raises is recorded as failed and the exception is re-raised.
+
+        Args:
+            name (str): The stage name.
+
+        Yields:
+            dict: The metrics of the stage, whose 'rows' and 'bytes' can be incremented by the caller.
+        """
+        stage = {'name': name, 'status': 'ok', 'rows': 0, 'bytes': 0, 'statements': 0, 'peak_rss_mb': 0.0}
+        with self.lock:
+            self.running.append(stage)
+        self.local.stage = stage
+        stopped = threading.Event()
+        sampler = threading.Thread(target=sample_peak_rss, args=(stage, stopped), daemon=True)
+        sampler.start()
+        started, cpu_started = time.perf_counter(), cpu_seconds()
+        try:
+            yield stage
+        except Exception:
+            stage['status'] = 'failed'
+            raise
+        finally:
+            stage['wall_seconds'] = round(time.perf_counter() - started, 6)
+            stage['cpu_seconds'] = round(cpu_seconds() - cpu_started, 6)
+            stopped.set()
+            sampler.join()
+            stage['peak_rss_mb'] = round(stage['peak_rss_mb'], 1)
+            self.local.stage = None
+            with self.lock:
+                self.running.remove(stage)
+                self.stages.append(stage)
+
+    def current_stage(self):
+        """
+        Return the stage metrics are attributed to in the current thread.
+
+        Returns:
+            dict or None: The stage running in this thread, else the only running stage, else None.
+        """
+        stage = getattr(self.local, 'stage', None)
+        if stage is None and len(self.running) == 1:
+            stage = self.running[0]
+        return stage
+
+    def record_statement(self, name, seconds, rows, written_bytes=0):
+        """
+        Record one executed SQL statement for the running stage.
+
+        Args:
+            name (str): The statement name.
+            seconds (float): The execution time.
+            rows (int): The rows affected or returned, negative if unknown.
+            written_bytes (int): The bytes sent or received by COPY.
+        """
+        rows = max(rows, 0)
+        stage = self.current_stage()
+        stage_name = stage['name'] if stage else None
+        with self.lock:
+            stats = self.statements.setdefault(
+                (stage_name, name), {'stage': stage_name, 'statement': name,
+                                     'calls': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0}
+            )
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['rows'] += rows
+            stats['bytes'] += written_bytes
+            if stage:
+                stage['statements'] += 1
+                stage['rows'] += rows
+                stage['bytes'] += written_bytes
+
+    def add_bytes(self, written_bytes):
+        """
+        Add bytes written outside of SQL statements (e.g. files) to the running stage.
+
+        Args:
+            written_bytes (int): The number of bytes.
+        """
+        stage = self.current_stage()
+        with self.lock:
+            if stage:
+                stage['bytes'] += written_bytes
+
+    def to_record(self):
+        """
+        Return the run record.
+
+        Returns:
+            dict: The JSON serializable run record.
+        """
+        with self.lock:
+            return {
+                'run_id': self.run_id,
+                'started_at': self.started_at,
+                'stages': list(self.stages),
+                'statements': sorted(self.statements.values(), key=lambda s: -s['seconds']),
+            }
+
+    def write(self, output_path=None, history_path=None):
+        """
+        Write the run record as JSON and append it to the JSON Lines history.
+
+        Args:
+            output_path (str, optional): Defaults to metrics_config.output_path.
+            history_path (str, optional): Defaults to metrics_config.history_path.
+
+        Returns:
+            dict: The written run record.
+        """
+        output_path = output_path or metrics_config.output_path
+        history_path = history_path or metrics_config.history_path
+        record = self.to_record()
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        os.makedirs(os.path.dirname(history_path), exist_ok=True)
+        with open(history_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
+
+
+# Metrics of the current pipeline run
+run_metrics = RunMetrics()
@@ -0,0 +1,151 @@
+import os
+import json
+import logging
+import threading
+from dataclasses import asdict
+from datetime import datetime
+
+from data_dev.src.pipeline.scheduler import fingerprint
+from data_dev.config import (load_config, data_generator_config, src_load_config,
+                             parquet_storage_config, report_generator_config, pipeline_config)
+
+
+def run_key(command):
+    """
+    Return the key of a pipeline run: the date_scope, the main.py command and a fingerprint of the configuration
+    the stages read.
+
+    Args:
+        command (str): The main.py command, i.e. the stage group of the run.
+
+    Returns:
+        Tuple[str, str, str]: The date_scope, the command and the input fingerprint.
+    """
+    return load_config.date_scope, command, fingerprint(
+        asdict(load_config), asdict(data_generator_config), asdict(src_load_config),
+        asdict(parquet_storage_config), asdict(report_generator_config)
+    )
+
+
+class RunCheckpoint:
+    """
+    A class persisting which stages of a pipeline run completed, so a failed run can be resumed.
+
+    The checkpoint file holds one entry per run key (date_scope, command and configuration fingerprint), each
+    recording the input fingerprint of every completed stage. A run only writes and clears the entry of its own
+    key, so running another command or configuration in between does not lose the checkpoint of a failed run.
+    A resumed run skips a stage only if its current input fingerprint equals the recorded one, so stages without
+    a fingerprint always run. A fresh run starts its entry anew once its first stage completes, and a run whose
+    stages all succeeded clears it, so resuming only ever resumes a failed run.
+
+    Attributes:
+        path (str): The JSON file of the checkpoints, sourced from pipeline_config.checkpoint_path.
+        date_scope (str): The date_scope of the run.
+        command (str): The main.py command of the run.
+        input_fingerprint (str): The fingerprint of the run configuration.
+        key (str): The key of the entry of this run in the checkpoint file.
+        completed (Dict[str, dict]): The input fingerprint and finish time of every completed stage,
+                                     keyed by stage name.
+        lock (threading.Lock): Serializes updates from concurrently running stages.
+    """
+
+    def __init__(self, command='all', resume=False):
+        """
+        Initializes the RunCheckpoint, resuming the stored entry of the same key if requested.
+
+        Args:
+            command (str): The main.py command of the run. Defaults to 'all'.
+            resume (bool): Whether the completed stages of the stored entry are kept.
+        """
+        self.path = pipeline_config.checkpoint_path
+        self.date_scope, self.command, self.input_fingerprint = run_key(command)
+        self.key = f"{self.date_scope}/{self.command}/{self.input_fingerprint}"
+        self.completed = {}
+        self.lock = threading.Lock()
+        if resume:
+            stored = self.load().get(self.key)
+            if stored:
+                self.completed = stored['completed']
+                logging.info(f"Resuming the {self.command} run of {self.date_scope}, "
+                             f"completed stages: {sorted(self.completed)}")
+            else:
+                logging.info(f"No checkpoint of a {self.command} run of {self.date_scope} with the same inputs, "
+                             f"starting fresh")
+
+    def load(self):
+        """
+        Reads the stored checkpoints.
+
+        Returns:
+            Dict[str, dict]: The stored entries keyed by run key, empty if there are none.
+        """
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def write(self, entries):
+        """
+        Writes the checkpoint entries atomically, or removes the file if there are none.
+
+        Args:
+            entries (Dict[str, dict]): The entries keyed by run key.
+        """
+        if not entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        """
+        Writes the entry of this run, keeping those of other run keys. Callers hold self.lock.
+        """
+        entries = self.load()
+        entries[self.key] = {
+            'date_scope': self.date_scope,
+            'command': self.command,
+            'input_fingerprint': self.input_fingerprint,
+            'completed': self.completed,
+        }
+        self.write(entries)
+
+    def is_completed(self, stage_name, stage_fingerprint):
+        """
+        Args:
+            stage_name (str): The stage name.
+            stage_fingerprint (str or None): The current input fingerprint of the stage.
+
+        Returns:
+            bool: Whether the stage completed in this run with the same inputs.
+        """
+        entry = self.completed.get(stage_name)
+        return (stage_fingerprint is not None and isinstance(entry, dict)
+                and entry.get('fingerprint') == stage_fingerprint)
+
+    def mark_completed(self, stage_name, stage_fingerprint):
+        """
+        Records a completed stage and persists the checkpoint.
+
+        Args:
+            stage_name (str): The stage name.
+            stage_fingerprint (str or None): The input fingerprint the stage completed with.
+        """
+        with self.lock:
+            self.completed[stage_name] = {'fingerprint': stage_fingerprint,
+                                          'finished_at': datetime.now().isoformat(timespec='seconds')}
+            self.save()
+
+    def clear(self):
+        """
+        Removes the entry of this run after its stages all succeeded, keeping those of other run keys.
+        """
+        with self.lock:
+            self.completed = {}
+            entries = self.load()
+            if entries.pop(self.key, None) is not None:
+                self.write(entries)
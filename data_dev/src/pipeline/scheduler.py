@@ -0,0 +1,218 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from data_dev.src.metrics.run_metrics import run_metrics
+from data_dev.config import pipeline_config
+
+# Final statuses of a scheduled stage
+SUCCEEDED = 'succeeded'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+UPSTREAM_FAILED = 'upstream_failed'
+
+
+def fingerprint(*parts):
+    """
+    Return a stable hash of JSON serializable parts (values that are not serializable are hashed by str()).
+
+    Args:
+        *parts: The values the fingerprint is computed from.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    return hashlib.sha256(json.dumps(parts, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline stage.
+
+    Attributes:
+        name (str): The unique stage name.
+        run (Callable[[], None]): Runs the stage. Raises on failure.
+        inputs (List[str]): The resources (tables, paths) the stage reads. A stage depends on every stage
+                            declaring one of its inputs as output.
+        outputs (List[str]): The resources the stage writes.
+        fingerprint (Callable[[], Optional[str]], optional): Returns the fingerprint of the stage inputs, or None
+                                                            if it cannot be determined. Without it the stage
+                                                            always runs.
+        output_exists (Callable[[], bool], optional): Returns whether the stage output exists. A stage whose
+                                                      output is missing runs even if its inputs are unchanged.
+    """
+    name: str
+    run: Callable[[], None]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    fingerprint: Optional[Callable[[], Optional[str]]] = None
+    output_exists: Optional[Callable[[], bool]] = None
+
+
+class StageScheduler:
+    """
+    A class running pipeline stages as a dependency graph derived from their inputs and outputs.
+
+    Stages whose upstream stages are done run concurrently on a thread pool, so every stage must open its own
+    database connection. A stage is skipped when its input fingerprint equals the one stored for its last
+    successful run, or when a resumed RunCheckpoint lists it as completed with the same input fingerprint,
+    unless its output is missing.
+    When a stage fails, all stages downstream of it are not started and are reported as upstream_failed,
+    while independent branches still run to completion.
+
+    Attributes:
+        stages (Dict[str, Stage]): The stages, keyed by name.
+        upstream (Dict[str, Set[str]]): The names of the stages each stage depends on.
+        max_workers (int): The maximum number of concurrently running stages, sourced from pipeline_config.
+        state_path (str): The JSON file of the stored fingerprints, sourced from pipeline_config.
+        skip_unchanged (bool): Whether unchanged stages are skipped, sourced from pipeline_config and
+                               disabled by force.
+        state (Dict[str, dict]): The fingerprint and finish time of the last successful run per stage name.
+        checkpoint (RunCheckpoint or None): The checkpoint of the run, if any.
+        lock (threading.Lock): Serializes state updates from concurrently running stages.
+    """
+
+    def __init__(self, stages, checkpoint=None, force=False):
+        """
+        Initializes the StageScheduler and validates the stage graph.
+
+        Args:
+            stages (List[Stage]): The stages to schedule.
+            checkpoint (RunCheckpoint, optional): Records completed stages and lists those of a resumed run.
+            force (bool): Whether stages with unchanged inputs run anyway. Defaults to False.
+
+        Raises:
+            ValueError: If stage names are not unique, a resource is written by several stages,
+                        or the stages form a cycle.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"'{output}' is written by both '{producers[output]}' and '{stage.name}'")
+                producers[output] = stage.name
+        self.upstream = {
+            stage.name: {producers[i] for i in stage.inputs if i in producers and producers[i] != stage.name}
+            for stage in stages
+        }
+        self.check_acyclic()
+        self.max_workers = pipeline_config.max_workers
+        self.state_path = pipeline_config.state_path
+        self.skip_unchanged = pipeline_config.skip_unchanged and not force
+        self.state = self.load_state()
+        self.checkpoint = checkpoint
+        self.lock = threading.Lock()
+
+    def check_acyclic(self):
+        """
+        Raises:
+            ValueError: If the stages form a cycle.
+        """
+        resolved = set()
+        remaining = dict(self.upstream)
+        while remaining:
+            ready = [name for name, upstream in remaining.items() if upstream <= resolved]
+            if not ready:
+                raise ValueError(f"Stages {sorted(remaining)} form a dependency cycle")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    def load_state(self):
+        """
+        Reads the stored stage fingerprints.
+
+        Returns:
+            Dict[str, dict]: The stored state, empty if there is none.
+        """
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self):
+        """
+        Writes the stage fingerprints atomically. Callers hold self.lock, so concurrently finishing stages
+        do not write the same temporary file or lose each other's updates.
+        """
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run_stage(self, stage):
+        """
+        Runs one stage, unless it completed with the same input fingerprint in the resumed run or its inputs
+        are unchanged since its last successful run, and its output exists.
+
+        Args:
+            stage (Stage): The stage to run.
+
+        Returns:
+            str: SUCCEEDED, SKIPPED or FAILED.
+        """
+        current = stage.fingerprint() if stage.fingerprint else None
+        stored = self.state.get(stage.name, {}).get('fingerprint')
+        if stage.output_exists and not stage.output_exists():
+            logging.info(f"Stage {stage.name} runs, its output is missing")
+        elif self.checkpoint and self.checkpoint.is_completed(stage.name, current):
+            logging.info(f"Stage {stage.name} skipped, already completed with the same inputs in the resumed run")
+            return SKIPPED
+        elif self.skip_unchanged and current is not None and current == stored:
+            logging.info(f"Stage {stage.name} skipped, inputs unchanged since its last successful run")
+            if self.checkpoint:
+                self.checkpoint.mark_completed(stage.name, current)
+            return SKIPPED
+        logging.info(f"Starting stage {stage.name}...")
+        try:
+            with run_metrics.stage(stage.name):
+                stage.run()
+        except Exception as e:
+            logging.exception(f"Stage {stage.name} FAILED: {e}")
+            return FAILED
+        logging.info(f"Stage {stage.name} completed!")
+        with self.lock:
+            self.state[stage.name] = {'fingerprint': current,
+                                      'finished_at': datetime.now().isoformat(timespec='seconds')}
+            self.save_state()
+        if self.checkpoint:
+            self.checkpoint.mark_completed(stage.name, current)
+        return SUCCEEDED
+
+    def run(self):
+        """
+        Runs all stages in dependency order, independent stages concurrently.
+
+        Returns:
+            Dict[str, str]: The final status of every stage.
+        """
+        statuses = {}
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(statuses) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in statuses or name in pending.values():
+                        continue
+                    upstream = [statuses.get(u) for u in self.upstream[name]]
+                    if any(status in (FAILED, UPSTREAM_FAILED) for status in upstream):
+                        logging.warning(f"Stage {name} not started, an upstream stage failed")
+                        statuses[name] = UPSTREAM_FAILED
+                    elif all(status in (SUCCEEDED, SKIPPED) for status in upstream):
+                        pending[executor.submit(self.run_stage, stage)] = name
+                if not pending:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    statuses[pending.pop(future)] = future.result()
+        return statuses
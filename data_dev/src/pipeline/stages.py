@@ -0,0 +1,220 @@
+import os
+import logging
+from fnmatch import fnmatch
+from dataclasses import asdict
+
+# The loaders and the connector are imported inside the stage functions, so a process running a subset
+# of the stages only pays for the imports (Faker, pandas, pyarrow, Plotly, psycopg2) those stages need.
+from data_dev.src.pipeline.scheduler import Stage, fingerprint
+from data_dev.queries import (FINGERPRINT_SRC_GENERATED_TABLES_QUERY, FINGERPRINT_NF3_TABLES_QUERY,
+                             FLUSH_TABLE_STATS_QUERY)
+from data_dev.config import load_config, parquet_storage_config, report_generator_config
+
+# Resources read and written by the stages, besides the parquet and report paths
+SRC_GENERATED_TABLES = 'postgres:src_generated_tables'
+NF3_TABLES = 'postgres:3nf_tables'
+
+# Parquet export stages are named export_<dataset>, one per transform registered in LoadParquet
+EXPORT_STAGE_PREFIX = 'export_'
+
+# Stage name patterns run by every CLI command of main.py, None for all stages
+STAGE_GROUPS = {
+    'generate': ['generate_and_inject'],
+    'load-3nf': ['load_3nf'],
+    'export-parquet': [f'{EXPORT_STAGE_PREFIX}*'],
+    'report': ['generate_report'],
+    'all': None,
+}
+
+
+def table_fingerprint(query):
+    """
+    Return the fingerprint of the table statistics counters selected by a fingerprint query.
+
+    Args:
+        query (str): One of the FINGERPRINT_*_QUERY statements.
+
+    Returns:
+        str or None: The fingerprint, or None if the tables cannot be read (e.g. they do not exist yet).
+    """
+    from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+    try:
+        with PostgresConnectorContextManager() as connection_object:
+            cursor = connection_object.get_connection().cursor()
+            cursor.execute(query)
+            return fingerprint(cursor.fetchall())
+    except Exception as e:
+        logging.warning(f"Could not fingerprint tables, the stage will run: {e}")
+        return None
+
+
+def path_fingerprint(path):
+    """
+    Return the fingerprint of the names, sizes and modification times of the files below a path.
+
+    Args:
+        path (str): A file or directory.
+
+    Returns:
+        str: The fingerprint, which also changes when the path is created or removed.
+    """
+    files = [
+        (os.path.relpath(os.path.join(root, file), path),
+         os.path.getsize(os.path.join(root, file)),
+         os.path.getmtime(os.path.join(root, file)))
+        for root, _, names in os.walk(path)
+        for file in names
+    ]
+    return fingerprint(path, sorted(files))
+
+
+def tables_fingerprint(query, *settings):
+    """
+    Return the fingerprint of the tables selected by a fingerprint query combined with stage settings.
+
+    Args:
+        query (str): One of the FINGERPRINT_*_QUERY statements.
+        *settings: Further values the stage output depends on.
+
+    Returns:
+        str or None: The fingerprint, or None if the tables cannot be read.
+    """
+    tables = table_fingerprint(query)
+    return None if tables is None else fingerprint(tables, *settings)
+
+
+def flush_table_stats(conn):
+    """
+    Publishes the table statistics counters of a connection that wrote fingerprinted tables, so the fingerprint
+    of the next stage sees its writes.
+
+    Args:
+        conn (object): The database connection of the stage.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(FLUSH_TABLE_STATS_QUERY)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def generate_and_inject():
+    """
+    Generates data and loads it into the src tables.
+    """
+    from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+    from data_dev.src.data.inject_generated_data_to_src import GeneratedDataLoader
+    with PostgresConnectorContextManager() as connection_object:
+        GeneratedDataLoader(connection_object.get_connection()).inject_data()
+        flush_table_stats(connection_object.get_connection())
+
+
+def load_3nf():
+    """
+    Merges the src tables into the 3NF tables.
+    """
+    from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+    from data_dev.src.data.nf3_loader import NF3Loader
+    with PostgresConnectorContextManager() as connection_object:
+        NF3Loader(connection_object.get_connection()).load_data()
+        flush_table_stats(connection_object.get_connection())
+
+
+def export_parquet(transform):
+    """
+    Return the run function of a parquet export stage.
+
+    Args:
+        transform (str): The name of the LoadParquet transform method.
+
+    Returns:
+        Callable[[], None]: Runs the transform on its own connection.
+    """
+    def run():
+        from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+        from data_dev.src.data.parquet_loader import LoadParquet
+        with PostgresConnectorContextManager() as connection_object:
+            getattr(LoadParquet(connection_object), transform)()
+    return run
+
+
+def parquet_export_stages():
+    """
+    Declares one export stage per transform registered in LoadParquet.
+
+    Returns:
+        List[Stage]: The export stages, writing parquet_storage_config.storage_path_<dataset>.
+    """
+    from data_dev.src.data.parquet_loader import TRANSFORMS, transform_query
+    stages = []
+    for transform, dataset in TRANSFORMS.items():
+        storage_path = getattr(parquet_storage_config, f'storage_path_{dataset}')
+        stages.append(Stage(
+            name=f'{EXPORT_STAGE_PREFIX}{dataset}',
+            run=export_parquet(transform),
+            inputs=[NF3_TABLES],
+            outputs=[storage_path],
+            fingerprint=lambda dataset=dataset: tables_fingerprint(
+                FINGERPRINT_NF3_TABLES_QUERY, transform_query(dataset, load_config.maintain_aggregates),
+                asdict(parquet_storage_config)
+            ),
+            output_exists=lambda storage_path=storage_path: os.path.exists(storage_path),
+        ))
+    return stages
+
+
+def generate_report():
+    """
+    Generates the HTML report from the parquet files.
+    """
+    from data_dev.src.reporting.report_generator import ReportGenerator
+    ReportGenerator().generate_report()
+
+
+def build_stages(names=None):
+    """
+    Declares the data_dev pipeline as stages with their inputs and outputs.
+
+    The src load always runs: it only generates data into empty tables or appends new days, so a run
+    without new data is cheap. The 3NF load is skipped while the src tables and the load settings are
+    unchanged, the parquet exports while the 3NF tables, their SQL query and the parquet storage settings
+    (extraction method, write options) are unchanged and their output exists, and the report while its parquet
+    input is unchanged and the report exists.
+
+    Args:
+        names (List[str], optional): The names or fnmatch patterns of the stages to return. Defaults to all
+            stages. The dependencies between the returned stages are kept; those on other stages are dropped.
+            LoadParquet (and with it pandas and pyarrow) is only imported if a requested name starts with
+            EXPORT_STAGE_PREFIX.
+
+    Returns:
+        List[Stage]: The pipeline stages.
+    """
+    stages = [
+        Stage(
+            name='generate_and_inject',
+            run=generate_and_inject,
+            outputs=[SRC_GENERATED_TABLES],
+        ),
+        Stage(
+            name='load_3nf',
+            run=load_3nf,
+            inputs=[SRC_GENERATED_TABLES],
+            outputs=[NF3_TABLES],
+            fingerprint=lambda: tables_fingerprint(FINGERPRINT_SRC_GENERATED_TABLES_QUERY, asdict(load_config)),
+        ),
+    ]
+    if names is None or any(pattern.startswith(EXPORT_STAGE_PREFIX) for pattern in names):
+        stages.extend(parquet_export_stages())
+    stages.append(Stage(
+        name='generate_report',
+        run=generate_report,
+        inputs=[report_generator_config.parquet_files_path],
+        outputs=[report_generator_config.storage_path],
+        fingerprint=lambda: path_fingerprint(report_generator_config.parquet_files_path),
+        output_exists=lambda: os.path.exists(report_generator_config.storage_path),
+    ))
+    if names is None:
+        return stages
+    return [stage for stage in stages if any(fnmatch(stage.name, pattern) for pattern in names)]
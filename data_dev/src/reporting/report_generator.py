@@ -4,6 +4,7 @@ from plotly.subplots import make_subplots
 import plotly.io as pio
 import os
 
+from data_dev.src.metrics.run_metrics import run_metrics, path_size
 from data_dev.config import report_generator_config
 
 
@@ -136,8 +137,9 @@ class ReportGenerator:
         The file is named "report.html".
         """
         os.makedirs(report_generator_config.storage_path, exist_ok=True)
-        pio.write_html(self.fig, file=os.path.join(report_generator_config.storage_path, "report.html"),
-                       auto_open=False)
+        report_path = os.path.join(report_generator_config.storage_path, "report.html")
+        pio.write_html(self.fig, file=report_path, auto_open=False)
+        run_metrics.add_bytes(path_size(report_path))
 
     def generate_report(self):
         """
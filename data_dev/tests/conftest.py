@@ -0,0 +1,42 @@
+import pytest
+
+from data_dev.config import data_generator_config, pipeline_config
+
+
+@pytest.fixture
+def generator_config(monkeypatch, tmp_path):
+    """
+    Configures a small, seeded generation run for the duration of a test.
+    """
+    settings = {
+        'num_patients': 30,
+        'start_date': '2024-01-01',
+        'end_date': '2024-03-31',
+        'visits_per_day': (7, 10),
+        'columnar_visits': True,
+        'visits_chunk_days': 31,
+        'visits_chunk_rows': None,
+        'seed': 42,
+        'num_shards': 1,
+        'num_workers': 1,
+        'value_pool_size': None,
+        'value_pool_cache_dir': str(tmp_path / 'value_pools'),
+        'num_facilities': None,
+        'patient_zipf_exponent': 0.0,
+        'facility_zipf_exponent': 0.0,
+        'seasonal_amplitude': 0.0,
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(data_generator_config, name, value)
+    return data_generator_config
+
+
+@pytest.fixture
+def pipeline_state(monkeypatch, tmp_path):
+    """
+    Keeps the stage fingerprints and run checkpoints of a test in its temporary directory.
+    """
+    monkeypatch.setattr(pipeline_config, 'state_path', str(tmp_path / 'pipeline_state' / 'stage_state.json'))
+    monkeypatch.setattr(pipeline_config, 'checkpoint_path', str(tmp_path / 'pipeline_state' / 'run_checkpoint.json'))
+    monkeypatch.setattr(pipeline_config, 'skip_unchanged', True)
+    return pipeline_config
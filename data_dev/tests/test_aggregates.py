@@ -0,0 +1,74 @@
+from datetime import date, datetime
+
+import pytest
+
+from data_dev.queries import (DELETE_AGG_PATIENT_FACILITY_COST_QUERY,
+                              DELETE_AGG_PATIENT_FACILITY_DAILY_COST_QUERY,
+                              SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY,
+                              TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+                              TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL)
+from data_dev.src.data.aggregates import VisitAggregates
+from data_dev.src.data.parquet_loader import TRANSFORMS, TRANSFORM_QUERIES, transform_query
+
+
+class RecordingCursor:
+    """
+    Records every statement, in place of a database cursor.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+
+@pytest.mark.parametrize('window_start, window_end, expected', [
+    # a merge window ending at midnight does not touch the day it ends on
+    (datetime(2024, 3, 1), datetime(2024, 4, 1), (date(2024, 3, 1), date(2024, 4, 1))),
+    # a window ending during a day touches that day too
+    (datetime(2024, 3, 1, 12), datetime(2024, 3, 31, 8, 30), (date(2024, 3, 1), date(2024, 4, 1))),
+    # the default full refresh window does not overflow
+    (datetime.min, datetime.max, (date.min, date.max)),
+])
+def test_day_range_covers_every_day_the_window_overlaps(window_start, window_end, expected):
+    assert VisitAggregates.day_range(window_start, window_end) == expected
+
+
+def test_windowed_refresh_replaces_the_daily_sums_in_the_totals():
+    cursor = RecordingCursor()
+    VisitAggregates().refresh(cursor, datetime(2024, 3, 1), datetime(2024, 4, 1))
+
+    queries = [query for query, _ in cursor.statements]
+    assert SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY in queries
+    assert DELETE_AGG_PATIENT_FACILITY_COST_QUERY not in queries
+    # the old daily sums are subtracted before the daily rows they are read from are deleted
+    assert queries.index(SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY) < queries.index(
+        DELETE_AGG_PATIENT_FACILITY_DAILY_COST_QUERY)
+    assert {params['first_day'] for _, params in cursor.statements if params} == {date(2024, 3, 1)}
+    assert {params['end_day'] for _, params in cursor.statements if params} == {date(2024, 4, 1)}
+
+
+def test_full_refresh_rebuilds_the_totals():
+    cursor = RecordingCursor()
+    VisitAggregates().refresh(cursor)
+
+    queries = [query for query, _ in cursor.statements]
+    assert DELETE_AGG_PATIENT_FACILITY_COST_QUERY in queries
+    assert SUBTRACT_AGG_PATIENT_FACILITY_COST_QUERY not in queries
+
+
+def test_every_transform_has_an_aggregate_query():
+    assert set(TRANSFORMS.values()) == set(TRANSFORM_QUERIES)
+    for dataset, (query, aggregate_query) in TRANSFORM_QUERIES.items():
+        assert transform_query(dataset, use_aggregates=False) == query
+        assert transform_query(dataset, use_aggregates=True) == aggregate_query
+        assert aggregate_query != query
+
+
+def test_aggregate_query_keeps_the_visit_timestamp_boundary_of_the_original():
+    assert "v.visit_timestamp > '2000-11-01'" in TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
+    assert "a.visit_date > '2000-11-01'" in TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
+    assert "v.visit_timestamp > '2000-11-01'" in TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
+    assert "a.visit_date >= '2000-11-01'" not in TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_AGG_SQL
@@ -0,0 +1,79 @@
+import json
+import os
+
+from data_dev.config import load_config
+from data_dev.src.pipeline.checkpoint import RunCheckpoint, run_key
+from data_dev.src.pipeline.scheduler import Stage, StageScheduler, SUCCEEDED, SKIPPED, FAILED
+
+
+def stored_entries(pipeline_state):
+    with open(pipeline_state.checkpoint_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_run_key_depends_on_the_command_and_the_configuration(monkeypatch):
+    assert run_key('all') != run_key('report')
+    all_key = run_key('all')
+    monkeypatch.setattr(load_config, 'incremental', not load_config.incremental)
+    assert run_key('all')[2] != all_key[2]
+
+
+def test_resumed_run_skips_stages_completed_with_the_same_inputs(pipeline_state):
+    failed_run = RunCheckpoint(command='all')
+    failed_run.mark_completed('load_3nf', 'fp-load')
+    failed_run.mark_completed('export_visits', 'fp-export')
+
+    resumed = RunCheckpoint(command='all', resume=True)
+    assert resumed.is_completed('load_3nf', 'fp-load')
+    assert not resumed.is_completed('export_visits', 'fp-export-changed')
+    assert not resumed.is_completed('generate_report', None)
+
+
+def test_fresh_run_does_not_overwrite_the_stored_checkpoint(pipeline_state):
+    RunCheckpoint(command='all').mark_completed('load_3nf', 'fp-load')
+    RunCheckpoint(command='all')
+    RunCheckpoint(command='report', resume=True)
+    assert RunCheckpoint(command='all', resume=True).is_completed('load_3nf', 'fp-load')
+
+
+def test_checkpoints_of_other_commands_are_kept_and_not_resumed(pipeline_state):
+    RunCheckpoint(command='all').mark_completed('load_3nf', 'fp-load')
+    report_run = RunCheckpoint(command='report')
+    report_run.mark_completed('generate_report', 'fp-report')
+
+    assert len(stored_entries(pipeline_state)) == 2
+    assert not RunCheckpoint(command='report', resume=True).is_completed('load_3nf', 'fp-load')
+
+    report_run.clear()
+    assert [entry['command'] for entry in stored_entries(pipeline_state).values()] == ['all']
+    assert RunCheckpoint(command='all', resume=True).is_completed('load_3nf', 'fp-load')
+
+
+def test_clear_removes_the_file_with_the_last_entry(pipeline_state):
+    checkpoint = RunCheckpoint(command='all')
+    checkpoint.mark_completed('load_3nf', 'fp-load')
+    checkpoint.clear()
+    assert not os.path.exists(pipeline_state.checkpoint_path)
+    RunCheckpoint(command='all').clear()
+
+
+def test_scheduler_resumes_after_the_failed_stage(pipeline_state):
+    ran = []
+
+    def stage(name, inputs=(), outputs=(), fail=False):
+        def run():
+            ran.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+        return Stage(name, run=run, inputs=list(inputs), outputs=list(outputs), fingerprint=lambda: f"fp-{name}")
+
+    # skip_unchanged is off, so only the checkpoint skips stages
+    pipeline_state.skip_unchanged = False
+    first = StageScheduler([stage('load', outputs=['3nf']), stage('export', inputs=['3nf'], fail=True)],
+                           checkpoint=RunCheckpoint(command='all')).run()
+    assert first == {'load': SUCCEEDED, 'export': FAILED}
+
+    second = StageScheduler([stage('load', outputs=['3nf']), stage('export', inputs=['3nf'])],
+                            checkpoint=RunCheckpoint(command='all', resume=True)).run()
+    assert second == {'load': SKIPPED, 'export': SUCCEEDED}
+    assert ran == ['load', 'export', 'export']
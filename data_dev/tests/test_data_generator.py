@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import numpy as np
+
+from data_dev.src.data.data_generator import DataGenerator
+
+VISIT_COLUMNS = ['patient_id', 'facility_id', 'visit_timestamp', 'treatment_cost', 'duration_minutes']
+
+
+def test_columnar_visits_are_reproducible_with_the_same_seed(generator_config):
+    first = DataGenerator(seed=7).generate_visits_columnar()
+    second = DataGenerator(seed=7).generate_visits_columnar()
+    for name in VISIT_COLUMNS:
+        np.testing.assert_array_equal(first[name], second[name])
+
+
+def test_columnar_visits_differ_with_another_seed(generator_config):
+    first = DataGenerator(seed=7).generate_visits_columnar()
+    second = DataGenerator(seed=8).generate_visits_columnar()
+    assert not np.array_equal(first['visit_timestamp'], second['visit_timestamp'])
+
+
+def test_columnar_visits_have_the_row_engine_columns(generator_config):
+    columnar = DataGenerator().generate_visits_columnar()
+    rows = DataGenerator().generate_visits()
+    assert list(columnar) == VISIT_COLUMNS
+    assert list(rows[0]) == VISIT_COLUMNS
+    assert len({column.size for column in columnar.values()}) == 1
+
+
+def test_columnar_visits_respect_the_configured_ranges(generator_config):
+    dg = DataGenerator()
+    visits = dg.generate_visits_columnar(datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+    visit_days = visits['visit_timestamp'].astype('datetime64[D]')
+    assert visit_days.min() >= np.datetime64('2024-01-01')
+    assert visit_days.max() <= np.datetime64('2024-01-31')
+    _, visits_per_day = np.unique(visit_days, return_counts=True)
+    assert visits_per_day.size == 31
+    assert visits_per_day.min() >= 7 and visits_per_day.max() <= 10
+    assert 1 <= visits['patient_id'].min() and visits['patient_id'].max() <= dg.num_patients
+    assert 1 <= visits['facility_id'].min() and visits['facility_id'].max() <= dg.num_facilities
+    assert 15 <= visits['duration_minutes'].min() and visits['duration_minutes'].max() <= 60
+    assert 50 <= visits['treatment_cost'].min() and visits['treatment_cost'].max() <= 5000
@@ -0,0 +1,92 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from data_dev.config import src_load_config
+from data_dev.src.data.inject_generated_data_to_src import GeneratedDataLoader, SRC_TABLES
+
+VISIT_COLUMNS = SRC_TABLES['src_generated_visits'][2]
+
+
+class RecordingCursor:
+    """
+    Records the statements and COPY payloads a loader sends, in place of a database cursor.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def copy_expert(self, query, file):
+        self.copied.append((query, file.read()))
+
+
+@pytest.fixture
+def visit_rows():
+    return [
+        {'patient_id': 1, 'facility_id': 2, 'visit_timestamp': '2024-01-01 08:30:00',
+         'treatment_cost': 120.5, 'duration_minutes': 30},
+        {'patient_id': 3, 'facility_id': 1, 'visit_timestamp': '2024-01-02 17:05:09',
+         'treatment_cost': 99.0, 'duration_minutes': 45},
+    ]
+
+
+@pytest.fixture
+def visit_columns(visit_rows):
+    return {
+        'patient_id': np.array([1, 3]),
+        'facility_id': np.array([2, 1]),
+        'visit_timestamp': np.array(['2024-01-01T08:30:00', '2024-01-02T17:05:09'], dtype='datetime64[s]'),
+        'treatment_cost': np.array([120.5, 99.0]),
+        'duration_minutes': np.array([30, 45]),
+    }
+
+
+def test_iter_tuples_orders_rows_and_columns_alike(visit_rows, visit_columns):
+    from_rows = list(GeneratedDataLoader.iter_tuples(visit_rows, VISIT_COLUMNS))
+    from_columns = list(GeneratedDataLoader.iter_tuples(visit_columns, VISIT_COLUMNS))
+    assert from_rows[0] == (1, 2, '2024-01-01 08:30:00', 120.5, 30)
+    assert [row[:2] + row[3:] for row in from_rows] == [row[:2] + row[3:] for row in from_columns]
+    assert [str(row[2]) for row in from_columns] == ['2024-01-01 08:30:00', '2024-01-02 17:05:09']
+
+
+def test_iter_rows_converts_columns_to_native_values(visit_columns):
+    rows = list(GeneratedDataLoader.iter_rows(visit_columns))
+    assert len(rows) == 2
+    assert rows[1]['patient_id'] == 3 and type(rows[1]['patient_id']) is int
+    assert list(rows[0]) == list(visit_columns)
+
+
+def test_copy_data_into_table_sends_one_csv_payload(visit_rows):
+    cursor = RecordingCursor()
+    query = SRC_TABLES['src_generated_visits'][1]
+    GeneratedDataLoader.copy_data_into_table(cursor, visit_rows, query, VISIT_COLUMNS)
+
+    assert len(cursor.copied) == 1
+    copied_query, payload = cursor.copied[0]
+    assert copied_query == query
+    assert list(csv.reader(io.StringIO(payload))) == [
+        ['1', '2', '2024-01-01 08:30:00', '120.5', '30'],
+        ['3', '1', '2024-01-02 17:05:09', '99.0', '45'],
+    ]
+
+
+def test_load_table_copies_into_a_staging_table(monkeypatch, visit_columns):
+    monkeypatch.setattr(src_load_config, 'load_method', 'copy')
+    loader = GeneratedDataLoader(conn=None)
+    cursor = RecordingCursor()
+    loader.load_table(cursor, 'src_generated_visits', visit_columns, target_table='src_generated_visits_stage')
+
+    assert cursor.copied[0][0].split()[:2] == ['COPY', 'src_generated_visits_stage']
+    assert loader.load_stats['src_generated_visits'][0] == 2
+
+
+def test_load_table_rejects_an_unknown_load_method(monkeypatch, visit_rows):
+    monkeypatch.setattr(src_load_config, 'load_method', 'bulk')
+    with pytest.raises(ValueError, match="Unsupported load method"):
+        GeneratedDataLoader(conn=None).load_table(RecordingCursor(), 'src_generated_visits', visit_rows)
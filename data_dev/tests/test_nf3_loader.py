@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from data_dev.config import load_config
+from data_dev.queries import SELECT_LOAD_WATERMARK_QUERY, UPSERT_LOAD_WATERMARK_QUERY, MERGE_VISITS_WINDOW_QUERY
+from data_dev.src.data.nf3_loader import NF3Loader
+
+
+class WatermarkCursor:
+    """
+    Serves a stored watermark to SELECT_LOAD_WATERMARK_QUERY and records every statement, in place of a database
+    cursor.
+    """
+
+    def __init__(self, watermark=None):
+        self.watermark = watermark
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def fetchone(self):
+        query, _ = self.statements[-1]
+        assert query == SELECT_LOAD_WATERMARK_QUERY
+        return None if self.watermark is None else (self.watermark,)
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    monkeypatch.setattr(load_config, 'date_scope', '2024-03-31')
+    monkeypatch.setattr(load_config, 'incremental', True)
+    return NF3Loader(conn=None)
+
+
+def merged_windows(cursor):
+    return [params for query, params in cursor.statements if query == MERGE_VISITS_WINDOW_QUERY]
+
+
+def test_scope_end_is_the_start_of_the_day_after_date_scope(loader):
+    assert loader.scope_end() == datetime(2024, 4, 1)
+
+
+def test_first_incremental_merge_starts_at_the_beginning(loader):
+    cursor = WatermarkCursor()
+    assert loader.merge_visits_incremental(cursor) == datetime(2024, 4, 1)
+    assert merged_windows(cursor) == [{'window_start': datetime.min, 'window_end': datetime(2024, 4, 1)}]
+
+
+def test_incremental_merge_starts_at_the_watermark(loader):
+    cursor = WatermarkCursor(watermark=datetime(2024, 3, 1))
+    assert loader.merge_visits_incremental(cursor) == datetime(2024, 4, 1)
+    assert merged_windows(cursor) == [{'window_start': datetime(2024, 3, 1), 'window_end': datetime(2024, 4, 1)}]
+
+
+def test_incremental_merge_past_the_scope_merges_nothing(loader):
+    cursor = WatermarkCursor(watermark=datetime(2024, 5, 1))
+    assert loader.merge_visits_incremental(cursor) == datetime(2024, 5, 1)
+    assert merged_windows(cursor) == []
+
+
+def test_set_watermark_upserts_the_table_watermark():
+    cursor = WatermarkCursor()
+    NF3Loader.set_watermark(cursor, datetime(2024, 4, 1))
+    assert cursor.statements == [
+        (UPSERT_LOAD_WATERMARK_QUERY, {'target_table': 'visits', 'loaded_until': datetime(2024, 4, 1)})
+    ]
+
@@ -0,0 +1,130 @@
+from datetime import date
+
+import pytest
+
+from data_dev.config import ParquetWriteOptions, load_config, parquet_storage_config
+from data_dev.queries import (SELECT_MAX_VISIT_ID_QUERY, SELECT_CHANGED_VISIT_MONTHS_QUERY,
+                              VISITS_IN_RANGE_SQL, AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL)
+from data_dev.src.data.parquet_loader import LoadParquet
+
+QUERY = "SELECT * FROM visits v"
+
+
+class VisitsCursor:
+    """
+    Serves the max visit id and the changed months of an export, in place of a database cursor.
+    """
+
+    def __init__(self, max_visit_id, changed_months):
+        self.max_visit_id = max_visit_id
+        self.changed_months = changed_months
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def fetchone(self):
+        assert self.statements[-1][0] == SELECT_MAX_VISIT_ID_QUERY
+        return (self.max_visit_id,)
+
+    def fetchall(self):
+        assert self.statements[-1][0] == SELECT_CHANGED_VISIT_MONTHS_QUERY
+        return [(month,) for month in self.changed_months]
+
+    def close(self):
+        pass
+
+
+class ConnectionObject:
+    """
+    Hands out one cursor, like PostgresConnectorContextManager hands out its connection.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def get_connection(self):
+        return self
+
+    def cursor(self):
+        return self._cursor
+
+
+@pytest.fixture
+def loader_for(monkeypatch):
+    monkeypatch.setattr(parquet_storage_config, 'extraction_method', 'pandas')
+    monkeypatch.setattr(parquet_storage_config, 'incremental_export', True)
+
+    def loader_for(cursor):
+        return LoadParquet(ConnectionObject(cursor))
+    return loader_for
+
+
+def test_month_range_spans_the_changed_months():
+    assert LoadParquet.month_range(['2024-03', '2023-11', '2024-01']) == {
+        'range_start': date(2023, 11, 1), 'range_end': date(2024, 4, 1)
+    }
+    assert LoadParquet.month_range(['2024-12']) == {'range_start': date(2024, 12, 1), 'range_end': date(2025, 1, 1)}
+
+
+def test_first_export_rewrites_every_partition(loader_for, tmp_path):
+    loader = loader_for(VisitsCursor(max_visit_id=100, changed_months=[]))
+    partitions, state = loader.changed_partitions(QUERY, str(tmp_path), SELECT_CHANGED_VISIT_MONTHS_QUERY,
+                                                  ParquetWriteOptions())
+    assert partitions is None
+    assert state['last_visit_id'] == 100
+
+
+def test_next_export_rewrites_the_months_of_the_new_visits(loader_for, tmp_path):
+    options = ParquetWriteOptions()
+    _, state = loader_for(VisitsCursor(100, [])).changed_partitions(
+        QUERY, str(tmp_path), SELECT_CHANGED_VISIT_MONTHS_QUERY, options)
+    LoadParquet.save_export_state(str(tmp_path), state)
+
+    cursor = VisitsCursor(max_visit_id=150, changed_months=['2024-03', '2024-02'])
+    partitions, _ = loader_for(cursor).changed_partitions(QUERY, str(tmp_path), SELECT_CHANGED_VISIT_MONTHS_QUERY,
+                                                          options)
+    assert partitions == ['2024-02', '2024-03']
+    assert cursor.statements[-1] == (SELECT_CHANGED_VISIT_MONTHS_QUERY, {'last_visit_id': 100, 'max_visit_id': 150})
+
+
+@pytest.mark.parametrize('query, options, max_visit_id', [
+    ("SELECT id FROM visits v", ParquetWriteOptions(), 150),  # another query
+    (QUERY, ParquetWriteOptions(compression='gzip'), 150),  # another layout
+    (QUERY, ParquetWriteOptions(), 50),  # the visits were reloaded
+])
+def test_changed_export_or_reloaded_visits_rewrite_every_partition(loader_for, tmp_path, query, options,
+                                                                   max_visit_id):
+    _, state = loader_for(VisitsCursor(100, [])).changed_partitions(
+        QUERY, str(tmp_path), SELECT_CHANGED_VISIT_MONTHS_QUERY, ParquetWriteOptions())
+    LoadParquet.save_export_state(str(tmp_path), state)
+
+    partitions, _ = loader_for(VisitsCursor(max_visit_id, ['2024-03'])).changed_partitions(
+        query, str(tmp_path), SELECT_CHANGED_VISIT_MONTHS_QUERY, options)
+    assert partitions is None
+
+
+@pytest.mark.parametrize('use_aggregates, bounded_source, unbounded_source', [
+    (False, VISITS_IN_RANGE_SQL, 'visits v\n'),
+    (True, AGG_VISITS_DAILY_FACILITY_IN_RANGE_SQL, 'agg_visits_daily_facility a\n'),
+])
+def test_incremental_export_bounds_the_source_table_to_the_changed_months(
+        monkeypatch, loader_for, tmp_path, use_aggregates, bounded_source, unbounded_source):
+    monkeypatch.setattr(load_config, 'maintain_aggregates', use_aggregates)
+    loader = loader_for(cursor=None)
+    loader.storage_path_facility_type_avg_time_spent_per_visit_date = str(tmp_path)
+    monkeypatch.setattr(loader, 'changed_partitions',
+                        lambda *args: (['2024-01', '2024-03'], {'export_fingerprint': 'fp', 'last_visit_id': 150}))
+    executed = []
+    monkeypatch.setattr(loader, 'read_data', lambda query, params=None: executed.append((query, params)) or 'df')
+    monkeypatch.setattr(LoadParquet, 'add_month_partition', staticmethod(lambda df: None))
+    monkeypatch.setattr(loader, 'to_parquet', lambda **kwargs: None)
+
+    loader.transform_facility_type_avg_time_spent_per_visit_date()
+
+    [(query, params)] = executed
+    assert bounded_source in query
+    assert unbounded_source not in query
+    assert params == {'partitions': ['2024-01', '2024-03'],
+                      'range_start': date(2024, 1, 1), 'range_end': date(2024, 4, 1)}
+    assert LoadParquet.load_export_state(str(tmp_path))['last_visit_id'] == 150
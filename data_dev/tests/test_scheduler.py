@@ -0,0 +1,121 @@
+import pytest
+
+from data_dev.src.pipeline.scheduler import (Stage, StageScheduler, fingerprint,
+                                             SUCCEEDED, SKIPPED, FAILED, UPSTREAM_FAILED)
+
+
+class Recorder:
+    """
+    Builds stage run functions recording the order the stages ran in.
+    """
+
+    def __init__(self):
+        self.ran = []
+
+    def run(self, name, fail=False):
+        def run():
+            self.ran.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+        return run
+
+
+def test_fingerprint_is_stable_and_order_sensitive():
+    assert fingerprint('a', {'x': 1, 'y': 2}) == fingerprint('a', {'y': 2, 'x': 1})
+    assert fingerprint('a', 'b') != fingerprint('b', 'a')
+
+
+def test_dependency_cycle_is_rejected(pipeline_state):
+    stages = [
+        Stage('a', run=lambda: None, inputs=['y'], outputs=['x']),
+        Stage('b', run=lambda: None, inputs=['x'], outputs=['y']),
+    ]
+    with pytest.raises(ValueError, match="dependency cycle"):
+        StageScheduler(stages)
+
+
+def test_output_written_by_two_stages_is_rejected(pipeline_state):
+    stages = [Stage('a', run=lambda: None, outputs=['x']), Stage('b', run=lambda: None, outputs=['x'])]
+    with pytest.raises(ValueError, match="'x' is written by both 'a' and 'b'"):
+        StageScheduler(stages)
+
+
+def test_stages_run_after_their_upstream_stages(pipeline_state):
+    recorder = Recorder()
+    stages = [
+        Stage('report', run=recorder.run('report'), inputs=['parquet']),
+        Stage('export', run=recorder.run('export'), inputs=['3nf'], outputs=['parquet']),
+        Stage('load', run=recorder.run('load'), outputs=['3nf']),
+    ]
+    statuses = StageScheduler(stages).run()
+    assert statuses == {'report': SUCCEEDED, 'export': SUCCEEDED, 'load': SUCCEEDED}
+    assert recorder.ran == ['load', 'export', 'report']
+
+
+def test_failure_marks_downstream_stages_upstream_failed(pipeline_state):
+    recorder = Recorder()
+    stages = [
+        Stage('load', run=recorder.run('load', fail=True), outputs=['3nf']),
+        Stage('export', run=recorder.run('export'), inputs=['3nf'], outputs=['parquet']),
+        Stage('report', run=recorder.run('report'), inputs=['parquet']),
+        Stage('independent', run=recorder.run('independent')),
+    ]
+    statuses = StageScheduler(stages).run()
+    assert statuses == {'load': FAILED, 'export': UPSTREAM_FAILED, 'report': UPSTREAM_FAILED,
+                        'independent': SUCCEEDED}
+    assert sorted(recorder.ran) == ['independent', 'load']
+
+
+def test_unchanged_stage_is_skipped_on_the_next_run(pipeline_state):
+    recorder = Recorder()
+    inputs = {'version': 1}
+
+    def stages():
+        return [Stage('export', run=recorder.run('export'), fingerprint=lambda: fingerprint(inputs['version']))]
+
+    assert StageScheduler(stages()).run() == {'export': SUCCEEDED}
+    assert StageScheduler(stages()).run() == {'export': SKIPPED}
+    inputs['version'] = 2
+    assert StageScheduler(stages()).run() == {'export': SUCCEEDED}
+    assert recorder.ran == ['export', 'export']
+
+
+def test_stage_without_a_fingerprint_always_runs(pipeline_state):
+    recorder = Recorder()
+    for _ in range(2):
+        StageScheduler([Stage('generate', run=recorder.run('generate'))]).run()
+    StageScheduler([Stage('generate', run=recorder.run('generate'), fingerprint=lambda: None)]).run()
+    assert recorder.ran == ['generate'] * 3
+
+
+def test_failed_stage_is_not_skipped_on_the_next_run(pipeline_state):
+    recorder = Recorder()
+    failing = Stage('export', run=recorder.run('export', fail=True), fingerprint=lambda: 'same')
+    assert StageScheduler([failing]).run() == {'export': FAILED}
+    passing = Stage('export', run=recorder.run('export'), fingerprint=lambda: 'same')
+    assert StageScheduler([passing]).run() == {'export': SUCCEEDED}
+
+
+def test_stage_with_a_missing_output_runs_with_unchanged_inputs(pipeline_state, tmp_path):
+    output = tmp_path / 'report.html'
+    recorder = Recorder()
+
+    def stages():
+        def run():
+            recorder.run('report')()
+            output.write_text('report')
+        return [Stage('report', run=run, fingerprint=lambda: 'same', output_exists=output.exists)]
+
+    assert StageScheduler(stages()).run() == {'report': SUCCEEDED}
+    assert StageScheduler(stages()).run() == {'report': SKIPPED}
+    output.unlink()
+    assert StageScheduler(stages()).run() == {'report': SUCCEEDED}
+    assert recorder.ran == ['report', 'report']
+
+
+def test_forced_scheduler_runs_unchanged_stages(pipeline_state):
+    recorder = Recorder()
+    stage = Stage('export', run=recorder.run('export'), fingerprint=lambda: 'same')
+    StageScheduler([stage]).run()
+    assert StageScheduler([stage], force=True).run() == {'export': SUCCEEDED}
+    assert recorder.ran == ['export', 'export']
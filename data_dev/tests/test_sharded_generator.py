@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from data_dev.src.data.sharded_generator import ShardedDataGenerator, derive_seed
+
+
+def generate(generator_config, num_workers):
+    """
+    Returns the patient ids of every shard and the visits of every window, in the order they are yielded.
+    """
+    generator_config.num_workers = num_workers
+    patients, visits = [], []
+    for shard, shard_patients, window_visits in ShardedDataGenerator(seed=1234).iter_shards():
+        if shard_patients is not None:
+            patients.append([patient['patient_id'] for patient in shard_patients])
+        visits.append(window_visits)
+    return patients, visits
+
+
+def test_derive_seed_is_stable_and_distinct_per_index():
+    seeds = [derive_seed(1234, index) for index in range(8)]
+    assert seeds == [derive_seed(1234, index) for index in range(8)]
+    assert len(set(seeds)) == len(seeds)
+    assert derive_seed(1234, 0) != derive_seed(4321, 0)
+
+
+def test_shards_cover_the_dates_and_patients_without_gaps(generator_config):
+    generator_config.num_shards = 4
+    shards = ShardedDataGenerator(seed=1234).plan_shards()
+
+    assert shards[0].start_date == datetime(2024, 1, 1)
+    assert shards[-1].end_date == datetime(2024, 3, 31)
+    assert shards[0].first_patient_id == 1
+    assert shards[-1].last_patient_id == generator_config.num_patients
+    for previous, shard in zip(shards, shards[1:]):
+        assert shard.start_date == previous.end_date + timedelta(days=1)
+        assert shard.first_patient_id == previous.last_patient_id + 1
+    assert len({shard.seed for shard in shards}) == len(shards)
+
+
+def test_generated_data_does_not_depend_on_num_workers(generator_config):
+    generator_config.num_shards = 3
+    generator_config.visits_chunk_days = 10
+    patients_serial, visits_serial = generate(generator_config, num_workers=1)
+    patients_parallel, visits_parallel = generate(generator_config, num_workers=3)
+
+    assert patients_serial == patients_parallel == [list(range(1, 11)), list(range(11, 21)), list(range(21, 31))]
+    assert len(visits_serial) == len(visits_parallel)
+    for serial, parallel in zip(visits_serial, visits_parallel):
+        for name in serial:
+            np.testing.assert_array_equal(serial[name], parallel[name])
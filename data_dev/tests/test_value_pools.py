@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+from data_dev.src.data import value_pools
+from data_dev.src.data.value_pools import FakerValuePool, POOL_PROVIDERS
+from data_dev.src.data.data_generator import DataGenerator
+
+
+@pytest.fixture(autouse=True)
+def empty_process_cache(monkeypatch):
+    monkeypatch.setattr(value_pools, '_loaded_pools', {})
+
+
+def test_pools_round_trip_through_the_cache_file(monkeypatch, tmp_path):
+    built = FakerValuePool(pool_size=20, cache_dir=str(tmp_path), seed=5)
+    assert os.path.exists(built.cache_path)
+    assert sorted(built.pools) == sorted(POOL_PROVIDERS)
+
+    monkeypatch.setattr(value_pools, '_loaded_pools', {})
+    monkeypatch.setattr(FakerValuePool, 'build', lambda self: pytest.fail("the cached pools were sampled again"))
+    loaded = FakerValuePool(pool_size=20, cache_dir=str(tmp_path), seed=5)
+    for name in POOL_PROVIDERS:
+        np.testing.assert_array_equal(loaded.pools[name], built.pools[name])
+        assert len(loaded.pools[name]) == 20
+
+
+def test_pools_are_cached_per_size_and_seed(tmp_path):
+    paths = {
+        FakerValuePool(pool_size=10, cache_dir=str(tmp_path), seed=seed).cache_path
+        for seed in (1, 2, None)
+    }
+    assert len(paths) == 3
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_sample_draws_pooled_values_reproducibly(tmp_path):
+    pool = FakerValuePool(pool_size=10, cache_dir=str(tmp_path), seed=5)
+    first = pool.sample('last_name', 100, np.random.default_rng(3))
+    second = pool.sample('last_name', 100, np.random.default_rng(3))
+    np.testing.assert_array_equal(first, second)
+    assert set(first) <= set(pool.pools['last_name'])
+
+
+def test_pooled_patients_have_one_shape_per_method(generator_config):
+    generator_config.value_pool_size = 50
+    rows = DataGenerator(seed=9).generate_patients(1, 5)
+    columns = DataGenerator(seed=9).generate_patients_columnar(1, 5)
+
+    assert isinstance(rows, list) and isinstance(rows[0], dict)
+    assert all(isinstance(column, np.ndarray) for column in columns.values())
+    assert [row['patient_id'] for row in rows] == columns['patient_id'].tolist()
+    assert [row['first_name'] for row in rows] == columns['first_name'].tolist()
+    assert [row['date_of_birth'] for row in rows] == [str(day) for day in columns['date_of_birth']]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from data_dev.config import DataGeneratorConfig, WORKLOAD_PROFILES
+from data_dev.src.data.data_generator import DataGenerator, zipf_cdf
+
+
+def make_config(**settings):
+    return DataGeneratorConfig(
+        num_patients=30,
+        start_date='2024-01-01',
+        end_date='2024-12-31',
+        date_format='%Y-%m-%d',
+        facility_types=['Hospital', 'Clinic'],
+        visits_per_day=(7, 10),
+        **settings
+    )
+
+
+@pytest.mark.parametrize('seasonal_amplitude', [-0.1, 1.5])
+def test_seasonal_amplitude_outside_zero_to_one_is_rejected(seasonal_amplitude):
+    with pytest.raises(ValueError, match="seasonal_amplitude must be between 0 and 1"):
+        make_config(seasonal_amplitude=seasonal_amplitude)
+
+
+@pytest.mark.parametrize('seasonal_amplitude', [0, 0.4, 1])
+def test_seasonal_amplitude_within_zero_to_one_is_accepted(seasonal_amplitude):
+    assert make_config(seasonal_amplitude=seasonal_amplitude).seasonal_amplitude == seasonal_amplitude
+
+
+def test_seasonal_factor_peaks_mid_january_and_bottoms_out_mid_july(generator_config):
+    generator_config.seasonal_amplitude = 0.4
+    dg = DataGenerator()
+    factors = dg.seasonal_factor(np.arange(1, 366))
+    assert dg.seasonal_factor(15) == pytest.approx(1.4)
+    assert int(np.argmax(factors)) + 1 == 15
+    assert factors.min() == pytest.approx(0.6, abs=1e-3)
+    assert 180 <= int(np.argmin(factors)) + 1 <= 200
+    assert factors.mean() == pytest.approx(1, abs=1e-2)
+
+
+def test_seasonal_visits_follow_the_yearly_cycle(generator_config):
+    generator_config.seasonal_amplitude = 0.5
+    generator_config.end_date = '2024-12-31'
+    visits = DataGenerator().generate_visits_columnar()
+    months = visits['visit_timestamp'].astype('datetime64[M]')
+    assert np.sum(months == np.datetime64('2024-01')) > 2 * np.sum(months == np.datetime64('2024-07'))
+
+
+def test_zipf_popularity_concentrates_on_the_first_ranks(generator_config):
+    assert zipf_cdf(30, 0) is None
+    generator_config.patient_zipf_exponent = 1.5
+    patient_ids = DataGenerator().generate_visits_columnar()['patient_id']
+    counts = np.bincount(patient_ids, minlength=31)[1:]
+    assert counts[0] == counts.max()
+    assert counts[:3].sum() > counts[-15:].sum()
+
+
+def test_workload_profile_overrides_the_scale_settings():
+    config = make_config(workload_profile='skewed')
+    profile = WORKLOAD_PROFILES['skewed']
+    assert config.num_patients == profile.num_patients
+    assert config.num_facilities == profile.num_facilities
+    assert config.seasonal_amplitude == profile.seasonal_amplitude
+    assert config.value_pool_size == profile.value_pool_size
+    mean_visits_per_day = sum(config.visits_per_day) / 2
+    assert mean_visits_per_day * 366 == pytest.approx(profile.target_rows, rel=0.01)